@@ -1,31 +1,51 @@
 # agents.py
 
 import os
+import threading
 from textwrap import dedent
 from crewai import Agent
 from dotenv import load_dotenv
 
 from chat_openai_manager import ChatOpenAIManager
-from crewai_tools import SerperDevTool, WebsiteSearchTool
-
-from tools.post_tools import  make_post_tweet_tool
+from crew_llm import crew_llm
+from logging_config import CREW_VERBOSE
+from tools.research_tools import CachedSerperDevTool, CachedWebsiteSearchTool
 
 load_dotenv()
 
 class CreativeSystemAgents:
     def __init__(self):
         self.llm = ChatOpenAIManager().create_llm()
+        # Les agents CrewAI appellent le même modèle partagé, via un BaseLLM CrewAI
+        self.crew_llm = crew_llm(self.llm)
+        # Outils de recherche indépendants de l'agent : construits une seule fois
+        # (WebsiteSearchTool ouvre le vector store db/chroma.sqlite3) et partagés,
+        # avec un cache des résultats commun à tous les agents (tools/research_tools.py).
+        self._research_tools = None
+        self._lock = threading.Lock()
+
+    def research_tools(self):
+        if self._research_tools is None:
+            with self._lock:
+                if self._research_tools is None:
+                    serper_tool = CachedSerperDevTool(
+                        api_key=os.getenv("SERPER_API_KEY"), 
+                        name="SerperDevTool"
+                    )
+                    website_search_tool = CachedWebsiteSearchTool(name="WebsiteSearchTool")
+                    self._research_tools = [serper_tool, website_search_tool]
+        return self._research_tools
+
+    def warm_up(self):
+        """
+        Pré-construit les éléments coûteux (outils, vector store) avant le premier tweet.
+        """
+        self.research_tools()
 
     def creative_tweet_agent(self):
         """
         Agent qui génère des tweets créatifs.
         """
-        serper_tool = SerperDevTool(
-            api_key=os.getenv("SERPER_API_KEY"), 
-            name="SerperDevTool"
-        )
-        website_search_tool = WebsiteSearchTool(name="WebsiteSearchTool")
-
         return Agent(
             role="Creative Tweet Agent",
             goal=dedent("""\
@@ -38,26 +58,8 @@ class CreativeSystemAgents:
             backstory=dedent("""\
                 You are a creative agent specialized in drafting tweets that resonate with humans.
             """),
-            tools=[serper_tool, website_search_tool],
-            llm=self.llm,
-            verbose=True,
+            tools=list(self.research_tools()),
+            llm=self.crew_llm,
+            verbose=CREW_VERBOSE,
         )
 
-
-    def tweet_poster_agent(self, agent_id: str):
-  
-     return Agent(
-        role="Tweet Posting Agent",
-        goal=dedent("""\
-            You receive only a tweet_text.
-            You must call 'Post Tweet' to publish it using
-            the credentials from the agent_id stored in your tool.
-        """),
-        backstory=dedent("""\
-            Responsible for publishing tweets on Twitter via 'Post Tweet'.
-        """),
-
-        tools=[make_post_tweet_tool(agent_id)],
-        llm=self.llm,
-        verbose=True
-    )
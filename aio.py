@@ -0,0 +1,70 @@
+# aio.py
+
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# --------------------------------------------------------------------
+# Exécuteurs bornés pour les appels bloquants (pymongo, Tweepy, CrewAI)
+# --------------------------------------------------------------------
+IO_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IO_EXECUTOR_WORKERS", "32")),
+    thread_name_prefix="io",
+)
+# Les crews CrewAI sont longs (plusieurs tours LLM + outils) : pool séparé
+# pour qu'ils ne monopolisent pas les threads des appels I/O courts.
+CREW_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CREW_EXECUTOR_WORKERS", "4")),
+    thread_name_prefix="crew",
+)
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """
+    Exécute un appel bloquant court (Mongo, Twitter) hors de la boucle asyncio.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(IO_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+
+async def run_crew(func: Callable, *args, **kwargs) -> Any:
+    """
+    Exécute un traitement long et bloquant (crew.kickoff) hors de la boucle asyncio.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(CREW_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+
+class AsyncProxy:
+    """
+    Façade asynchrone d'un objet synchrone : chaque méthode appelée sur le proxy
+    devient une coroutine exécutée dans IO_EXECUTOR.
+
+        db = AsyncProxy(DataDatabase())
+        await db.has_responded(agent_id, conversation_id)
+    """
+    def __init__(self, target: Any):
+        self._target = target
+
+    @property
+    def sync(self) -> Any:
+        """Objet synchrone sous-jacent."""
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await run_io(attr, *args, **kwargs)
+
+        return call
+
+
+def shutdown_executors() -> None:
+    IO_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    CREW_EXECUTOR.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,196 @@
+# benchmarks/fakes.py
+
+import time
+import random
+import itertools
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import tweepy
+
+# Fenêtre des limites de l'API v2 (15 minutes)
+RATE_LIMIT_WINDOW_SECONDS = 15 * 60
+
+
+class FakeHTTPResponse:
+    """
+    Réponse HTTP minimale : en-têtes x-rate-limit-* (lus par le hook du RateLimiter)
+    et corps JSON pour construire les exceptions Tweepy.
+    """
+    def __init__(self, status_code: int = 200, headers: Optional[Dict] = None, body: Optional[Dict] = None):
+        self.status_code = status_code
+        self.reason = "Too Many Requests" if status_code == 429 else "OK"
+        self.headers = headers or {}
+        self._body = body or {}
+
+    def json(self):
+        return self._body
+
+
+class FakeTwitterService:
+    """
+    État partagé du faux Twitter : latence simulée, limites par (credentials, endpoint),
+    génération des mentions et compteurs pour le rapport.
+    """
+    def __init__(
+        self,
+        latency_ms: float = 80,
+        jitter_ms: float = 20,
+        mentions_per_poll: int = 5,
+        include_ratio: float = 0.8,
+        duplicate_text_ratio: float = 0.2,
+        rate_limits: Optional[Dict[str, int]] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.mentions_per_poll = mentions_per_poll
+        self.include_ratio = include_ratio
+        self.duplicate_text_ratio = duplicate_text_ratio
+        # Requêtes par fenêtre de 15 min et par credentials (valeurs proches de l'API v2)
+        self.rate_limits = rate_limits or {
+            "get_users_mentions": 180,
+            "get_tweets": 900,
+            "get_tweet": 900,
+            "create_tweet": 200,
+            "get_me": 75,
+        }
+        self._ids = itertools.count(10 ** 18)
+        self._windows: Dict[tuple, List] = {}
+        self._users: Dict[str, int] = {}
+        # Tweets parents absents des includes : servis par get_tweets / get_tweet
+        self.orphans: Dict[int, SimpleNamespace] = {}
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.rate_limited = 0
+        self.replies = 0
+        self.tweets = 0
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def user_id(self, access_token: str) -> int:
+        with self._lock:
+            if access_token not in self._users:
+                self._users[access_token] = self.next_id()
+            return self._users[access_token]
+
+    def sleep(self) -> None:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def consume(self, credential: str, endpoint: str) -> Dict[str, str]:
+        """
+        Décompte une requête ; lève TooManyRequests si la fenêtre est épuisée.
+        Retourne les en-têtes x-rate-limit-* de la réponse.
+        """
+        limit = self.rate_limits.get(endpoint, 900)
+        now = time.time()
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            window = self._windows.get((credential, endpoint))
+            if window is None or window[0] <= now:
+                window = self._windows[(credential, endpoint)] = [now + RATE_LIMIT_WINDOW_SECONDS, limit]
+            reset_at, remaining = window
+            if remaining <= 0:
+                self.rate_limited += 1
+                exhausted = True
+            else:
+                window[1] = remaining - 1
+                exhausted = False
+        headers = {
+            "x-rate-limit-limit": str(limit),
+            "x-rate-limit-remaining": str(max(0, window[1])),
+            "x-rate-limit-reset": str(int(reset_at)),
+        }
+        if exhausted:
+            response = FakeHTTPResponse(429, headers, {"title": "Too Many Requests", "detail": "Too Many Requests"})
+            raise tweepy.TooManyRequests(response)
+        return headers
+
+    def tweet(self, text: str, conversation_id: Optional[int] = None) -> SimpleNamespace:
+        tweet_id = self.next_id()
+        return SimpleNamespace(
+            id=tweet_id,
+            text=text,
+            conversation_id=conversation_id or tweet_id,
+            created_at=datetime.now(timezone.utc),
+            referenced_tweets=None,
+        )
+
+    def parent_text(self) -> str:
+        if random.random() < self.duplicate_text_ratio:
+            # Textes quasi identiques (campagnes, copier-coller) : exercent le cache de réponses
+            return f"What do you think about the market today? #{random.randint(1, 3)}"
+        return f"Question {self.next_id()}: what is your take on topic {random.randint(1, 10 ** 6)}?"
+
+
+class FakeTweepyClient:
+    """
+    Remplaçant de tweepy.Client pour les benchmarks : mêmes méthodes et mêmes formes
+    de réponse que celles utilisées par l'application, sans réseau.
+    """
+    service: FakeTwitterService = None  # positionné par install()
+
+    def __init__(self, bearer_token=None, consumer_key=None, consumer_secret=None,
+                 access_token=None, access_token_secret=None, **kwargs):
+        self.bearer_token = bearer_token
+        self.consumer_key = consumer_key
+        self.consumer_secret = consumer_secret
+        self.access_token = access_token
+        self.access_token_secret = access_token_secret
+        self.session = SimpleNamespace(hooks={"response": []})
+
+    def _call(self, endpoint: str) -> None:
+        self.service.sleep()
+        headers = self.service.consume(self.access_token, endpoint)
+        response = FakeHTTPResponse(200, headers)
+        for hook in self.session.hooks["response"]:
+            hook(response)
+
+    def get_me(self, **kwargs):
+        self._call("get_me")
+        user_id = self.service.user_id(self.access_token)
+        return tweepy.Response(SimpleNamespace(id=user_id, username=f"user{user_id}"), {}, [], {})
+
+    def get_users_mentions(self, id, **kwargs):
+        self._call("get_users_mentions")
+        service = self.service
+        mentions, included = [], []
+        for _ in range(service.mentions_per_poll):
+            parent = service.tweet(service.parent_text())
+            mentions.append(service.tweet(f"@user{id} {parent.text}", conversation_id=parent.id))
+            if random.random() < service.include_ratio:
+                included.append(parent)
+            else:
+                service.orphans[parent.id] = parent
+        return tweepy.Response(mentions, {"tweets": included}, [], {"result_count": len(mentions)})
+
+    def get_tweets(self, ids, **kwargs):
+        self._call("get_tweets")
+        tweets = [self.service.orphans.pop(int(i), None) for i in ids]
+        return tweepy.Response([t for t in tweets if t is not None], {}, [], {})
+
+    def get_tweet(self, id, **kwargs):
+        self._call("get_tweet")
+        return tweepy.Response(self.service.orphans.pop(int(id), None), {}, [], {})
+
+    def create_tweet(self, text=None, in_reply_to_tweet_id=None, **kwargs):
+        self._call("create_tweet")
+        tweet_id = self.service.next_id()
+        with self.service._lock:
+            if in_reply_to_tweet_id is not None:
+                self.service.replies += 1
+            else:
+                self.service.tweets += 1
+        return tweepy.Response({"id": str(tweet_id), "text": text}, {}, [], {})
+
+
+def install(service: FakeTwitterService) -> None:
+    """
+    Remplace tweepy.Client dans tout le processus (les modules l'appellent via tweepy.Client).
+    """
+    FakeTweepyClient.service = service
+    tweepy.Client = FakeTweepyClient
@@ -0,0 +1,340 @@
+# benchmarks/run.py
+"""
+Banc de charge hors ligne : Twitter simulé (benchmarks/fakes.py), LLM simulé
+(LLM_BACKEND=fake) et MongoDB en mémoire (mongomock) ou local (--mongo-uri).
+
+    python -m benchmarks.run                         # 10, 100, 1 000 et 10 000 agents
+    python -m benchmarks.run --scales 10,100 --rounds 2
+    python -m benchmarks.run --agents 1000 --json    # une seule échelle, résultat JSON
+
+Chaque échelle tourne dans un processus séparé (mémoire et caches indépendants) et mesure :
+réponses/min, latence p50/p99 des jobs de mentions et de tweet quotidien, latence de
+GET /agents pendant les passes de mentions, blocage de la boucle asyncio et mémoire par agent.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+DEFAULT_SCALES = (10, 100, 1000, 10000)
+MONGOMOCK_URI = "mongodb://benchmark.invalid:27017"
+
+
+# --------------------------------------------------------------------
+# Mesures
+# --------------------------------------------------------------------
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def rss_bytes() -> int:
+    """
+    Mémoire résidente courante (Linux : /proc ; sinon pic via resource).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class LoopMonitor:
+    """
+    Mesure le blocage de la boucle asyncio : retard de réveil d'un sleep périodique.
+    """
+    def __init__(self, interval: float = 0.01, threshold: float = 0.005):
+        self.interval = interval
+        self.threshold = threshold
+        self.blocked_seconds = 0.0
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - started - self.interval
+            if lag > self.threshold:
+                self.blocked_seconds += lag
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+# --------------------------------------------------------------------
+# Environnement simulé
+# --------------------------------------------------------------------
+def configure_environment(args) -> None:
+    """
+    Variables lues à l'import de main.py : à positionner avant tout import applicatif.
+    """
+    os.environ.setdefault("LLM_BACKEND", "fake")
+    os.environ.setdefault("LLM_FAKE_LATENCY_MS", str(args.llm_latency_ms))
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ.setdefault("SCHEDULER_JOBSTORE", "memory")
+    os.environ.setdefault("CLUSTER_MODE", "off")
+    os.environ.setdefault("DAILY_TWEET_EXECUTION", "inline")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("SERPER_API_KEY", "benchmark")
+    # Hors ligne : litellm ne télécharge pas sa table de coûts à l'import
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    os.environ["MONGO_URI"] = args.mongo_uri or MONGOMOCK_URI
+
+
+def install_fakes(args):
+    from benchmarks.fakes import FakeTwitterService, install
+    service = FakeTwitterService(
+        latency_ms=args.twitter_latency_ms,
+        mentions_per_poll=args.mentions_per_poll,
+        include_ratio=args.include_ratio,
+        duplicate_text_ratio=args.duplicate_text_ratio,
+    )
+    install(service)
+    if not args.mongo_uri:
+        import mongomock
+        import db
+        db._CLIENTS[MONGOMOCK_URI] = mongomock.MongoClient()
+    return service
+
+
+def fake_daily_tweet_crew(agent_id: str, personality_prompt: str) -> str:
+    """
+    Remplaçant du crew CrewAI : un appel au LLM simulé puis la vraie publication
+    (validation, client Tweepy en cache, rate limiter).
+    """
+    from llm_gateway import LLM_GATEWAY, agent_scope
+    from tools.post_tools import publish_tweet
+    llm = LLM_GATEWAY.chat_model("gpt-4o-2024-08-06", 0.8, os.getenv("OPENAI_API_KEY"))
+    with agent_scope(agent_id):
+        text = llm.invoke([("system", personality_prompt), ("human", "Write a tweet.")]).content
+    publish_tweet(agent_id, text)
+    return text
+
+
+def seed_agents(main, count: int) -> List[Dict]:
+    now = datetime.utcnow()
+    agents = []
+    for index in range(count):
+        agent_id = f"bench-{index:06d}"
+        fields = {
+            "agent_id": agent_id,
+            "name": f"@bench{index}",
+            "agent_name": f"Bench {index}",
+            "twitter_link": f"https://twitter.com/bench{index}",
+            "personality_prompt": "A curious and witty tech commentator.",
+            "TWITTER_API_KEY": f"key-{index}",
+            "TWITTER_API_SECRET_KEY": f"secret-{index}",
+            "TWITTER_ACCESS_TOKEN": f"token-{index}",
+            "TWITTER_ACCESS_TOKEN_SECRET": f"token-secret-{index}",
+            "TWITTER_BEARER_TOKEN": f"bearer-{index}",
+            "created_at": (now + timedelta(milliseconds=index)).isoformat(),
+        }
+        agents.append(fields)
+    main.AGENTS_DB.collection.insert_many([{"id": f"rec_{a['agent_id']}", "fields": dict(a)} for a in agents])
+    return agents
+
+
+async def timed(latencies: List[float], coro) -> None:
+    started = time.perf_counter()
+    try:
+        await coro
+    finally:
+        latencies.append(time.perf_counter() - started)
+
+
+async def probe_endpoint(client, path: str, latencies: List[float], stop: asyncio.Event, period: float) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(period)
+
+
+def summarize(latencies: List[float]) -> Dict:
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies, default=0) * 1000, 1),
+    }
+
+
+# --------------------------------------------------------------------
+# Scénario pour une échelle
+# --------------------------------------------------------------------
+async def run_scale(args) -> Dict:
+    configure_environment(args)
+    random.seed(args.seed)
+    service = install_fakes(args)
+
+    import httpx
+    import main
+    if not args.real_crew:
+        main.run_daily_tweet_crew = fake_daily_tweet_crew
+
+    await main.ASYNC_AGENTS_DB.ensure_indexes()
+    await main.ASYNC_LOCAL_DB.ensure_indexes()
+    main.REPLY_WRITER.start()
+
+    baseline_rss = rss_bytes()
+    agents = seed_agents(main, args.agents)
+    monitor = LoopMonitor()
+    monitor.start()
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Passes de mentions (le sémaphore global MENTIONS_MAX_CONCURRENT_JOBS s'applique),
+        # GET /agents sondé en parallèle
+        mention_latencies: List[float] = []
+        agents_latencies: List[float] = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_endpoint(client, "/agents?limit=100", agents_latencies, stop, 0.05))
+        replies_before = service.replies
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            await asyncio.gather(*(
+                timed(mention_latencies, main.execute_mentions_reply(fields["agent_id"]))
+                for fields in agents
+            ))
+        mentions_seconds = time.perf_counter() - started
+        replies = service.replies - replies_before
+        stop.set()
+        await probe
+
+        # Tweets quotidiens d'un échantillon d'agents
+        daily_latencies: List[float] = []
+        sample = agents[:min(len(agents), args.daily_agents)]
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            timed(daily_latencies, main.execute_daily_tweet(fields["agent_id"]))
+            for fields in sample
+        ))
+        daily_seconds = time.perf_counter() - started
+
+        # Autres endpoints, après la charge
+        endpoint_latencies: Dict[str, List[float]] = {}
+        for path in ("/agents?limit=100", "/agents?limit=100&order=desc", "/metrics", "/stats/replies"):
+            latencies = endpoint_latencies.setdefault(path, [])
+            for _ in range(20):
+                started_request = time.perf_counter()
+                (await client.get(path)).raise_for_status()
+                latencies.append(time.perf_counter() - started_request)
+
+    await main.REPLY_WRITER.stop()
+    await monitor.stop()
+    total_rss = rss_bytes()
+
+    return {
+        "agents": args.agents,
+        "rounds": args.rounds,
+        "replies": replies,
+        "replies_per_min": round(replies / mentions_seconds * 60, 1) if mentions_seconds else 0.0,
+        "mentions_seconds": round(mentions_seconds, 2),
+        "mention_job": summarize(mention_latencies),
+        "daily_tweet_job": {**summarize(daily_latencies), "seconds": round(daily_seconds, 2)},
+        "agents_endpoint_under_load": summarize(agents_latencies),
+        "endpoints": {path: summarize(latencies) for path, latencies in endpoint_latencies.items()},
+        "loop_blocked_seconds": round(monitor.blocked_seconds, 3),
+        "loop_max_lag_ms": round(monitor.max_lag * 1000, 1),
+        "rss_per_agent_kib": round((total_rss - baseline_rss) / max(1, args.agents) / 1024, 1),
+        "twitter_calls": service.calls,
+        "twitter_rate_limited": service.rate_limited,
+        "reply_cache": main.REPLY_CACHE.stats(),
+    }
+
+
+# --------------------------------------------------------------------
+# Orchestration et rapport
+# --------------------------------------------------------------------
+def print_report(results: List[Dict]) -> None:
+    header = (
+        f"{'agents':>7} {'replies/min':>12} {'mention p50':>12} {'mention p99':>12} "
+        f"{'daily p50':>10} {'daily p99':>10} {'/agents p99':>12} {'loop blocked':>13} {'KiB/agent':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['agents']:>7} {r['replies_per_min']:>12} "
+            f"{r['mention_job']['p50_ms']:>10}ms {r['mention_job']['p99_ms']:>10}ms "
+            f"{r['daily_tweet_job']['p50_ms']:>8}ms {r['daily_tweet_job']['p99_ms']:>8}ms "
+            f"{r['agents_endpoint_under_load']['p99_ms']:>10}ms {r['loop_blocked_seconds']:>12}s "
+            f"{r['rss_per_agent_kib']:>10}"
+        )
+
+
+def scale_command(args, agents: int) -> List[str]:
+    command = [sys.executable, "-m", "benchmarks.run", "--agents", str(agents), "--json"]
+    for option in ("rounds", "daily_agents", "mentions_per_poll", "twitter_latency_ms", "llm_latency_ms",
+                   "include_ratio", "duplicate_text_ratio", "seed"):
+        command += [f"--{option.replace('_', '-')}", str(getattr(args, option))]
+    if args.mongo_uri:
+        command += ["--mongo-uri", args.mongo_uri]
+    if args.real_crew:
+        command.append("--real-crew")
+    return command
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne des jobs et endpoints.")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="Nombres d'agents, un processus par échelle.")
+    parser.add_argument("--agents", type=int, help="Exécute une seule échelle dans ce processus.")
+    parser.add_argument("--rounds", type=int, default=1, help="Passes de mentions par agent.")
+    parser.add_argument("--daily-agents", type=int, default=200, help="Agents exécutant un tweet quotidien.")
+    parser.add_argument("--mentions-per-poll", type=int, default=5)
+    parser.add_argument("--twitter-latency-ms", type=float, default=80)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--include-ratio", type=float, default=0.8,
+                        help="Part des tweets parents fournis dans les includes.")
+    parser.add_argument("--duplicate-text-ratio", type=float, default=0.2,
+                        help="Part des tweets parents quasi identiques (cache de réponses).")
+    parser.add_argument("--mongo-uri", help="MongoDB local au lieu de mongomock.")
+    parser.add_argument("--real-crew", action="store_true", help="Exécute le vrai crew CrewAI (LLM simulé).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Sortie JSON (une échelle).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.agents:
+        result = asyncio.run(run_scale(args))
+        print(json.dumps(result) if args.json else json.dumps(result, indent=2))
+        return
+
+    results = []
+    for agents in (int(s) for s in args.scales.split(",") if s.strip()):
+        print(f"[benchmark] {agents} agent(s)...", file=sys.stderr)
+        output = subprocess.run(scale_command(args, agents), capture_output=True, text=True)
+        if output.returncode != 0:
+            print(output.stderr, file=sys.stderr)
+            raise SystemExit(f"Échelle {agents} en échec (code {output.returncode}).")
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,18 @@
 import os
-from langchain_openai  import ChatOpenAI
 from dotenv import load_dotenv
 
+from llm_gateway import LLM_GATEWAY
+
 load_dotenv()
 
 class ChatOpenAIManager:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
+        if not self.api_key and LLM_GATEWAY.backend != "fake":
             raise ValueError("OPENAI_API_KEY not found. Please check your .env file.")
 
     def create_llm(self, temperature=0.8, model="gpt-4o-2024-08-06"):
         """
-        Creates and returns a ChatOpenAI LLM instance.
+        Returns the shared LLM instance for this model/temperature (see llm_gateway.py).
         """
-        return ChatOpenAI(model=model, temperature=temperature, openai_api_key=self.api_key)
+        return LLM_GATEWAY.chat_model(model, temperature, self.api_key)
@@ -0,0 +1,181 @@
+# cluster.py
+
+import os
+import uuid
+import socket
+import hashlib
+import logging
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from aio import run_io
+
+logger = logging.getLogger(__name__)
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class MongoLeaseStore:
+    """
+    Registre des nœuds vivants et baux exclusifs, dans MongoDB (base "auto").
+    """
+    def __init__(self, client):
+        db = client["auto"]
+        self.nodes = db["cluster_nodes"]
+        self.leases = db["job_leases"]
+
+    def ensure_indexes(self) -> None:
+        # Nettoyage automatique des documents expirés (le contrôle d'expiration reste explicite)
+        self.nodes.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_ttl")
+        self.leases.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_ttl")
+
+    def heartbeat(self, node_id: str, ttl: float) -> None:
+        now = datetime.utcnow()
+        self.nodes.update_one(
+            {"_id": node_id},
+            {"$set": {"expires_at": now + timedelta(seconds=ttl), "heartbeat_at": now}},
+            upsert=True,
+        )
+
+    def live_nodes(self) -> List[str]:
+        cursor = self.nodes.find({"expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1})
+        return sorted(doc["_id"] for doc in cursor)
+
+    def remove_node(self, node_id: str) -> None:
+        self.nodes.delete_one({"_id": node_id})
+        self.leases.delete_many({"owner": node_id})
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = datetime.utcnow()
+        try:
+            doc = self.leases.find_one_and_update(
+                {"_id": key, "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Bail détenu (non expiré) par un autre nœud
+            return False
+        return doc is not None and doc.get("owner") == owner
+
+    def release(self, key: str, owner: str) -> None:
+        self.leases.delete_one({"_id": key, "owner": owner})
+
+
+class LocalLeaseStore:
+    """
+    Équivalent en mémoire de MongoLeaseStore (tests, nœud unique, plusieurs coordinateurs
+    dans le même processus).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, datetime] = {}
+        self._leases: Dict[str, Tuple[str, datetime]] = {}
+
+    def ensure_indexes(self) -> None:
+        pass
+
+    def heartbeat(self, node_id: str, ttl: float) -> None:
+        with self._lock:
+            self._nodes[node_id] = datetime.utcnow() + timedelta(seconds=ttl)
+
+    def live_nodes(self) -> List[str]:
+        now = datetime.utcnow()
+        with self._lock:
+            return sorted(node for node, expires_at in self._nodes.items() if expires_at > now)
+
+    def remove_node(self, node_id: str) -> None:
+        with self._lock:
+            self._nodes.pop(node_id, None)
+            for key, (owner, _) in list(self._leases.items()):
+                if owner == node_id:
+                    del self._leases[key]
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = datetime.utcnow()
+        with self._lock:
+            current = self._leases.get(key)
+            if current and current[0] != owner and current[1] > now:
+                return False
+            self._leases[key] = (owner, now + timedelta(seconds=ttl))
+            return True
+
+    def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            current = self._leases.get(key)
+            if current and current[0] == owner:
+                del self._leases[key]
+
+
+class ClusterCoordinator:
+    """
+    Répartition des agents entre les nœuds vivants (rendezvous hashing) et
+    exécution exclusive des jobs via des baux à expiration.
+
+    - heartbeat() : signale le nœud et rafraîchit la liste des nœuds vivants ;
+      retourne True si l'appartenance a changé (rééquilibrage nécessaire).
+    - owns(agent_id) : ce nœud est-il responsable de l'agent ?
+    - exclusive(key) : garantit un seul exécuteur par job, même pendant un rééquilibrage.
+    """
+    def __init__(self, store, node_id: Optional[str] = None, node_ttl: float = None):
+        self.store = store
+        self.node_id = node_id or default_node_id()
+        self.node_ttl = node_ttl or float(os.getenv("CLUSTER_NODE_TTL", "30"))
+        self.nodes: List[str] = [self.node_id]
+
+    def heartbeat(self) -> bool:
+        self.store.heartbeat(self.node_id, self.node_ttl)
+        nodes = self.store.live_nodes()
+        if self.node_id not in nodes:
+            nodes = sorted(nodes + [self.node_id])
+        changed = nodes != self.nodes
+        if changed:
+            logger.info("Cluster: %s nœud(s) vivant(s) (%s).", len(nodes), self.node_id)
+        self.nodes = nodes
+        return changed
+
+    def leave(self) -> None:
+        self.store.remove_node(self.node_id)
+
+    def owner_of(self, agent_id: str) -> str:
+        def score(node: str) -> int:
+            digest = hashlib.sha1(f"{node}|{agent_id}".encode("utf-8")).digest()
+            return int.from_bytes(digest[:8], "big")
+        return max(self.nodes, key=score)
+
+    def owns(self, agent_id: str) -> bool:
+        return self.owner_of(agent_id) == self.node_id
+
+    @asynccontextmanager
+    async def exclusive(self, key: str, ttl: float, release: bool = True):
+        """
+        Contexte async : `acquired` vaut False si un autre nœud détient déjà le bail.
+        Avec release=False, le bail reste posé jusqu'à expiration (anti-doublon
+        pour les jobs ponctuels comme le tweet quotidien).
+        """
+        acquired = await run_io(self.store.acquire, key, self.node_id, ttl)
+        try:
+            yield acquired
+        finally:
+            if acquired and release:
+                await run_io(self.store.release, key, self.node_id)
+
+
+def build_coordinator(mongo_client_factory) -> Optional[ClusterCoordinator]:
+    """
+    CLUSTER_MODE : "off" (défaut, un seul processus), "mongo" (baux partagés) ou "local".
+    """
+    mode = os.getenv("CLUSTER_MODE", "off").lower()
+    if mode == "mongo":
+        return ClusterCoordinator(MongoLeaseStore(mongo_client_factory()))
+    if mode == "local":
+        return ClusterCoordinator(LocalLeaseStore())
+    return None
@@ -0,0 +1,99 @@
+# credentials_store.py
+
+import os
+import threading
+from typing import Dict, Optional
+
+import tweepy
+
+from cache import TTLCache
+from db import AgentsDatabase
+from twitter_client import instrument_client
+
+CREDENTIAL_KEYS = (
+    "TWITTER_BEARER_TOKEN",
+    "TWITTER_API_KEY",
+    "TWITTER_API_SECRET_KEY",
+    "TWITTER_ACCESS_TOKEN",
+    "TWITTER_ACCESS_TOKEN_SECRET",
+)
+
+
+class AgentCredentialStore:
+    """
+    Dépôt des credentials Twitter des agents, adossé à l'index unique fields.agent_id,
+    avec un cache en mémoire (TTL + LRU) des credentials résolus et des clients Tweepy.
+    """
+    def __init__(self, agents_db: Optional[AgentsDatabase] = None, maxsize: int = None, ttl: float = None):
+        self._agents_db = agents_db
+        self._lock = threading.Lock()
+        maxsize = maxsize or int(os.getenv("CREDENTIALS_CACHE_SIZE", "1024"))
+        ttl = ttl or float(os.getenv("CREDENTIALS_CACHE_TTL", "900"))
+        self._credentials = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._clients = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @property
+    def agents_db(self) -> AgentsDatabase:
+        if self._agents_db is None:
+            with self._lock:
+                if self._agents_db is None:
+                    self._agents_db = AgentsDatabase()
+        return self._agents_db
+
+    def get_credentials(self, agent_id: str) -> Dict:
+        """
+        Retourne les credentials Twitter de l'agent (requête indexée, puis cache).
+        """
+        credentials = self._credentials.get(agent_id)
+        if credentials is not None:
+            return credentials
+
+        record = self.agents_db.find_by_agent_id(agent_id)
+        if not record:
+            raise ValueError(f"Erreur: Aucun agent trouvé pour agent_id={agent_id}")
+
+        fields = record.get("fields", {})
+        credentials = {key: fields.get(key) for key in CREDENTIAL_KEYS}
+        if not all(credentials.values()):
+            raise ValueError(f"Erreur: Certains credentials Twitter manquants pour l'agent_id={agent_id}")
+
+        self._credentials.set(agent_id, credentials)
+        return credentials
+
+    def get_client(self, agent_id: str) -> tweepy.Client:
+        """
+        Retourne le client Tweepy de l'agent, construit une seule fois tant qu'il reste en cache.
+        """
+        client = self._clients.get(agent_id)
+        if client is not None:
+            return client
+
+        credentials = self.get_credentials(agent_id)
+        try:
+            client = tweepy.Client(
+                bearer_token=credentials["TWITTER_BEARER_TOKEN"],
+                consumer_key=credentials["TWITTER_API_KEY"],
+                consumer_secret=credentials["TWITTER_API_SECRET_KEY"],
+                access_token=credentials["TWITTER_ACCESS_TOKEN"],
+                access_token_secret=credentials["TWITTER_ACCESS_TOKEN_SECRET"],
+            )
+        except Exception as e:
+            raise ValueError(f"Impossible de configurer Tweepy pour l'agent {agent_id}. Erreur: {str(e)}")
+
+        instrument_client(client)
+        self._clients.set(agent_id, client)
+        return client
+
+    def invalidate(self, agent_id: str) -> None:
+        """
+        À appeler dès qu'un agent est créé, modifié ou supprimé.
+        """
+        self._credentials.invalidate(agent_id)
+        self._clients.invalidate(agent_id)
+
+    def stats(self) -> Dict:
+        return {"credentials": self._credentials.stats(), "clients": self._clients.stats()}
+
+
+# Instance partagée par le processus
+CREDENTIALS_STORE = AgentCredentialStore()
@@ -0,0 +1,111 @@
+# crew_llm.py
+
+from typing import Any, Dict, List, Optional
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM, llm_call_context
+from langchain_core.language_models.chat_models import BaseChatModel
+from pydantic import ConfigDict, Field
+
+from llm_gateway import LLM_GATEWAY
+
+# Rôles CrewAI -> rôles des messages LangChain
+_ROLES = {"system": "system", "user": "human", "assistant": "ai"}
+
+
+class GatewayCrewLLM(BaseLLM):
+    """
+    LLM CrewAI adossé au modèle LangChain partagé de la passerelle (llm_gateway.py) :
+    même pool HTTP keep-alive, même timeout, comptabilité des tokens par agent
+    (TokenUsageCallback) et backend "fake" hors ligne. CrewAI reçoit un BaseLLM et
+    ne reconstruit donc pas son propre client litellm à partir du nom du modèle.
+
+    Pas d'appel de fonctions natif : l'agent utilise le format texte ReAct
+    (Action / Observation), les mots d'arrêt étant appliqués à la réponse.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    llm_type: str = "gateway"
+    chat_model: BaseChatModel = Field(exclude=True)
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    @staticmethod
+    def _to_langchain(messages: List[Dict]) -> List:
+        return [(_ROLES.get(m["role"], "human"), m["content"]) for m in messages]
+
+    def _finish(self, message, formatted: List[Dict], from_task, from_agent) -> str:
+        usage = (getattr(message, "response_metadata", None) or {}).get("token_usage")
+        if usage:
+            self._track_token_usage_internal(usage)
+        text = self._apply_stop_words(str(message.content))
+        text = self._invoke_after_llm_call_hooks(formatted, text, from_agent)
+        self._emit_call_completed_event(
+            response=text,
+            call_type=LLMCallType.LLM_CALL,
+            from_task=from_task,
+            from_agent=from_agent,
+            messages=formatted,
+            usage=usage,
+        )
+        return text
+
+    def call(
+        self,
+        messages,
+        tools: Optional[List[Dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ) -> str:
+        """
+        Appel synchrone (crew.kickoff dans un thread ou un processus du worker).
+        """
+        with llm_call_context():
+            formatted = self._format_messages(messages)
+            self._emit_call_started_event(messages=formatted, from_task=from_task, from_agent=from_agent)
+            self._invoke_before_llm_call_hooks(formatted, from_agent)
+            try:
+                message = self.chat_model.invoke(self._to_langchain(formatted), stop=self.stop_sequences or None)
+            except Exception as e:
+                self._emit_call_failed_event(error=str(e), from_task=from_task, from_agent=from_agent)
+                raise
+            return self._finish(message, formatted, from_task, from_agent)
+
+    async def acall(
+        self,
+        messages,
+        tools: Optional[List[Dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ) -> str:
+        """
+        Appel async : passe par LLM_GATEWAY.ainvoke (limite par modèle, hedging, timeout global).
+        """
+        with llm_call_context():
+            formatted = self._format_messages(messages)
+            self._emit_call_started_event(messages=formatted, from_task=from_task, from_agent=from_agent)
+            self._invoke_before_llm_call_hooks(formatted, from_agent)
+            try:
+                message = await LLM_GATEWAY.ainvoke(self.chat_model, self._to_langchain(formatted))
+            except Exception as e:
+                self._emit_call_failed_event(error=str(e), from_task=from_task, from_agent=from_agent)
+                raise
+            return self._finish(message, formatted, from_task, from_agent)
+
+
+def crew_llm(chat_model: BaseChatModel) -> GatewayCrewLLM:
+    """
+    Enveloppe CrewAI d'un modèle obtenu via LLM_GATEWAY.chat_model.
+    """
+    return GatewayCrewLLM(
+        model=chat_model.model_name,
+        temperature=getattr(chat_model, "temperature", None),
+        chat_model=chat_model,
+    )
@@ -0,0 +1,133 @@
+# crews.py
+
+import time
+import logging
+import threading
+
+from crewai import Crew
+from crewai.process import Process
+
+from agents import CreativeSystemAgents
+from tasks import GenerateCreativeTweetsTask
+from tools.post_tools import publish_tweet, validate_tweet_text, TWEET_MAX_LENGTH, TWEET_HASHTAGS
+from llm_gateway import agent_scope
+from metrics import observe_stage
+from logging_config import CREW_VERBOSE
+
+logger = logging.getLogger(__name__)
+
+_agents_system = None
+_agents_system_lock = threading.Lock()
+
+# Temps de préparation (construction agents/tâches/crew) et d'exécution des crews
+CREW_TIMINGS = {"runs": 0, "setup_seconds_total": 0.0, "last_setup_seconds": None, "kickoff_seconds_total": 0.0}
+_timings_lock = threading.Lock()
+
+
+def get_agents_system() -> CreativeSystemAgents:
+    """
+    Système d'agents CrewAI du processus (créé au premier appel).
+    """
+    global _agents_system
+    if _agents_system is None:
+        with _agents_system_lock:
+            if _agents_system is None:
+                _agents_system = CreativeSystemAgents()
+    return _agents_system
+
+
+def warm_up() -> float:
+    """
+    Construit à l'avance LLM, outils de recherche et vector store ; retourne la durée.
+    """
+    started = time.perf_counter()
+    get_agents_system().warm_up()
+    elapsed = time.perf_counter() - started
+    logger.info("Agents CrewAI préchauffés en %.2fs.", elapsed)
+    return elapsed
+
+
+def crew_timings() -> dict:
+    with _timings_lock:
+        timings = dict(CREW_TIMINGS)
+    runs = timings["runs"]
+    return {
+        **timings,
+        "avg_setup_seconds": timings["setup_seconds_total"] / runs if runs else None,
+        "avg_kickoff_seconds": timings["kickoff_seconds_total"] / runs if runs else None,
+    }
+
+
+REVISION_PROMPT = (
+    "You fix tweets that were rejected before publication. Keep the meaning, tone and "
+    f"references of the draft, stay under {TWEET_MAX_LENGTH} characters and include exactly "
+    f"{TWEET_HASHTAGS} hashtags. Return only the tweet text, without quotes or commentary."
+)
+
+
+def revise_tweet(agent_id: str, personality_prompt: str, draft: str, error: str) -> str:
+    """
+    Un seul tour LLM pour corriger un tweet refusé par validate_tweet_text,
+    l'erreur de validation étant renvoyée au modèle.
+    """
+    messages = [
+        ("system", REVISION_PROMPT),
+        ("human", f'Personality: "{personality_prompt}"\nDraft: {draft}\nRejected because: {error}'),
+    ]
+    with agent_scope(agent_id):
+        return get_agents_system().llm.invoke(messages).content
+
+
+def run_daily_tweet_crew(agent_id: str, personality_prompt: str):
+    """
+    Construit et exécute (de façon synchrone) le crew de génération, puis publie
+    directement le tweet produit (validation + client Tweepy en cache), sans tour
+    LLM supplémentaire pour décider d'appeler l'outil de publication.
+    Un tweet refusé par la validation est corrigé une fois (revise_tweet) avant d'abandonner.
+    Utilisé par l'API (mode inline) et par les processus du worker (python -m worker).
+    """
+    started = time.perf_counter()
+    agents_system = get_agents_system()
+
+    # Un seul agent : la génération. La publication est une étape déterministe.
+    creative_agent = agents_system.creative_tweet_agent()
+    generate_task = GenerateCreativeTweetsTask(
+        agent=creative_agent,
+        personality_prompt=personality_prompt,
+        tweets_text=""
+    )
+
+    crew = Crew(
+        agents=[creative_agent],
+        tasks=[generate_task],
+        process=Process.sequential,
+        verbose=CREW_VERBOSE
+    )
+    setup_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        with agent_scope(agent_id):
+            result = crew.kickoff()
+    finally:
+        kickoff_seconds = time.perf_counter() - started
+        with _timings_lock:
+            CREW_TIMINGS["runs"] += 1
+            CREW_TIMINGS["setup_seconds_total"] += setup_seconds
+            CREW_TIMINGS["last_setup_seconds"] = setup_seconds
+            CREW_TIMINGS["kickoff_seconds_total"] += kickoff_seconds
+        observe_stage("crew_setup", setup_seconds, agent_id)
+        observe_stage("crew_kickoff", kickoff_seconds, agent_id)
+        logger.info(
+            "[Agent %s] Crew: préparation %.0f ms, exécution %.1fs.",
+            agent_id, setup_seconds * 1000, kickoff_seconds,
+        )
+
+    tweet_text = getattr(result, "raw", None) or str(result)
+    try:
+        tweet_text = validate_tweet_text(tweet_text)
+    except ValueError as e:
+        logger.warning("[Agent %s] Tweet refusé (%s), correction demandée au modèle.", agent_id, e)
+        tweet_text = validate_tweet_text(revise_tweet(agent_id, personality_prompt, tweet_text, str(e)))
+    publish_tweet(agent_id, tweet_text)
+    return f"Tweet publié avec succès: {tweet_text}"
@@ -2,18 +2,167 @@
 
 import os
 import time
-from pymongo import MongoClient
-from typing import List, Dict, Optional
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pymongo import MongoClient, ASCENDING, DESCENDING, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import OperationFailure, DuplicateKeyError
+from typing import List, Dict, Optional, Iterable, Set
+
+from metrics import MONGO_COMMAND_METRICS
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------
+# Registre process-wide des clients MongoDB (un pool par URI)
+# --------------------------------------------------------------------
+class ConnectionPoolCounter(monitoring.ConnectionPoolListener):
+    """
+    Compte les connexions ouvertes / empruntées sur les pools des clients partagés.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.pools = 0
+
+    def _incr(self, attr: str, delta: int = 1) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + delta)
+
+    def pool_created(self, event):
+        self._incr("pools")
+
+    def pool_closed(self, event):
+        self._incr("pools", -1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr("closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        self._incr("checked_out")
+
+    def connection_checked_in(self, event):
+        self._incr("checked_out", -1)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "pools": self.pools,
+                "open_connections": self.created - self.closed,
+                "checked_out_connections": self.checked_out,
+                "connections_created_total": self.created,
+                "connections_closed_total": self.closed,
+            }
+
+
+POOL_COUNTER = ConnectionPoolCounter()
+_CLIENTS: Dict[str, MongoClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _mongo_client_options() -> Dict:
+    """
+    Options de pool/timeouts, configurables par variables d'environnement.
+    """
+    return {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000")),
+        "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+    }
+
+
+def get_mongo_client(mongo_uri: Optional[str] = None) -> MongoClient:
+    """
+    Retourne le MongoClient partagé du processus (créé au premier appel).
+    """
+    mongo_uri = mongo_uri or os.environ.get("MONGO_URI")
+    if not mongo_uri:
+        raise ValueError("MongoDB URI not provided. Please set the MONGO_URI environment variable.")
+    client = _CLIENTS.get(mongo_uri)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(mongo_uri)
+            if client is None:
+                client = MongoClient(mongo_uri, event_listeners=[POOL_COUNTER, MONGO_COMMAND_METRICS], **_mongo_client_options())
+                _CLIENTS[mongo_uri] = client
+                logger.info("MongoClient partagé créé.")
+    return client
+
+
+def close_mongo_clients() -> None:
+    """
+    Ferme tous les clients partagés (hook d'arrêt de l'application).
+    """
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
+    logger.info("MongoClients partagés fermés.")
+
+
+def mongo_pool_stats() -> Dict:
+    stats = POOL_COUNTER.snapshot()
+    stats["clients"] = len(_CLIENTS)
+    stats["max_pool_size"] = _mongo_client_options()["maxPoolSize"]
+    return stats
+
+TWITTER_KEY_FIELDS = (
+    "fields.TWITTER_API_KEY",
+    "fields.TWITTER_API_SECRET_KEY",
+    "fields.TWITTER_ACCESS_TOKEN",
+    "fields.TWITTER_ACCESS_TOKEN_SECRET",
+)
+# Champs d'un agent exposables par l'API (jamais les secrets Twitter/OpenAI)
+AGENT_PUBLIC_FIELDS = ("agent_id", "agent_name", "name", "twitter_link", "personality_prompt", "created_at")
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    pymongo renvoie des datetimes naïfs en UTC : les rend comparables aux datetimes aware.
+    """
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def new_record_id() -> str:
+    """
+    Identifiant d'enregistrement sans collision (l'horodatage en ms pouvait se répéter).
+    """
+    return f"rec_{uuid.uuid4().hex}"
+
 
 class AgentsDatabase:
     """
     Accès aux données des agents dans la base de données "auto", collection "agentx".
     """
     def __init__(self):
-        self.mongo_uri = os.environ.get("MONGO_URI")
-        if not self.mongo_uri:
-            raise ValueError("MongoDB URI not provided. Please set the MONGO_URI environment variable.")
-        self.client = MongoClient(self.mongo_uri)
+        self.client = get_mongo_client()
         self.db = self.client["auto"]
         self.collection = self.db["agentx"]
 
@@ -21,13 +170,137 @@ class AgentsDatabase:
         return list(self.collection.find({}, {"_id": 0}))
 
     def insert(self, fields: Dict) -> Dict:
-        new_id = f"rec_{int(time.time() * 1000)}"
-        record = {"id": new_id, "fields": fields}
+        record = {"id": new_record_id(), "fields": fields}
         self.collection.insert_one(record)
         return record
 
+    def insert_unique(self, fields: Dict) -> Optional[Dict]:
+        """
+        Insère l'agent ; retourne None si les index uniques (agent_id, clés Twitter)
+        signalent un doublon, y compris lors de créations concurrentes.
+        """
+        try:
+            return self.insert(fields)
+        except DuplicateKeyError:
+            return None
+
+    def delete_by_agent_id(self, agent_id: str) -> bool:
+        return self.collection.delete_one({"fields.agent_id": agent_id}).deleted_count > 0
+
+    def ensure_indexes(self) -> None:
+        """
+        Crée (si besoin) les index uniques sur fields.agent_id et sur le quadruplet
+        de clés Twitter utilisé par find_by_api_keys. Idempotent.
+        """
+        indexes = [
+            ([("fields.agent_id", ASCENDING)], "agent_id_unique"),
+            ([(key, ASCENDING) for key in TWITTER_KEY_FIELDS], "twitter_keys_unique"),
+        ]
+        for keys, name in indexes:
+            try:
+                self.collection.create_index(keys, name=name, unique=True)
+            except OperationFailure as e:
+                # Doublons historiques : on garde l'application fonctionnelle sans l'unicité.
+                logger.error("Index unique %s impossible sur agentx (%s); création non unique.", name, e)
+                self.collection.create_index(keys, name=f"{name}_nonunique")
+        # Pagination par clé (created_at, agent_id) de list_public
+        self.collection.create_index(
+            [("fields.created_at", ASCENDING), ("fields.agent_id", ASCENDING)],
+            name="created_at_idx",
+        )
+
+    def list_public(
+        self,
+        limit: int = 100,
+        after: Optional[tuple] = None,
+        descending: bool = False,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Page d'agents triée par (created_at, agent_id), projetée côté serveur sur
+        AGENT_PUBLIC_FIELDS. after = (created_at, agent_id) du dernier agent de la page
+        précédente (pagination par clé : coût constant quelle que soit la page).
+        Les anciens agents sans created_at sont classés avant tous les autres.
+        """
+        conditions = []
+        if created_after or created_before:
+            created = {}
+            if created_after:
+                created["$gte"] = created_after
+            if created_before:
+                created["$lt"] = created_before
+            conditions.append({"fields.created_at": created})
+        if after is not None:
+            created_at, agent_id = after
+            op = "$lt" if descending else "$gt"
+            same = {"fields.created_at": created_at, "fields.agent_id": {op: agent_id}}
+            if created_at is None:
+                # Avant tous les agents datés : la suite (croissante) comprend tous les agents datés
+                branches = [same] if descending else [same, {"fields.created_at": {"$type": "string"}}]
+            else:
+                branches = [same, {"fields.created_at": {op: created_at}}]
+                if descending:
+                    branches.append({"fields.created_at": None})
+            conditions.append({"$or": branches})
+        query = {"$and": conditions} if conditions else {}
+        direction = DESCENDING if descending else ASCENDING
+        projection = {"_id": 0}
+        projection.update({f"fields.{field}": 1 for field in AGENT_PUBLIC_FIELDS})
+        cursor = self.collection.find(query, projection) \
+            .sort([("fields.created_at", direction), ("fields.agent_id", direction)]) \
+            .limit(limit)
+        return [doc.get("fields", {}) for doc in cursor]
+
+    def iter_scheduling_records(self, batch_size: int = 1000):
+        """
+        Parcourt tous les agents avec uniquement les champs nécessaires à la planification
+        (les credentials sont résolus à l'exécution des jobs).
+        """
+        projection = {"_id": 0, "fields.agent_id": 1, "fields.next_daily_tweet_at": 1}
+        return self.collection.find({}, projection, batch_size=batch_size)
+
+    def find_existing_agent_ids(self, agent_ids: Iterable[str]) -> Set[str]:
+        """
+        Retourne le sous-ensemble des agent_ids encore présents (requête indexée, projection minimale).
+        """
+        ids = list(agent_ids)
+        if not ids:
+            return set()
+        cursor = self.collection.find({"fields.agent_id": {"$in": ids}}, {"_id": 0, "fields.agent_id": 1})
+        return {doc["fields"]["agent_id"] for doc in cursor}
+
+    def find_personality_prompts(self, agent_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        {agent_id: personality_prompt} des agents demandés (une requête $in, projection minimale).
+        """
+        ids = list(agent_ids)
+        if not ids:
+            return {}
+        projection = {"_id": 0, "fields.agent_id": 1, "fields.personality_prompt": 1}
+        cursor = self.collection.find({"fields.agent_id": {"$in": ids}}, projection)
+        return {
+            doc["fields"]["agent_id"]: doc["fields"]["personality_prompt"]
+            for doc in cursor
+            if doc["fields"].get("personality_prompt")
+        }
+
+    def set_next_daily_tweet(self, agent_id: str, run_at: datetime) -> None:
+        """
+        Mémorise la prochaine exécution du tweet quotidien de l'agent : le nœud qui
+        reprend l'agent (rééquilibrage, redémarrage) la respecte au lieu de republier.
+        """
+        self.collection.update_one(
+            {"fields.agent_id": agent_id},
+            {"$set": {"fields.next_daily_tweet_at": run_at}},
+        )
+
+    def get_next_daily_tweet(self, agent_id: str) -> Optional[datetime]:
+        doc = self.collection.find_one({"fields.agent_id": agent_id}, {"_id": 0, "fields.next_daily_tweet_at": 1})
+        return as_utc(((doc or {}).get("fields") or {}).get("next_daily_tweet_at"))
+
     def find_by_agent_id(self, agent_id: str) -> Optional[Dict]:
-        return self.collection.find_one({"id": agent_id}, {"_id": 0})
+        return self.collection.find_one({"fields.agent_id": agent_id}, {"_id": 0})
 
     def find_by_api_keys(
         self,
@@ -51,18 +324,335 @@ class DataDatabase:
     Ces données sont utilisées, par exemple, pour stocker les réponses aux mentions.
     """
     def __init__(self):
-        self.mongo_uri = os.environ.get("MONGO_URI")
-        if not self.mongo_uri:
-            raise ValueError("MongoDB URI not provided. Please set the MONGO_URI environment variable.")
-        self.client = MongoClient(self.mongo_uri)
+        self.client = get_mongo_client()
         self.db = self.client["db"]
         self.collection = self.db["data"]
+        # Curseur de mentions par agent (_id = agent_id) : dernier tweet ID traité
+        self.cursors = self.db["mention_cursors"]
 
     def get_all(self, view="Grid view") -> List[Dict]:
         return list(self.collection.find({}, {"_id": 0}))
 
     def insert(self, fields: Dict) -> Dict:
-        new_id = f"rec_{int(time.time() * 1000)}"
-        record = {"id": new_id, "fields": fields}
+        record = {"id": new_record_id(), "fields": fields}
         self.collection.insert_one(record)
         return record
+
+    def ensure_indexes(self) -> None:
+        """
+        Crée (si besoin) l'index composé utilisé par la détection des doublons de réponses.
+        Idempotent : à appeler une fois au démarrage.
+        """
+        self.collection.create_index(
+            [("fields.agent_id", ASCENDING), ("fields.mentioned_conversation_tweet_id", ASCENDING)],
+            name="agent_conversation_idx",
+        )
+
+    @staticmethod
+    def _agent_scope(agent_id: str) -> Dict:
+        # Les anciens enregistrements n'ont pas de champ agent_id : on les inclut
+        # pour ne pas répondre une seconde fois à une conversation déjà traitée.
+        return {"$in": [agent_id, None]}
+
+    def has_responded(self, agent_id: str, conversation_id: str) -> bool:
+        """
+        Indique si l'agent a déjà répondu à la conversation (requête indexée).
+        """
+        query = {
+            "fields.agent_id": self._agent_scope(agent_id),
+            "fields.mentioned_conversation_tweet_id": str(conversation_id),
+        }
+        return self.collection.find_one(query, {"_id": 1}) is not None
+
+    def find_responded_conversation_ids(self, agent_id: str, conversation_ids: Iterable[str]) -> Set[str]:
+        """
+        Retourne, en un seul aller-retour, le sous-ensemble des conversation_ids
+        auxquels l'agent a déjà répondu.
+        """
+        ids = list({str(cid) for cid in conversation_ids})
+        if not ids:
+            return set()
+        query = {
+            "fields.agent_id": self._agent_scope(agent_id),
+            "fields.mentioned_conversation_tweet_id": {"$in": ids},
+        }
+        cursor = self.collection.find(query, {"_id": 0, "fields.mentioned_conversation_tweet_id": 1})
+        return {doc["fields"]["mentioned_conversation_tweet_id"] for doc in cursor}
+
+    @staticmethod
+    def reply_key(agent_id: str, conversation_id: str) -> str:
+        return f"{agent_id}:{conversation_id}"
+
+    def claim_reply(self, agent_id: str, conversation_id: str) -> bool:
+        """
+        Marqueur durable (status "posting") posé AVANT la publication d'une réponse.
+        Retourne False si la conversation a déjà un enregistrement (réponse publiée,
+        en cours ou interrompue par un crash) : elle ne reçoit jamais deux réponses.
+        """
+        conversation_id = str(conversation_id)
+        result = self.collection.update_one(
+            {"_id": self.reply_key(agent_id, conversation_id)},
+            {"$setOnInsert": {"id": new_record_id(), "fields": {
+                "agent_id": agent_id,
+                "mentioned_conversation_tweet_id": conversation_id,
+                "status": "posting",
+                "claimed_at": datetime.utcnow().isoformat(),
+            }}},
+            upsert=True,
+        )
+        return result.upserted_id is not None
+
+    def release_reply(self, agent_id: str, conversation_id: str) -> None:
+        """
+        Retire un marqueur "posting" quand Twitter a refusé la publication (rien n'a été publié).
+        """
+        self.collection.delete_one({
+            "_id": self.reply_key(agent_id, str(conversation_id)),
+            "fields.status": "posting",
+        })
+
+    def upsert_replies(self, records: List[Dict]) -> int:
+        """
+        Écrit un lot d'enregistrements de réponse ({"id", "fields"}) en un seul bulk_write.
+        _id = agent_id:conversation_id et $setOnInsert : rejouer un lot (après un échec
+        partiel) ne crée jamais de doublon ; un marqueur "posting" (claim_reply) est complété.
+        Retourne le nombre d'enregistrements créés ou complétés.
+        """
+        if not records:
+            return 0
+        operations = []
+        for record in records:
+            key = self.reply_key(record["fields"]["agent_id"], record["fields"]["mentioned_conversation_tweet_id"])
+            operations.append(UpdateOne({"_id": key}, {"$setOnInsert": record}, upsert=True))
+            operations.append(UpdateOne({"_id": key, "fields.status": "posting"}, {"$set": {"fields": record["fields"]}}))
+        result = self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    def get_mention_state(self, agent_id: str) -> Dict:
+        """
+        Retourne l'état du curseur de mentions de l'agent : newest_id (since_id) et,
+        pendant un rattrapage, until_id / pending_newest_id (cf. polling.advance_mention_cursor).
+        """
+        doc = self.cursors.find_one({"_id": agent_id}, {"newest_id": 1, "until_id": 1, "pending_newest_id": 1})
+        return {key: (doc or {}).get(key) for key in ("newest_id", "until_id", "pending_newest_id")}
+
+    def set_mention_cursors(self, states: Dict[str, Dict]) -> None:
+        """
+        Écrit en un seul bulk_write l'état du curseur de plusieurs agents.
+        newest_id ne recule jamais ($max) ; until_id / pending_newest_id sont remplacés.
+        """
+        if not states:
+            return
+        now = time.time()
+        operations = []
+        for agent_id, state in states.items():
+            update = {"$set": {
+                "updated_at": now,
+                "until_id": state.get("until_id"),
+                "pending_newest_id": state.get("pending_newest_id"),
+            }}
+            if state.get("newest_id") is not None:
+                update["$max"] = {"newest_id": int(state["newest_id"])}
+            operations.append(UpdateOne({"_id": agent_id}, update, upsert=True))
+        self.cursors.bulk_write(operations, ordered=False)
+
+
+class TweetJobsDatabase:
+    """
+    File des tweets quotidiens à générer, dans la base "auto", collection "tweet_jobs".
+    Alimentée par l'API (DAILY_TWEET_EXECUTION=worker), consommée par `python -m worker`.
+    """
+    def __init__(self):
+        self.client = get_mongo_client()
+        self.db = self.client["auto"]
+        self.collection = self.db["tweet_jobs"]
+
+    def ensure_indexes(self) -> None:
+        self.collection.create_index(
+            [("status", ASCENDING), ("available_at", ASCENDING)],
+            name="status_available_idx",
+        )
+        self.collection.create_index([("agent_id", ASCENDING)], name="agent_idx")
+
+    def enqueue(self, agent_id: str, personality_prompt: str, max_attempts: int = 3) -> str:
+        job_id = f"job_{uuid.uuid4().hex}"
+        now = datetime.utcnow()
+        self.collection.insert_one({
+            "_id": job_id,
+            "agent_id": agent_id,
+            "personality_prompt": personality_prompt,
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "available_at": now,
+            "created_at": now,
+        })
+        return job_id
+
+    def fail_expired(self) -> int:
+        """
+        Passe en échec définitif les jobs "running" dont le bail a expiré (worker disparu) :
+        le crew a pu publier avant de mourir, le job n'est donc jamais relancé.
+        Retourne le nombre de jobs concernés.
+        """
+        now = datetime.utcnow()
+        result = self.collection.update_many(
+            {"status": "running", "lease_expires_at": {"$lte": now}},
+            {"$set": {"status": "failed", "error": "Bail expiré : worker disparu pendant l'exécution.",
+                      "finished_at": now},
+             "$unset": {"lease_expires_at": ""}},
+        )
+        return result.modified_count
+
+    def claim_next(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Réserve atomiquement le prochain job disponible. Les jobs d'un worker disparu
+        ne sont pas repris (cf. fail_expired).
+        """
+        expired = self.fail_expired()
+        if expired:
+            logger.warning("%s job(s) de tweet en échec : worker disparu pendant l'exécution.", expired)
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {"status": "pending", "available_at": {"$lte": now}},
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "started_at": now,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def complete(self, job_id: str, result: str) -> None:
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "done", "result": result, "finished_at": datetime.utcnow()},
+             "$unset": {"lease_expires_at": ""}},
+        )
+
+    def fail(self, job: Dict, error: str, retry_delay_seconds: float, retryable: bool = True) -> str:
+        """
+        Replanifie le job (backoff) tant qu'il reste des tentatives, sinon le marque en échec.
+        retryable=False : échec définitif (ex. crew hors délai, le tweet a pu être publié).
+        """
+        retry = retryable and job.get("attempts", 1) < job.get("max_attempts", 1)
+        update = {"status": "pending" if retry else "failed", "error": error}
+        if retry:
+            delay = retry_delay_seconds * (2 ** (job.get("attempts", 1) - 1))
+            update["available_at"] = datetime.utcnow() + timedelta(seconds=delay)
+        else:
+            update["finished_at"] = datetime.utcnow()
+        self.collection.update_one({"_id": job["_id"]}, {"$set": update, "$unset": {"lease_expires_at": ""}})
+        return update["status"]
+
+    def counts(self) -> Dict[str, int]:
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {doc["_id"]: doc["count"] for doc in self.collection.aggregate(pipeline)}
+
+
+class OnboardingJobsDatabase:
+    """
+    Progression des onboardings groupés (POST /agents/batch), dans la base "auto",
+    collection "onboarding_jobs" : visible depuis tous les nœuds / workers de l'API.
+    Les documents expirent ONBOARDING_JOBS_TTL secondes après leur création (index TTL).
+    """
+    def __init__(self):
+        self.client = get_mongo_client()
+        self.db = self.client["auto"]
+        self.collection = self.db["onboarding_jobs"]
+
+    def ensure_indexes(self) -> None:
+        self.collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_ttl")
+
+    def create(self, job_id: str, total: int, ttl_seconds: float) -> Dict:
+        now = datetime.utcnow()
+        job = {
+            "_id": job_id,
+            "status": "running",
+            "total": total,
+            "created": 0,
+            "failed": 0,
+            "results": [{"status": "pending"} for _ in range(total)],
+            "started_at": now.isoformat(),
+            "expires_at": now + timedelta(seconds=ttl_seconds),
+        }
+        self.collection.insert_one(job)
+        return job
+
+    def set_result(self, job_id: str, index: int, result: Dict) -> None:
+        """
+        Enregistre le résultat d'un agent du lot (result["status"] : "created" ou "failed").
+        """
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {f"results.{index}": result}, "$inc": {result["status"]: 1}},
+        )
+
+    def finish(self, job_id: str) -> None:
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "done", "finished_at": datetime.utcnow().isoformat()}},
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        job = self.collection.find_one({"_id": job_id}, {"expires_at": 0})
+        if job is not None:
+            job["job_id"] = job.pop("_id")
+        return job
+
+
+class TweetDraftsDatabase:
+    """
+    Brouillons de tweets générés à l'avance, dans la base "auto", collection "tweet_drafts".
+    Le job quotidien dépile le plus ancien brouillon de l'agent et le publie.
+    """
+    def __init__(self):
+        self.client = get_mongo_client()
+        self.db = self.client["auto"]
+        self.collection = self.db["tweet_drafts"]
+
+    def ensure_indexes(self) -> None:
+        self.collection.create_index(
+            [("agent_id", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING)],
+            name="agent_status_created_idx",
+        )
+
+    def push_drafts(self, agent_id: str, texts: List[str]) -> int:
+        if not texts:
+            return 0
+        now = datetime.utcnow()
+        self.collection.insert_many([
+            {"_id": f"draft_{uuid.uuid4().hex}", "agent_id": agent_id, "text": text,
+             "status": "queued", "created_at": now + timedelta(microseconds=i)}
+            for i, text in enumerate(texts)
+        ])
+        return len(texts)
+
+    def pop_draft(self, agent_id: str) -> Optional[Dict]:
+        """
+        Réserve atomiquement le plus ancien brouillon en attente de l'agent.
+        """
+        return self.collection.find_one_and_update(
+            {"agent_id": agent_id, "status": "queued"},
+            {"$set": {"status": "posting", "claimed_at": datetime.utcnow()}},
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def mark(self, draft_id: str, status: str, **fields) -> None:
+        self.collection.update_one({"_id": draft_id}, {"$set": {"status": status, **fields}})
+
+    def queued_counts(self, agent_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        Nombre de brouillons en attente par agent, en une seule agrégation.
+        """
+        pipeline = [
+            {"$match": {"agent_id": {"$in": list(agent_ids)}, "status": "queued"}},
+            {"$group": {"_id": "$agent_id", "count": {"$sum": 1}}},
+        ]
+        return {doc["_id"]: doc["count"] for doc in self.collection.aggregate(pipeline)}
@@ -0,0 +1,297 @@
+# llm_gateway.py
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+# Configuration
+# --------------------------------------------------------------------
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").lower()  # "openai" ou "fake" (tests de charge hors ligne)
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+# Au-delà de ce délai sans réponse, une seconde requête identique est lancée (la première arrivée gagne)
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "8"))
+LLM_MAX_HEDGES = int(os.getenv("LLM_MAX_HEDGES", "1"))
+LLM_MODEL_CONCURRENCY = int(os.getenv("LLM_MODEL_CONCURRENCY", "16"))
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_KEEPALIVE = int(os.getenv("LLM_HTTP_KEEPALIVE", "20"))
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "300"))
+
+
+def _model_concurrency_overrides() -> Dict[str, int]:
+    """
+    LLM_MODEL_CONCURRENCY_OVERRIDES="gpt-4o-mini-2024-07-18=32,gpt-4o-2024-08-06=8"
+    """
+    overrides = {}
+    for item in os.getenv("LLM_MODEL_CONCURRENCY_OVERRIDES", "").split(","):
+        if "=" in item:
+            model, limit = item.split("=", 1)
+            overrides[model.strip()] = int(limit)
+    return overrides
+
+
+# Agent courant, pour imputer la consommation de tokens (positionné par agent_scope ou LLMGateway.ainvoke)
+_current_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_agent_id", default=None)
+
+
+@contextmanager
+def agent_scope(agent_id: str):
+    """
+    Impute à agent_id les appels LLM synchrones du bloc (ex. crew.kickoff).
+    """
+    token = _current_agent.set(agent_id)
+    try:
+        yield
+    finally:
+        _current_agent.reset(token)
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """
+    Comptabilise les tokens de chaque appel terminé, par agent (sync et async).
+    """
+    run_inline = True
+
+    def __init__(self, gateway: "LLMGateway"):
+        self.gateway = gateway
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        self.gateway.record_usage(_current_agent.get(), usage)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Backend LLM local : latence simulée, réponse courte et déterministe, sans réseau.
+    Répond au format « Final Answer: » attendu par CrewAI quand le prompt le demande.
+    """
+    model_name: str = "fake"
+    latency_ms: float = LLM_FAKE_LATENCY_MS
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        text = "Interesting take, history will be the judge of that. #AI #Tech"
+        if "Final Answer" in prompt:
+            text = f"Thought: I now know the final answer\nFinal Answer: {text}"
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(text) // 4,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text, response_metadata={"token_usage": usage}))],
+            llm_output={"token_usage": usage, "model_name": self.model_name},
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    def with_structured_output(self, schema, **kwargs):
+        """
+        Sortie structurée hors ligne : le schéma (modèle pydantic) doit fournir
+        fake_response(prompt) qui construit une instance plausible à partir du prompt.
+        """
+        if not hasattr(schema, "fake_response"):
+            raise NotImplementedError(f"FakeChatModel: {schema!r} ne définit pas fake_response(prompt)")
+
+        def prompt_of(messages) -> str:
+            messages = self._convert_input(messages).to_messages()
+            return "\n".join(str(m.content) for m in messages)
+
+        def invoke(messages):
+            time.sleep(self.latency_ms / 1000)
+            return schema.fake_response(prompt_of(messages))
+
+        async def ainvoke(messages):
+            await asyncio.sleep(self.latency_ms / 1000)
+            return schema.fake_response(prompt_of(messages))
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+
+class LLMGateway:
+    """
+    Point d'entrée unique des appels LLM (agents CrewAI et bot de réponses) :
+    - modèles partagés par (modèle, température, clé) sur un pool HTTP keep-alive commun ;
+    - appels async bornés par modèle, avec timeout global et requête de secours (hedging) ;
+    - comptabilité des tokens par agent.
+    """
+    def __init__(self, backend: str = LLM_BACKEND):
+        self.backend = backend
+        self.usage_callback = TokenUsageCallback(self)
+        self._models: Dict[Tuple[str, float, Optional[str]], BaseChatModel] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._concurrency = _model_concurrency_overrides()
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._http_client = None
+        self._http_async_client = None
+        self.hedges = 0
+        self.timeouts = 0
+
+    # ----------------------------------------------------------------
+    # Modèles
+    # ----------------------------------------------------------------
+    def _http_clients(self):
+        if self._http_client is None:
+            import httpx
+            limits = httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_KEEPALIVE,
+            )
+            self._http_client = httpx.Client(limits=limits, timeout=LLM_TIMEOUT_SECONDS)
+            self._http_async_client = httpx.AsyncClient(limits=limits, timeout=LLM_TIMEOUT_SECONDS)
+        return self._http_client, self._http_async_client
+
+    def chat_model(self, model: str, temperature: float, api_key: Optional[str] = None) -> BaseChatModel:
+        """
+        Modèle LangChain partagé pour (modèle, température, clé).
+        """
+        key = (model, temperature, api_key)
+        llm = self._models.get(key)
+        if llm is None:
+            with self._lock:
+                llm = self._models.get(key)
+                if llm is None:
+                    llm = self._build(model, temperature, api_key)
+                    self._models[key] = llm
+        return llm
+
+    def _build(self, model: str, temperature: float, api_key: Optional[str]) -> BaseChatModel:
+        if self.backend == "fake":
+            return FakeChatModel(model_name=model, callbacks=[self.usage_callback])
+        from langchain_openai import ChatOpenAI
+        http_client, http_async_client = self._http_clients()
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            openai_api_key=api_key,
+            timeout=LLM_TIMEOUT_SECONDS,
+            max_retries=LLM_MAX_RETRIES,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            callbacks=[self.usage_callback],
+        )
+
+    # ----------------------------------------------------------------
+    # Appels async
+    # ----------------------------------------------------------------
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._concurrency.get(model, LLM_MODEL_CONCURRENCY))
+            self._semaphores[model] = semaphore
+        return semaphore
+
+    async def _attempt(self, llm: BaseChatModel, messages: List[BaseMessage]) -> AIMessage:
+        async with self._semaphore(llm.model_name):
+            return await llm.ainvoke(messages)
+
+    async def ainvoke(self, llm: BaseChatModel, messages: List[BaseMessage], agent_id: Optional[str] = None) -> AIMessage:
+        """
+        Appel async borné par modèle. Si la première requête n'a pas répondu après
+        LLM_HEDGE_AFTER_SECONDS (ou a échoué), une requête de secours est lancée ;
+        la première réponse obtenue est retournée, l'autre est annulée.
+        Lève asyncio.TimeoutError au-delà de LLM_TIMEOUT_SECONDS.
+        """
+        token = _current_agent.set(agent_id or _current_agent.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LLM_TIMEOUT_SECONDS
+        pending = {asyncio.ensure_future(self._attempt(llm, messages))}
+        launched = 1
+        last_error: Optional[BaseException] = None
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise asyncio.TimeoutError(f"LLM {llm.model_name}: pas de réponse en {LLM_TIMEOUT_SECONDS}s")
+                can_hedge = launched <= LLM_MAX_HEDGES
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=min(remaining, LLM_HEDGE_AFTER_SECONDS) if can_hedge else remaining,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning("LLM %s: échec d'une tentative: %s", llm.model_name, last_error)
+                if can_hedge and (done or pending):
+                    # Lent ou en échec : requête de secours
+                    self.hedges += 1
+                    pending.add(asyncio.ensure_future(self._attempt(llm, messages)))
+                    launched += 1
+                elif not pending:
+                    raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            _current_agent.reset(token)
+
+    # ----------------------------------------------------------------
+    # Comptabilité
+    # ----------------------------------------------------------------
+    def record_usage(self, agent_id: Optional[str], usage: Dict) -> None:
+        agent_id = agent_id or "_unattributed"
+        with self._lock:
+            totals = self._usage.setdefault(
+                agent_id, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            )
+            totals["calls"] += 1
+            for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                totals[field] += int(usage.get(field) or 0)
+
+    def usage(self, agent_id: Optional[str] = None) -> Dict:
+        with self._lock:
+            if agent_id is not None:
+                return dict(self._usage.get(agent_id, {}))
+            return {agent: dict(totals) for agent, totals in self._usage.items()}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            for agent_totals in self._usage.values():
+                for field in totals:
+                    totals[field] += agent_totals[field]
+        return {
+            "backend": self.backend,
+            "models": sorted({model for model, _, _ in self._models}),
+            "hedges": self.hedges,
+            "timeouts": self.timeouts,
+            "agents": len(self._usage),
+            "tokens": totals,
+        }
+
+    async def aclose(self) -> None:
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+        if self._http_client is not None:
+            self._http_client.close()
+
+
+# Instance partagée par le processus
+LLM_GATEWAY = LLMGateway()
@@ -0,0 +1,128 @@
+# logging_config.py
+
+import os
+import sys
+import json
+import atexit
+import random
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Verbosité des crews CrewAI (très coûteuse en formatage et en I/O sous charge)
+CREW_VERBOSE = os.getenv("CREW_VERBOSE", "0") == "1"
+
+# Niveaux par défaut des bibliothèques bavardes ; surchargeables via LOG_LEVELS
+DEFAULT_MODULE_LEVELS = {
+    "LiteLLM": "WARNING",
+    "httpx": "WARNING",
+    "httpcore": "WARNING",
+    "openai": "WARNING",
+    "pymongo": "WARNING",
+    "apscheduler": "INFO",
+}
+
+# Champs standard d'un LogRecord, exclus des champs additionnels du JSON
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_configured = False
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Une ligne JSON par événement ; les champs passés via extra={...} sont ajoutés tels quels.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                event[key] = value
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Ne conserve qu'une fraction des événements DEBUG (les autres niveaux passent tous).
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+def parse_module_levels(spec: str) -> Dict[str, str]:
+    """
+    LOG_LEVELS="main=DEBUG,twitter_client=WARNING"
+    """
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging() -> None:
+    """
+    Configure la journalisation du processus (idempotent) :
+    - LOG_LEVEL (INFO par défaut) et niveaux par module LOG_LEVELS ;
+    - LOG_FORMAT=text|json ;
+    - LOG_DEBUG_SAMPLE_RATE : fraction des événements DEBUG conservés ;
+    - LOG_ASYNC=1 (défaut) : les handlers écrivent depuis un thread dédié (QueueListener),
+      l'appelant ne fait qu'empiler l'événement.
+    """
+    global _configured, _listener
+    if _configured:
+        return
+    _configured = True
+
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    if os.getenv("LOG_ASYNC", "1") == "1":
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(DebugSamplingFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1"))))
+        root.addHandler(queue_handler)
+        _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+    else:
+        handler.addFilter(DebugSamplingFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1"))))
+        root.addHandler(handler)
+
+    levels = dict(DEFAULT_MODULE_LEVELS)
+    levels.update(parse_module_levels(os.getenv("LOG_LEVELS", "")))
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def stop_logging() -> None:
+    """
+    Vide la file et arrête le thread d'écriture (à appeler au shutdown).
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -4,38 +4,60 @@ import os
 import random
 import logging
 import uuid
+import time
 import asyncio
+import base64
+import json
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set, Tuple
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from apscheduler.util import convert_to_datetime
 
 import litellm
-from crewai import Crew
-from crewai.process import Process
 
-from agents import CreativeSystemAgents
-from tasks import GenerateCreativeTweetsTask, PublishTweetsTask
+from crews import get_agents_system, run_daily_tweet_crew, warm_up as warm_up_crews, crew_timings
+from tools.research_tools import research_cache_stats
+from tools.post_tools import publish_tweet
+from tweet_drafts import DraftGenerator, refill_drafts
 
 import tweepy
-from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 
 # Importation des bases de données MongoDB (synchrones)
-from db import AgentsDatabase, DataDatabase
+from db import (
+    AgentsDatabase, DataDatabase, TweetJobsDatabase, TweetDraftsDatabase, OnboardingJobsDatabase,
+    get_mongo_client, close_mongo_clients, mongo_pool_stats, as_utc,
+)
+from credentials_store import CREDENTIALS_STORE
+from aio import AsyncProxy, run_io, run_crew, shutdown_executors
+from cache import TTLCache
+from rate_limiter import RATE_LIMITER
+from twitter_client import AsyncTwitterClient
+from polling import AdaptivePollingPolicy, advance_mention_cursor, fetch_mention_pages, next_slot_time
+from cluster import build_coordinator
+from reply_cache import REPLY_CACHE, persona_key
+from llm_gateway import LLM_GATEWAY
+from reply_writer import REPLY_WRITER
+import metrics
+from logging_config import configure_logging, stop_logging
 
 # --------------------------------------------------------------------
 # Configuration de logs
 # --------------------------------------------------------------------
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+# Niveaux, format (text/json) et échantillonnage : voir logging_config.py
+configure_logging()
 logger = logging.getLogger(__name__)
-os.environ['LITELLM_LOG'] = 'DEBUG'
 
 # --------------------------------------------------------------------
 # Initialisation de l'application FastAPI
@@ -54,24 +76,152 @@ app.add_middleware(
 # --------------------------------------------------------------------
 # Initialisation d'APScheduler
 # --------------------------------------------------------------------
-scheduler = AsyncIOScheduler()
-scheduler.start()
-logger.info("APScheduler (AsyncIOScheduler) démarré.")
+# Mode cluster (CLUSTER_MODE=mongo|local) : chaque nœud / worker uvicorn ne planifie que
+# les agents qui lui reviennent, et chaque exécution prend un bail exclusif.
+COORDINATOR = build_coordinator(get_mongo_client)
+CLUSTER_HEARTBEAT_SECONDS = int(os.getenv("CLUSTER_HEARTBEAT_SECONDS", "10"))
+CLUSTER_RECONCILE_SECONDS = int(os.getenv("CLUSTER_RECONCILE_SECONDS", "60"))
+CLUSTER_JOB_LEASE_SECONDS = float(os.getenv("CLUSTER_JOB_LEASE_SECONDS", "900"))
+# Avance tolérée d'un tweet quotidien sur la prochaine exécution mémorisée dans agentx
+DAILY_TWEET_EARLY_TOLERANCE_SECONDS = 60
+
+def build_jobstores() -> Dict:
+    """
+    Job store persistant (SCHEDULER_JOBSTORE) : "mongo" (défaut, auto.scheduler_jobs),
+    "sqlite" (SCHEDULER_SQLITE_URL, nécessite SQLAlchemy) ou "memory".
+    En mode cluster, le job store est local : agentx fait foi et chaque nœud
+    reconstruit les jobs des agents qu'il possède.
+    """
+    kind = os.getenv("SCHEDULER_JOBSTORE", "mongo").lower()
+    if COORDINATOR is not None:
+        logger.info("Mode cluster (%s) : job store en mémoire.", COORDINATOR.node_id)
+        return {}
+    if kind == "mongo":
+        from apscheduler.jobstores.mongodb import MongoDBJobStore
+        return {"default": MongoDBJobStore(database="auto", collection="scheduler_jobs", client=get_mongo_client())}
+    if kind == "sqlite":
+        from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+        return {"default": SQLAlchemyJobStore(url=os.getenv("SCHEDULER_SQLITE_URL", "sqlite:///jobs.sqlite"))}
+    return {}
+
+# Démarré (en pause) au startup de FastAPI, puis relancé après la réhydratation des jobs
+scheduler = AsyncIOScheduler(jobstores=build_jobstores())
 
 # --------------------------------------------------------------------
 # Initialisation du système d'agents CrewAI
 # --------------------------------------------------------------------
 try:
-    agents_system = CreativeSystemAgents()
+    get_agents_system()
     logger.info("Agents initialisés.")
 except Exception as e:
-    logger.error(f"[Erreur] Échec de l'initialisation des agents CrewAI: {e}")
+    logger.error("[Erreur] Échec de l'initialisation des agents CrewAI: %s", e)
 
 # --------------------------------------------------------------------
 # Instanciation des bases de données (MongoDB au lieu de fichiers JSON)
 # --------------------------------------------------------------------
 AGENTS_DB = AgentsDatabase()   # Base "auto", collection "agentx"
 LOCAL_DB = DataDatabase()      # Base "db",   collection "data"
+# Les deux dépôts partagent le même MongoClient (pool unique du processus, cf. db.get_mongo_client)
+
+# Façades asynchrones : les appels pymongo s'exécutent dans l'exécuteur I/O borné (cf. aio.py)
+ASYNC_AGENTS_DB = AsyncProxy(AGENTS_DB)
+ASYNC_LOCAL_DB = AsyncProxy(LOCAL_DB)
+
+# Exécution des tweets quotidiens : "inline" (crew dans ce processus),
+# "worker" (l'API enfile dans auto.tweet_jobs, `python -m worker` exécute) ou
+# "drafts" (brouillons générés par lots dans auto.tweet_drafts, crew en secours).
+DAILY_TWEET_EXECUTION = os.getenv("DAILY_TWEET_EXECUTION", "inline").lower()
+ASYNC_TWEET_JOBS_DB = AsyncProxy(TweetJobsDatabase())
+ASYNC_DRAFTS_DB = AsyncProxy(TweetDraftsDatabase())
+# Suivi des onboardings groupés (POST /agents/batch), partagé entre les processus de l'API
+ASYNC_ONBOARDING_DB = AsyncProxy(OnboardingJobsDatabase())
+
+# --------------------------------------------------------------------
+# Cycle de vie de l'application (démarrage / arrêt)
+# --------------------------------------------------------------------
+@app.on_event("startup")
+async def on_startup():
+    try:
+        await ASYNC_AGENTS_DB.ensure_indexes()
+        await ASYNC_LOCAL_DB.ensure_indexes()
+        await ASYNC_ONBOARDING_DB.ensure_indexes()
+        if DAILY_TWEET_EXECUTION == "worker":
+            await ASYNC_TWEET_JOBS_DB.ensure_indexes()
+        if DAILY_TWEET_EXECUTION == "drafts":
+            await ASYNC_DRAFTS_DB.ensure_indexes()
+        logger.info("Index MongoDB (auto.agentx, db.data) vérifiés.")
+    except Exception as e:
+        logger.error("[Erreur] Création des index MongoDB impossible: %s", e)
+
+    if COORDINATOR is not None:
+        try:
+            await run_io(COORDINATOR.store.ensure_indexes)
+            await run_io(COORDINATOR.heartbeat)
+        except Exception as e:
+            logger.error("[Erreur] Enregistrement du nœud dans le cluster impossible: %s", e)
+
+    if DAILY_TWEET_EXECUTION in ("inline", "drafts"):
+        # Préchauffage en arrière-plan : outils CrewAI et vector store prêts avant le premier tweet
+        asyncio.ensure_future(run_crew(warm_up_crews))
+
+    # Retard et issue des jobs APScheduler (exposés sur /metrics)
+    scheduler.add_listener(
+        record_scheduler_event,
+        EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED,
+    )
+
+    # Écriture différée des réponses aux mentions (flush périodique)
+    REPLY_WRITER.start()
+
+    # Démarrage en pause : les jobs persistés en retard ne partent pas tous d'un coup
+    scheduler.start(paused=True)
+    try:
+        await run_io(rehydrate_agent_jobs)
+    except Exception as e:
+        logger.error("[Erreur] Réhydratation des jobs impossible: %s", e)
+    scheduler.resume()
+    logger.info("APScheduler (AsyncIOScheduler) démarré.")
+
+    if COORDINATOR is not None:
+        scheduler.add_job(
+            cluster_heartbeat,
+            trigger=IntervalTrigger(seconds=CLUSTER_HEARTBEAT_SECONDS),
+            id="cluster_heartbeat",
+            replace_existing=True,
+            max_instances=1
+        )
+
+    if DAILY_TWEET_EXECUTION == "drafts":
+        scheduler.add_job(
+            refill_tweet_drafts,
+            trigger=IntervalTrigger(minutes=int(os.getenv("DRAFTS_REFILL_MINUTES", "60"))),
+            id="tweet_drafts_refill",
+            replace_existing=True,
+            max_instances=1,
+            next_run_time=datetime.now(scheduler.timezone) + timedelta(seconds=30)
+        )
+
+    scheduler.add_job(
+        sweep_reply_bots,
+        trigger=IntervalTrigger(minutes=int(os.getenv("REPLY_BOT_SWEEP_MINUTES", "30"))),
+        id="reply_bot_sweep",
+        replace_existing=True,
+        max_instances=1
+    )
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    # Écrire les réponses encore en file avant de fermer exécuteurs et clients Mongo
+    await REPLY_WRITER.stop()
+    if COORDINATOR is not None:
+        # Départ immédiat : les autres nœuds reprennent nos agents au prochain heartbeat
+        await run_io(COORDINATOR.leave)
+    shutdown_executors()
+    close_mongo_clients()
+    await LLM_GATEWAY.aclose()
+    stop_logging()
 
 # --------------------------------------------------------------------
 # Pydantic - Structure des données reçues depuis le front
@@ -96,82 +246,176 @@ def get_random_time_for_next_day():
     """
     now = datetime.now() + timedelta(minutes=100)
     next_run_time = now.replace(second=0, microsecond=0)
-    logger.debug(f"Next run time generated (now + 2 min): {next_run_time.isoformat()}")
-    print(f"Next run time generated (now + 2 min): {next_run_time.isoformat()}")
+    logger.debug("Next run time generated (now + 2 min): %s", next_run_time.isoformat())
     return next_run_time
 
-def schedule_daily_tweet_job(agent_id: str, personality_prompt: str, credentials: Dict):
+def schedule_daily_tweet_job(
+    agent_id: str,
+    next_run_time: Optional[datetime] = None,
+    persist: bool = True
+):
     """
     Planifie un job APScheduler pour publier un tweet quotidien (dans 2 minutes).
+    L'heure est mémorisée dans agentx (persist=True) : elle survit aux rééquilibrages
+    du cluster et aux redémarrages. (Synchrone : appeler depuis l'exécuteur I/O.)
     """
-    next_run_time = get_random_time_for_next_day()
-    job_id = f"daily_tweet_job_{agent_id}"
+    next_run_time = convert_to_datetime(next_run_time or get_random_time_for_next_day(), scheduler.timezone, "next_run_time")
+    job_id = daily_tweet_job_id(agent_id)
     scheduler.add_job(
         execute_daily_tweet,  # fonction async
         trigger=DateTrigger(run_date=next_run_time),
-        args=[agent_id, personality_prompt, credentials],
+        args=[agent_id],
         id=job_id,
         replace_existing=True
     )
-    logger.info(f"[Agent {agent_id}] planifié pour {next_run_time.isoformat()} UTC")
+    if persist:
+        AGENTS_DB.set_next_daily_tweet(agent_id, next_run_time)
+    logger.info("[Agent %s] planifié pour %s", agent_id, next_run_time.isoformat())
+
+@asynccontextmanager
+async def job_lease(key: str, ttl: float, release: bool = True):
+    """
+    Bail exclusif d'exécution en mode cluster ; toujours accordé en mode mono-processus.
+    """
+    if COORDINATOR is None:
+        yield True
+        return
+    async with COORDINATOR.exclusive(key, ttl, release=release) as acquired:
+        yield acquired
 
-async def execute_daily_tweet(agent_id: str, personality_prompt: str, credentials: Dict):
+async def execute_daily_tweet(agent_id: str):
     """
     Génère et publie un tweet, puis replanifie le job pour la prochaine fois.
+    Le prompt et les credentials sont relus à chaque exécution (agentx, CREDENTIALS_STORE) :
+    le job store ne contient que agent_id.
     (Déclarée async pour être compatible avec APScheduler en mode async)
     """
+    record = await ASYNC_AGENTS_DB.find_by_agent_id(agent_id)
+    if record is None:
+        logger.warning("[Agent %s] Agent introuvable, tweet quotidien abandonné.", agent_id)
+        return
+    personality_prompt = record.get("fields", {}).get("personality_prompt")
     logger.info(
-        f"[Agent {agent_id}] Exécution du tweet quotidien. Prompt: '{personality_prompt}'"
-        f" à {datetime.utcnow().isoformat()} UTC"
+        "[Agent %s] Exécution du tweet quotidien. Prompt: '%s' à %s UTC",
+        agent_id, personality_prompt, datetime.utcnow().isoformat(),
     )
 
     # Vérifier la présence des credentials Twitter
-    if not all([
-        personality_prompt,
-        credentials.get("TWITTER_API_KEY"),
-        credentials.get("TWITTER_API_SECRET_KEY"),
-        credentials.get("TWITTER_ACCESS_TOKEN"),
-        credentials.get("TWITTER_ACCESS_TOKEN_SECRET")
-    ]):
-        logger.error(f"[Agent {agent_id}] Manque des credentials ou personality_prompt.")
+    try:
+        await run_io(CREDENTIALS_STORE.get_credentials, agent_id)
+    except ValueError as e:
+        logger.error("[Agent %s] Manque des credentials: %s", agent_id, e)
+        return
+    if not personality_prompt:
+        logger.error("[Agent %s] Manque le personality_prompt.", agent_id)
         return
 
-    # Instanciation de 2 agents : un qui génère le contenu, un qui le poste
-    creative_agent = agents_system.creative_tweet_agent()
-    posting_agent = agents_system.tweet_poster_agent(agent_id)
+    # Bail conservé jusqu'à expiration : deux nœuds ne peuvent pas publier en même temps.
+    # Au-delà, la prochaine exécution mémorisée dans agentx fait foi (un nœud qui reprend
+    # l'agent après un rééquilibrage ne republie pas avant l'heure prévue).
+    async with job_lease(f"daily_tweet:{agent_id}", CLUSTER_JOB_LEASE_SECONDS, release=False) as acquired:
+        if not acquired:
+            logger.info("[Agent %s] Tweet quotidien déjà pris en charge par un autre nœud.", agent_id)
+            return
+        next_daily = await ASYNC_AGENTS_DB.get_next_daily_tweet(agent_id)
+        if next_daily is not None and next_daily > datetime.now(scheduler.timezone) + timedelta(seconds=DAILY_TWEET_EARLY_TOLERANCE_SECONDS):
+            logger.info("[Agent %s] Tweet quotidien déjà publié, prochain à %s.", agent_id, next_daily.isoformat())
+            await run_io(schedule_daily_tweet_job, agent_id, next_daily, False)
+            return
+        try:
+            if DAILY_TWEET_EXECUTION == "worker":
+                job_id = await ASYNC_TWEET_JOBS_DB.enqueue(
+                    agent_id, personality_prompt, int(os.getenv("WORKER_MAX_ATTEMPTS", "3"))
+                )
+                logger.info("[Agent %s] Tweet quotidien confié au worker (job %s).", agent_id, job_id)
+            # Mode "drafts" : le crew ne sert que si la file de brouillons de l'agent est vide
+            elif DAILY_TWEET_EXECUTION != "drafts" or not await post_next_draft(agent_id):
+                # Crew est synchrone (construction + kickoff) : exécuté dans le pool dédié
+                # pour ne pas bloquer la boucle asyncio (API + autres jobs).
+                result = await run_crew(run_daily_tweet_crew, agent_id, personality_prompt)
+                logger.info("[Agent %s] Tweet publié avec succès.", agent_id)
+                logger.debug("[Agent %s] Résultat brut: %s", agent_id, result)
+        except Exception as e:
+            logger.error("[Agent %s] Erreur lors de l'exécution du tweet: %s", agent_id, e)
 
-    # Construction des 2 tâches CrewAI
-    generate_task = GenerateCreativeTweetsTask(
-        agent=creative_agent,
-        personality_prompt=personality_prompt,
-        tweets_text=""
-    )
-    publish_task = PublishTweetsTask(
-        agent=posting_agent,
-        tweet_text=""
-    )
+        # Replanifier (et mémoriser) la prochaine occurrence tant que le bail est détenu
+        await run_io(schedule_daily_tweet_job, agent_id)
 
-    crew = Crew(
-        agents=[creative_agent, posting_agent],
-        tasks=[generate_task, publish_task],
-        process=Process.sequential,
-        verbose=True
-    )
+# --------------------------------------------------------------------
+# Brouillons générés par lots (DAILY_TWEET_EXECUTION=drafts)
+# --------------------------------------------------------------------
+_draft_generator: Optional[DraftGenerator] = None
 
+async def post_next_draft(agent_id: str) -> bool:
+    """
+    Publie le prochain brouillon de l'agent. Retourne False si la file est vide
+    (le job quotidien se rabat alors sur le crew).
+    """
+    draft = await ASYNC_DRAFTS_DB.pop_draft(agent_id)
+    if draft is None:
+        logger.info("[Agent %s] Aucun brouillon en attente, génération via le crew.", agent_id)
+        return False
     try:
-        # Dans l'état actuel, Crew est synchrone, on l'appelle directement.
-        result = crew.kickoff()
-        logger.info(f"[Agent {agent_id}] Tweet publié avec succès.")
-        logger.debug(f"[Agent {agent_id}] Résultat brut: {result}")
+        await run_io(publish_tweet, agent_id, draft["text"])
+        await ASYNC_DRAFTS_DB.mark(draft["_id"], "posted", posted_at=datetime.utcnow())
+        logger.info("[Agent %s] Brouillon %s publié.", agent_id, draft['_id'])
     except Exception as e:
-        logger.error(f"[Agent {agent_id}] Erreur lors de l'exécution du tweet: {e}")
+        await ASYNC_DRAFTS_DB.mark(draft["_id"], "failed", error=str(e))
+        logger.error("[Agent %s] Échec de publication du brouillon %s: %s", agent_id, draft['_id'], e)
+    return True
+
+async def refill_tweet_drafts():
+    """
+    Regroupe les agents planifiés localement dont la file de brouillons est basse
+    et génère leurs brouillons par lots : un appel LLM pour DRAFTS_BATCH_AGENTS agents.
+    """
+    global _draft_generator
+    if _draft_generator is None:
+        _draft_generator = DraftGenerator()
 
-    # Replanifier pour la prochaine occurrence
-    schedule_daily_tweet_job(agent_id, personality_prompt, credentials)
+    jobs = await run_io(scheduler.get_jobs)
+    await refill_drafts(jobs, ASYNC_AGENTS_DB, ASYNC_DRAFTS_DB, _draft_generator)
 
 # --------------------------------------------------------------------
 # Bot pour répondre aux Mentions (async)
 # --------------------------------------------------------------------
+# Cache court des tweets racines de conversation (partagé entre agents) :
+# plusieurs mentions d'un même fil ne coûtent qu'une seule hydratation.
+CONVERSATION_CACHE = TTLCache(
+    maxsize=int(os.getenv("CONVERSATION_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("CONVERSATION_CACHE_TTL", "900")),
+)
+REPLY_SYSTEM_TEMPLATE = """
+            You are an expert in posts and discussions
+            Your goal is to respond to any message with relevance and impact.
+
+            % RESPONSE TONE:
+            - Confident, direct, sometimes witty or sarcastic
+            - Up to two short sentences
+            - No emojis
+
+            % RESPONSE FORMAT:
+            - Under 200 characters
+            - Minimal emojis
+
+            % RESPONSE CONTENT:
+            - If message is vague, ask a question
+            - If no clear answer, say: 'I'll let history be the judge of that.'
+        """
+# Prompt compilé une seule fois pour tous les bots
+REPLY_PROMPT = ChatPromptTemplate.from_messages([
+    SystemMessagePromptTemplate.from_template(REPLY_SYSTEM_TEMPLATE),
+    HumanMessagePromptTemplate.from_template("{text}"),
+])
+# Modèle des réponses : instances partagées par clé OpenAI via la passerelle LLM (pool HTTP commun)
+REPLY_MODEL = os.getenv("REPLY_MODEL", "gpt-4o-mini-2024-07-18")
+REPLY_TEMPERATURE = 0.1
+
+TWEET_LOOKUP_BATCH_SIZE = 100  # Limite de l'API v2 (GET /2/tweets)
+TWEET_FIELDS = ['created_at', 'conversation_id']
+MENTIONS_PAGE_SIZE = 100  # max_results autorisé par GET /2/users/:id/mentions
+MENTIONS_MAX_PAGES = int(os.getenv("MENTIONS_MAX_PAGES", "10"))
+
 class TwitterReplyBot:
     """
     Bot pour répondre automatiquement aux mentions.
@@ -184,293 +428,672 @@ class TwitterReplyBot:
         self.acc_secret = credentials["TWITTER_ACCESS_TOKEN_SECRET"]
         self.bearer_token = credentials["TWITTER_BEARER_TOKEN"]
         self.openai_api_key = openai_api_key
-
-        # Initialisation du client Tweepy (synchron)
-        self.twitter_api = tweepy.Client(
+        self.credentials_key = bot_credentials_key(credentials, openai_api_key)
+        # Entrées du cache de réponses propres à l'agent (jamais partagées entre comptes)
+        self.cache_persona = persona_key(REPLY_SYSTEM_TEMPLATE, agent_id)
+        self.last_used = time.monotonic()
+
+        # Client Tweepy (synchrone) exposé via une façade async : chaque appel passe par
+        # le RateLimiter global puis s'exécute dans l'exécuteur I/O borné.
+        self.twitter_api = AsyncTwitterClient(tweepy.Client(
             bearer_token=self.bearer_token,
             consumer_key=self.api_key,
             consumer_secret=self.api_secret,
             access_token=self.acc_token,
             access_token_secret=self.acc_secret,
-        )
+        ))
 
-        # Pour stocker les informations de mentions/réponses dans la base "db"."data"
-        self.db = DataDatabase()
+        # Pour stocker les informations de mentions/réponses dans la base "db"."data" (pool partagé)
+        self.db = ASYNC_LOCAL_DB
 
         # ID du compte Twitter
         self.twitter_me_id: Optional[str] = None
-        self.tweet_response_limit = 100  # Nombre max de tweets traités
 
         # LLM pour générer les réponses
         if self.openai_api_key:
-            self.llm = ChatOpenAI(
-                temperature=0.1,
-                openai_api_key=self.openai_api_key,
-                model_name='gpt-4o-mini-2024-07-18'
-            )
+            self.llm = LLM_GATEWAY.chat_model(REPLY_MODEL, REPLY_TEMPERATURE, self.openai_api_key)
         else:
-            logger.warning(
-                f"[Agent {self.agent_id}] OPENAI_API_KEY non fourni. Réponses aux mentions désactivées."
-            )
+            logger.warning("[Agent %s] OPENAI_API_KEY non fourni. Réponses aux mentions désactivées.", self.agent_id)
             self.llm = None
 
+        # Mode de traitement des mentions : "sequential" (défaut) ou "concurrent".
+        # En mode concurrent, chaque étape du pipeline a sa propre limite.
+        self.concurrency_mode = os.getenv("MENTIONS_CONCURRENCY_MODE", "sequential").lower()
+        concurrent = self.concurrency_mode == "concurrent"
+        self.fetch_semaphore = asyncio.Semaphore(int(os.getenv("MENTIONS_FETCH_CONCURRENCY", "8")) if concurrent else 1)
+        self.llm_semaphore = asyncio.Semaphore(int(os.getenv("MENTIONS_LLM_CONCURRENCY", "4")) if concurrent else 1)
+        self.post_semaphore = asyncio.Semaphore(int(os.getenv("MENTIONS_POST_CONCURRENCY", "2")) if concurrent else 1)
+
         # Statistiques
         self.mentions_found = 0
         self.mentions_replied = 0
         self.mentions_replied_errors = 0
 
-        logger.info(f"[Agent {self.agent_id}] TwitterReplyBot initialisé.")
+        logger.info("[Agent %s] TwitterReplyBot initialisé.", self.agent_id)
 
     async def init_me_id(self):
         """
         Récupère l'ID du compte Twitter une seule fois.
         """
         if self.twitter_me_id is None:
-            response = self.twitter_api.get_me()
+            response = await self.twitter_api.get_me()
             if response and hasattr(response, 'data') and response.data:
                 self.twitter_me_id = response.data.id
-                logger.debug(f"[Agent {self.agent_id}] ID Twitter: {self.twitter_me_id}")
+                logger.debug("[Agent %s] ID Twitter: %s", self.agent_id, self.twitter_me_id)
             else:
                 raise Exception(f"[Agent {self.agent_id}] Impossible de récupérer l'ID Twitter.")
 
-    async def generate_response(self, text: str) -> str:
+    async def generate_response(self, text: str, use_cache: bool = True) -> str:
         """
         Génère la réponse via un prompt system/human (LangChain).
+        Les textes identiques ou quasi identiques adressés au même agent réutilisent une réponse en cache.
         """
         if not self.llm:
             return "Désolé, je ne peux pas répondre sans OPENAI_API_KEY."
 
-        system_template = """
-            You are an expert in posts and discussions
-            Your goal is to respond to any message with relevance and impact.
+        if use_cache:
+            cached = REPLY_CACHE.get(self.cache_persona, text)
+            if cached is not None:
+                logger.debug("[Agent %s] Réponse servie depuis le cache: %s", self.agent_id, cached)
+                return cached
 
-            % RESPONSE TONE:
-            - Confident, direct, sometimes witty or sarcastic
-            - Up to two short sentences
-            - No emojis
-
-            % RESPONSE FORMAT:
-            - Under 200 characters
-            - Minimal emojis
-
-            % RESPONSE CONTENT:
-            - If message is vague, ask a question
-            - If no clear answer, say: 'I'll let history be the judge of that.'
-        """
-
-        system_prompt = SystemMessagePromptTemplate.from_template(system_template)
-        human_prompt = HumanMessagePromptTemplate.from_template("{text}")
-        chat_prompt = ChatPromptTemplate.from_messages([system_prompt, human_prompt])
-        final_prompt = chat_prompt.format_prompt(text=text).to_messages()
+        final_prompt = REPLY_PROMPT.format_prompt(text=text).to_messages()
 
         try:
-            response = self.llm(final_prompt).content
-            logger.debug(f"[Agent {self.agent_id}] Réponse générée: {response}")
+            with metrics.span("generate_response", self.agent_id):
+                response = (await LLM_GATEWAY.ainvoke(self.llm, final_prompt, agent_id=self.agent_id)).content
+            logger.debug("[Agent %s] Réponse générée: %s", self.agent_id, response)
+            REPLY_CACHE.set(self.cache_persona, text, response, agent_id=self.agent_id)
             return response
         except Exception as e:
-            logger.error(f"[Agent {self.agent_id}] Erreur LLM: {e}")
+            logger.error("[Agent %s] Erreur LLM: %s", self.agent_id, e)
             return "Je ne peux pas répondre pour le moment."
 
-    async def get_mentions(self):
+    async def get_mention_state(self) -> Dict:
+        """
+        État du curseur de mentions : celui en attente d'écriture (REPLY_WRITER) s'il existe,
+        sinon celui de la base.
+        """
+        state = REPLY_WRITER.pending_cursor(self.agent_id)
+        if state is None:
+            state = await self.db.get_mention_state(self.agent_id)
+        return state
+
+    async def get_mentions(self, state: Dict):
         """
-        Récupère les mentions depuis les 20 dernières minutes (ou plus selon votre logique).
+        Récupère les mentions plus récentes que le curseur persistant de l'agent (since_id),
+        en suivant la pagination (next_token), au plus MENTIONS_MAX_PAGES pages de
+        MENTIONS_PAGE_SIZE mentions par passage. Pendant un rattrapage, until_id borne la
+        fenêtre aux mentions plus anciennes que celles déjà lues.
+        Sans curseur (premier passage), se limite aux 15 dernières minutes.
+        Retourne (mentions, complete) : complete est faux s'il reste des pages non lues.
         """
-        now = datetime.utcnow()
-        start_time = now - timedelta(minutes=15)
-        start_time_str = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        response = self.twitter_api.get_users_mentions(
-            id=self.twitter_me_id,
-            start_time=start_time_str,
-            expansions=['referenced_tweets.id'],
-            tweet_fields=['created_at', 'conversation_id']
+        params = {
+            "id": self.twitter_me_id,
+            "max_results": MENTIONS_PAGE_SIZE,
+            "expansions": ['referenced_tweets.id'],
+            "tweet_fields": TWEET_FIELDS,
+        }
+        since_id = state.get("newest_id")
+        if since_id:
+            params["since_id"] = since_id
+        else:
+            start_time = datetime.utcnow() - timedelta(minutes=15)
+            params["start_time"] = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+        if state.get("until_id"):
+            params["until_id"] = state["until_id"]
+
+        # Les tweets référencés (includes) servent à hydrater les parents sans appel supplémentaire
+        mentions, complete = await fetch_mention_pages(
+            self.twitter_api.get_users_mentions, params, MENTIONS_MAX_PAGES, on_page=self.cache_included_tweets,
         )
-        if response and hasattr(response, 'data') and response.data:
-            logger.debug(f"[Agent {self.agent_id}] {len(response.data)} mention(s) récupérée(s).")
-            return response.data
-        logger.debug(f"[Agent {self.agent_id}] Aucune mention.")
-        return []
+        if not complete:
+            # Les pages non lues sont plus anciennes : le curseur s'arrête à la plus ancienne
+            # mention lue (until_id) et le passage suivant reprend à partir de là.
+            logger.warning(
+                "[Agent %s] %s mention(s) lue(s), pages restantes : le rattrapage continuera au prochain passage.",
+                self.agent_id, len(mentions),
+            )
 
-    async def get_parent_tweet(self, mention):
+        if mentions:
+            logger.debug("[Agent %s] %s mention(s) récupérée(s) (since_id=%s).", self.agent_id, len(mentions), since_id)
+        else:
+            logger.debug("[Agent %s] Aucune mention.", self.agent_id)
+        return mentions, complete
+
+    @staticmethod
+    def cache_included_tweets(response) -> None:
         """
-        Récupère le tweet parent d'une mention (conversation_id).
+        Met en cache les tweets renvoyés dans `includes` par une requête avec expansions.
         """
-        if mention.conversation_id:
-            resp = self.twitter_api.get_tweet(mention.conversation_id)
-            if resp and hasattr(resp, 'data') and resp.data:
-                logger.debug(f"[Agent {self.agent_id}] Parent tweet ID: {resp.data.id}")
-                return resp.data
-        return None
-
-    async def check_already_responded(self, conversation_id: str) -> bool:
+        includes = getattr(response, 'includes', None) or {}
+        for tweet in includes.get('tweets', []):
+            CONVERSATION_CACHE.set(str(tweet.id), tweet)
+
+    async def get_parent_tweets(self, mentions) -> Tuple[Dict[str, object], Set[str]]:
         """
-        Vérifie si on a déjà répondu à ce tweet (via la DB 'data').
+        Hydrate en masse les tweets racines des conversations des mentions :
+        cache (alimenté par les includes) puis lookup multi-ID par lots de 100.
+        Retourne ({conversation_id: tweet}, conversation_ids dont le lookup a échoué).
         """
-        records = self.db.get_all()  # Appel synchrone
-        for record in records:
-            fields = record.get('fields', {})
-            if fields.get('mentioned_conversation_tweet_id') == str(conversation_id):
-                logger.debug(f"[Agent {self.agent_id}] Déjà répondu à {conversation_id}.")
-                return True
-        return False
+        parents: Dict[str, object] = {}
+        failed: Set[str] = set()
+        missing: List[str] = []
+        for mention in mentions:
+            if not mention.conversation_id:
+                continue
+            conversation_id = str(mention.conversation_id)
+            if conversation_id in parents or conversation_id in missing:
+                continue
+            cached = CONVERSATION_CACHE.get(conversation_id)
+            if cached is not None:
+                parents[conversation_id] = cached
+            else:
+                missing.append(conversation_id)
+
+        batches = [
+            missing[i:i + TWEET_LOOKUP_BATCH_SIZE]
+            for i in range(0, len(missing), TWEET_LOOKUP_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(
+            *(self._lookup_tweets(batch) for batch in batches),
+            return_exceptions=True
+        )
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.error("[Agent %s] Échec du lookup de %s tweet(s) parent(s): %s", self.agent_id, len(batch), result)
+                failed.update(batch)
+                continue
+            for tweet in result:
+                CONVERSATION_CACHE.set(str(tweet.id), tweet)
+                parents[str(tweet.id)] = tweet
+
+        logger.debug(
+            "[Agent %s] %s tweet(s) parent(s) hydraté(s), %s via lookup groupé.",
+            self.agent_id, len(parents), len(missing)
+        )
+        return parents, failed
+
+    async def _lookup_tweets(self, ids: List[str]) -> list:
+        async with self.fetch_semaphore:
+            resp = await self.twitter_api.get_tweets(ids=ids, tweet_fields=TWEET_FIELDS)
+        return (resp.data or []) if resp else []
+
+    async def get_responded_conversation_ids(self, conversation_ids: List[str]) -> set:
+        """
+        Retourne en un seul aller-retour les conversations déjà traitées par cet agent,
+        y compris celles dont la réponse n'est pas encore écrite (REPLY_WRITER).
+        """
+        responded = await self.db.find_responded_conversation_ids(self.agent_id, conversation_ids)
+        return responded | REPLY_WRITER.pending_conversation_ids(self.agent_id)
 
     async def respond_to_mention(self, mention, parent_tweet):
         """
         Envoie la réponse au tweet, en insérant le tout dans la DB.
         """
         try:
-            response_text = await self.generate_response(parent_tweet.text)
-            response_tweet = self.twitter_api.create_tweet(
-                text=response_text,
-                in_reply_to_tweet_id=mention.id
-            )
+            async with self.llm_semaphore:
+                response_text = await self.generate_response(parent_tweet.text)
+            async with self.post_semaphore:
+                # Marqueur durable avant publication : si le processus meurt avant l'écriture
+                # différée (REPLY_WRITER), la conversation reste marquée et n'est pas re-répondue.
+                if not await self.db.claim_reply(self.agent_id, str(parent_tweet.id)):
+                    logger.info("[Agent %s] Conversation %s déjà prise en charge.", self.agent_id, parent_tweet.id)
+                    return
+                try:
+                    try:
+                        response_tweet = await self.twitter_api.create_tweet(
+                            text=response_text,
+                            in_reply_to_tweet_id=mention.id
+                        )
+                    except tweepy.Forbidden:
+                        # Twitter refuse un contenu identique déjà publié par le compte (réponse
+                        # issue du cache) : on régénère une fois sans passer par le cache.
+                        async with self.llm_semaphore:
+                            response_text = await self.generate_response(parent_tweet.text, use_cache=False)
+                        response_tweet = await self.twitter_api.create_tweet(
+                            text=response_text,
+                            in_reply_to_tweet_id=mention.id
+                        )
+                except tweepy.HTTPException as e:
+                    # Refus explicite (4xx) : rien n'est publié, la conversation pourra être retentée.
+                    # Erreur serveur (5xx) : la réponse a pu partir, le marqueur est conservé.
+                    if not isinstance(e, tweepy.TwitterServerError):
+                        await self.db.release_reply(self.agent_id, str(parent_tweet.id))
+                    raise
             self.mentions_replied += 1
-            logger.info(f"[Agent {self.agent_id}] Réponse envoyée: {response_text}")
+            logger.info("[Agent %s] Réponse envoyée: %s", self.agent_id, response_text)
 
-            # Enregistrer la mention et la réponse dans la DB (db.data)
-            self.db.insert({
+            # Enregistrer la mention et la réponse dans la DB (db.data), par lots
+            await REPLY_WRITER.add({
+                'agent_id': self.agent_id,
                 'mentioned_conversation_tweet_id': str(parent_tweet.id),
                 'mentioned_conversation_tweet_text': parent_tweet.text,
                 'tweet_response_id': response_tweet.data['id'],
                 'tweet_response_text': response_text,
                 'tweet_response_created_at': datetime.utcnow().isoformat(),
-                'mentioned_at': mention.created_at.isoformat()
+                'mentioned_at': mention.created_at.isoformat(),
+                'status': 'posted',
             })
         except Exception as e:
-            logger.error(f"[Agent {self.agent_id}] Échec de réponse au tweet ID {mention.id}: {e}")
+            logger.error("[Agent %s] Échec de réponse au tweet ID %s: %s", self.agent_id, mention.id, e)
             self.mentions_replied_errors += 1
 
+    async def _process_conversation(self, conversation_id: str, items: list, responded: set):
+        """
+        Traite dans l'ordre les mentions d'une même conversation : une seule réponse par conversation.
+        """
+        for mention, parent_tweet in items:
+            if conversation_id in responded:
+                logger.debug("[Agent %s] Déjà répondu à %s.", self.agent_id, conversation_id)
+                continue
+            await self.respond_to_mention(mention, parent_tweet)
+            responded.add(conversation_id)
+
     async def execute_replies(self):
         """
         Cherche les mentions et y répond, en excluant celles déjà traitées.
         (Planifié par APScheduler de façon async, pour gérer multi-users.)
         """
-        # Initialiser l'ID Twitter si pas encore fait
+        # Statistiques du passage courant (le bot est réutilisé entre les passages)
+        self.mentions_found = 0
+        self.mentions_replied = 0
+        self.mentions_replied_errors = 0
+
+        # Initialiser l'ID Twitter si pas encore fait (conservé entre les passages)
         await self.init_me_id()
 
         if not self.llm:
-            logger.warning(
-                f"[Agent {self.agent_id}] LLM non dispo (pas d'OPENAI_API_KEY). Annulation."
-            )
+            logger.warning("[Agent %s] LLM non dispo (pas d'OPENAI_API_KEY). Annulation.", self.agent_id)
             return
 
-        logger.info(f"[Agent {self.agent_id}] Début de l'exécution des réponses aux mentions.")
-        mentions = await self.get_mentions()
+        logger.info("[Agent %s] Début de l'exécution des réponses aux mentions.", self.agent_id)
+        state = await self.get_mention_state()
+        mentions, complete = await self.get_mentions(state)
         if not mentions:
-            logger.info(f"[Agent {self.agent_id}] Aucune mention à traiter.")
+            if state.get("until_id"):
+                # Fin d'un rattrapage : la fenêtre restante était vide
+                REPLY_WRITER.set_cursor(self.agent_id, advance_mention_cursor(state, [], complete))
+            logger.info("[Agent %s] Aucune mention à traiter.", self.agent_id)
             return
 
         self.mentions_found = len(mentions)
-        logger.info(f"[Agent {self.agent_id}] {self.mentions_found} mention(s) trouvée(s).")
-
-        # On peut gérer la réponse aux mentions de manière séquentielle ou parallèle
-        # Ici, on le fait séquentiellement pour rester « simple ».
-        for mention in mentions[:self.tweet_response_limit]:
-            parent_tweet = await self.get_parent_tweet(mention)
+        logger.info("[Agent %s] %s mention(s) trouvée(s).", self.agent_id, self.mentions_found)
+
+        # Les plus anciennes d'abord
+        mentions = sorted(mentions, key=lambda m: int(m.id))
+
+        # Étape 1 : hydratation groupée des tweets parents (includes + cache + lookup multi-ID)
+        parents, failed_conversations = await self.get_parent_tweets(mentions)
+        # Mentions dont le parent n'a pas pu être lu : le curseur ne doit pas les dépasser
+        failed_ids = [m.id for m in mentions if str(m.conversation_id) in failed_conversations]
+        candidates = []
+        for mention in mentions:
+            parent_tweet = parents.get(str(mention.conversation_id))
             if parent_tweet and parent_tweet.id != mention.id:
-                already_responded = await self.check_already_responded(parent_tweet.id)
-                if not already_responded:
-                    await self.respond_to_mention(mention, parent_tweet)
+                candidates.append((mention, parent_tweet))
+
+        # Étape 2 : détection des doublons, un seul aller-retour MongoDB pour toute la passe
+        responded = await self.get_responded_conversation_ids(
+            [str(parent_tweet.id) for _, parent_tweet in candidates]
+        )
+
+        # Étapes 3 et 4 : génération + publication. Les mentions d'une même conversation
+        # restent traitées dans l'ordre ; les conversations distinctes avancent en parallèle
+        # en mode concurrent, l'une après l'autre sinon.
+        conversations: Dict[str, list] = {}
+        for mention, parent_tweet in candidates:
+            conversations.setdefault(str(parent_tweet.id), []).append((mention, parent_tweet))
+
+        if self.concurrency_mode == "concurrent":
+            await asyncio.gather(*(
+                self._process_conversation(conversation_id, items, responded)
+                for conversation_id, items in conversations.items()
+            ))
+        else:
+            for conversation_id, items in conversations.items():
+                await self._process_conversation(conversation_id, items, responded)
+
+        # Avancer le curseur une fois la passe traitée, sans dépasser les mentions non lues
+        # ou non hydratées ; il est écrit après les réponses qu'il couvre (un crash avant
+        # ce point fait simplement re-lire ces mentions).
+        REPLY_WRITER.set_cursor(
+            self.agent_id,
+            advance_mention_cursor(state, [m.id for m in mentions], complete, failed_ids),
+        )
 
+        metrics.MENTIONS_FOUND.inc(self.mentions_found)
+        metrics.MENTIONS_REPLIED.inc(self.mentions_replied)
+        metrics.MENTIONS_REPLY_ERRORS.inc(self.mentions_replied_errors)
         logger.info(
-            f"[Agent {self.agent_id}] {self.mentions_replied} réponse(s) envoyée(s), "
-            f"{self.mentions_replied_errors} erreur(s)."
+            "[Agent %s] %s réponse(s) envoyée(s), %s erreur(s).",
+            self.agent_id, self.mentions_replied, self.mentions_replied_errors,
         )
 
-async def execute_mentions_reply(agent_id: str, credentials: dict, openai_api_key: Optional[str] = None):
+# --------------------------------------------------------------------
+# Registre des bots : une instance par agent, conservée entre les passages
+# (client Tweepy + session HTTP, ID Twitter résolu, LLM partagé).
+# --------------------------------------------------------------------
+REPLY_BOTS: Dict[str, TwitterReplyBot] = {}
+REPLY_BOT_IDLE_TTL = float(os.getenv("REPLY_BOT_IDLE_TTL", "3600"))
+
+def bot_credentials_key(credentials: Dict, openai_api_key: Optional[str]) -> tuple:
+    return (
+        credentials.get("TWITTER_API_KEY"),
+        credentials.get("TWITTER_API_SECRET_KEY"),
+        credentials.get("TWITTER_ACCESS_TOKEN"),
+        credentials.get("TWITTER_ACCESS_TOKEN_SECRET"),
+        credentials.get("TWITTER_BEARER_TOKEN"),
+        openai_api_key,
+    )
+
+def get_reply_bot(agent_id: str, credentials: Dict, openai_api_key: Optional[str] = None) -> TwitterReplyBot:
+    """
+    Retourne le bot de l'agent, recréé uniquement si ses credentials ont changé.
+    """
+    bot = REPLY_BOTS.get(agent_id)
+    if bot is None or bot.credentials_key != bot_credentials_key(credentials, openai_api_key):
+        bot = TwitterReplyBot(agent_id, credentials, openai_api_key=openai_api_key)
+        REPLY_BOTS[agent_id] = bot
+    bot.last_used = time.monotonic()
+    return bot
+
+def evict_reply_bot(agent_id: str) -> None:
+    REPLY_BOTS.pop(agent_id, None)
+    # Sans bot, plus de passe de mentions à adapter : l'historique de débit repart de zéro
+    POLLING_POLICY.forget(agent_id)
+
+async def sweep_reply_bots():
+    """
+    Évince les bots inactifs depuis REPLY_BOT_IDLE_TTL et ceux dont l'agent n'existe plus.
+    """
+    if not REPLY_BOTS:
+        return
+    now = time.monotonic()
+    for agent_id, bot in list(REPLY_BOTS.items()):
+        if now - bot.last_used > REPLY_BOT_IDLE_TTL:
+            evict_reply_bot(agent_id)
+    existing = await ASYNC_AGENTS_DB.find_existing_agent_ids(list(REPLY_BOTS))
+    for agent_id in list(REPLY_BOTS):
+        if agent_id not in existing:
+            evict_reply_bot(agent_id)
+            CREDENTIALS_STORE.invalidate(agent_id)
+    logger.debug("%s bot(s) de réponse en mémoire après nettoyage.", len(REPLY_BOTS))
+
+# Polling réparti : créneau stable par agent, limite globale de jobs simultanés,
+# fréquence adaptée au volume de mentions de chaque agent.
+POLLING_POLICY = AdaptivePollingPolicy()
+MENTION_JOBS_SEMAPHORE = asyncio.Semaphore(int(os.getenv("MENTIONS_MAX_CONCURRENT_JOBS", "20")))
+
+async def execute_mentions_reply(agent_id: str):
     """
     Fonction lancée par APScheduler toutes les X minutes pour répondre aux mentions.
+    Credentials (CREDENTIALS_STORE) et clé OpenAI (environnement) sont résolus à chaque
+    passage : le job store ne contient que agent_id.
     (Async pour supporter le multi-user en parallèle)
     """
-    logger.info(f"[Agent {agent_id}] Exécution des réponses aux mentions à {datetime.utcnow().isoformat()} UTC")
+    async with MENTION_JOBS_SEMAPHORE, job_lease(f"mentions:{agent_id}", CLUSTER_JOB_LEASE_SECONDS) as acquired:
+        if not acquired:
+            logger.info("[Agent %s] Mentions déjà traitées par un autre nœud, passage ignoré.", agent_id)
+            return
+        logger.info("[Agent %s] Exécution des réponses aux mentions.", agent_id)
+        try:
+            credentials = await run_io(CREDENTIALS_STORE.get_credentials, agent_id)
+            bot = get_reply_bot(agent_id, credentials, openai_api_key=os.getenv("OPENAI_API_KEY"))
+            with metrics.span("mentions_pass", agent_id):
+                await bot.execute_replies()
+        except ValueError as ve:
+            logger.warning("[Agent %s] Erreur d'initialisation: %s", agent_id, ve)
+            return
+        except Exception as e:
+            logger.error("[Agent %s] Erreur lors de l'exécution des réponses aux mentions: %s", agent_id, e)
+            return
+
     try:
-        bot = TwitterReplyBot(agent_id, credentials, openai_api_key=openai_api_key)
-        await bot.execute_replies()
-    except ValueError as ve:
-        logger.warning(f"[Agent {agent_id}] Erreur d'initialisation: {ve}")
+        await adapt_mentions_interval(agent_id, bot.mentions_found)
     except Exception as e:
-        logger.error(f"[Agent {agent_id}] Erreur lors de l'exécution des réponses aux mentions: {e}")
+        logger.error("[Agent %s] Ajustement de la fréquence de polling impossible: %s", agent_id, e)
+
+async def adapt_mentions_interval(agent_id: str, mentions_found: int):
+    """
+    Replanifie le job de mentions de l'agent si son volume récent justifie
+    un autre intervalle (toujours aligné sur le créneau de l'agent).
+    """
+    job_id = mentions_job_id(agent_id)
+    job = await run_io(scheduler.get_job, job_id)
+    if job is None or not isinstance(job.trigger, IntervalTrigger):
+        return
+    current = job.trigger.interval.total_seconds() / 60
+    proposed = POLLING_POLICY.record(agent_id, mentions_found, current)
+    if proposed == current:
+        return
+    start_date = next_slot_time(agent_id, proposed, datetime.now(scheduler.timezone))
+    await run_io(
+        scheduler.reschedule_job,
+        job_id,
+        trigger=IntervalTrigger(minutes=proposed, start_date=start_date)
+    )
+    logger.info(
+        "[Agent %s] Polling des mentions: %g -> %g min (%s mention(s)).",
+        agent_id, current, proposed, mentions_found,
+    )
+
+# --------------------------------------------------------------------
+# Planification des mentions + réhydratation des jobs au démarrage
+# --------------------------------------------------------------------
+MENTIONS_INTERVAL_MINUTES = POLLING_POLICY.base_minutes
+REHYDRATE_DAILY_JITTER_MINUTES = float(os.getenv("REHYDRATE_DAILY_JITTER_MINUTES", "100"))
+
+def mentions_job_id(agent_id: str) -> str:
+    return f"mentions_agent_id:{agent_id}"
+
+def daily_tweet_job_id(agent_id: str) -> str:
+    return f"daily_tweet_job_{agent_id}"
+
+def schedule_mentions_job(
+    agent_id: str,
+    start_date: Optional[datetime] = None,
+    replace_existing: bool = False
+) -> str:
+    """
+    Planifie le job récurrent de réponse aux mentions de l'agent. Par défaut, le premier
+    déclenchement est aligné sur le créneau de l'agent (hash de agent_id) dans l'intervalle.
+    """
+    job_id = mentions_job_id(agent_id)
+    if start_date is None:
+        start_date = next_slot_time(agent_id, MENTIONS_INTERVAL_MINUTES, datetime.now(scheduler.timezone))
+    scheduler.add_job(
+        execute_mentions_reply,          # fonction async
+        trigger=IntervalTrigger(minutes=MENTIONS_INTERVAL_MINUTES, start_date=start_date),
+        args=[agent_id],
+        id=job_id,
+        replace_existing=replace_existing,
+        max_instances=1
+    )
+    return job_id
+
+def rehydrate_agent_jobs() -> Dict[str, int]:
+    """
+    Reconstruit les jobs de tous les agents de agentx (lecture groupée, projection minimale).
+    Les jobs manquants sont recréés et les jobs persistés en retard sont décalés :
+    tweets quotidiens à un instant aléatoire, mentions sur le créneau de l'agent,
+    pour étaler la charge au redémarrage. Un tweet quotidien dont la prochaine
+    exécution mémorisée (agentx) est encore à venir garde cette heure.
+    (Synchrone : exécuté dans l'exécuteur I/O, scheduler en pause.)
+    """
+    started = time.monotonic()
+    now = datetime.now(scheduler.timezone)
+    jobs = {job.id: job for job in scheduler.get_jobs()}
+    stats = {"agents": 0, "created": 0, "rescheduled": 0, "removed": 0}
+
+    # Jobs persistés par les versions précédentes (prompt, credentials et clé OpenAI
+    # dans les arguments) : ne garder que agent_id, les secrets sont relus à l'exécution
+    for job in jobs.values():
+        if job.func in (execute_daily_tweet, execute_mentions_reply) and len(job.args) > 1:
+            job.modify(args=[job.args[0]])
+
+    def jittered(max_minutes: float) -> datetime:
+        return now + timedelta(seconds=random.uniform(0, max_minutes * 60))
+
+    for record in AGENTS_DB.iter_scheduling_records():
+        fields = record.get("fields", {})
+        agent_id = fields.get("agent_id")
+        if not agent_id:
+            continue
+        if COORDINATOR is not None and not COORDINATOR.owns(agent_id):
+            # Agent confié à un autre nœud : retirer ses jobs locaux éventuels
+            for job_id in (daily_tweet_job_id(agent_id), mentions_job_id(agent_id)):
+                if job_id in jobs:
+                    scheduler.remove_job(job_id)
+                    stats["removed"] += 1
+            POLLING_POLICY.forget(agent_id)
+            continue
+        stats["agents"] += 1
+
+        daily_job = jobs.get(daily_tweet_job_id(agent_id))
+        next_daily = as_utc(fields.get("next_daily_tweet_at"))
+        if next_daily is not None and next_daily <= now:
+            next_daily = None
+        if daily_job is None:
+            if next_daily is not None:
+                schedule_daily_tweet_job(agent_id, next_daily, persist=False)
+            else:
+                schedule_daily_tweet_job(agent_id, jittered(REHYDRATE_DAILY_JITTER_MINUTES))
+            stats["created"] += 1
+        elif next_daily is not None and (daily_job.next_run_time is None or daily_job.next_run_time < next_daily):
+            # Un autre nœud a publié entre-temps : s'aligner sur l'heure mémorisée
+            daily_job.modify(next_run_time=next_daily)
+            stats["rescheduled"] += 1
+        elif daily_job.next_run_time is None or daily_job.next_run_time <= now:
+            run_at = jittered(REHYDRATE_DAILY_JITTER_MINUTES)
+            daily_job.modify(next_run_time=run_at)
+            AGENTS_DB.set_next_daily_tweet(agent_id, run_at)
+            stats["rescheduled"] += 1
+
+        mentions_job = jobs.get(mentions_job_id(agent_id))
+        if mentions_job is None:
+            schedule_mentions_job(agent_id)
+            stats["created"] += 1
+        elif mentions_job.next_run_time is None or mentions_job.next_run_time <= now:
+            interval = mentions_job.trigger.interval.total_seconds() / 60
+            mentions_job.modify(next_run_time=next_slot_time(agent_id, interval, now))
+            stats["rescheduled"] += 1
+
+    logger.info(
+        "Réhydratation: %s agent(s), %s job(s) créé(s), %s décalé(s), %s retiré(s) en %.2fs.",
+        stats['agents'], stats['created'], stats['rescheduled'], stats['removed'], time.monotonic() - started,
+    )
+    return stats
+
+def record_scheduler_event(event):
+    """
+    Listener APScheduler : retard de lancement (heure planifiée -> soumission) et issue des jobs.
+    """
+    kind = metrics.job_kind(event.job_id)
+    if event.code == EVENT_JOB_SUBMITTED:
+        now = datetime.now(scheduler.timezone)
+        for run_time in event.scheduled_run_times:
+            metrics.SCHEDULER_LAG_SECONDS.observe(max(0.0, (now - run_time).total_seconds()), job=kind)
+    elif event.code == EVENT_JOB_EXECUTED:
+        metrics.SCHEDULER_JOBS.inc(job=kind, outcome="executed")
+    elif event.code == EVENT_JOB_ERROR:
+        metrics.SCHEDULER_JOBS.inc(job=kind, outcome="error")
+    elif event.code == EVENT_JOB_MISSED:
+        metrics.SCHEDULER_JOBS.inc(job=kind, outcome="missed")
+
+_last_reconcile = 0.0
+
+async def cluster_heartbeat():
+    """
+    Heartbeat du nœud ; rééquilibre les jobs locaux quand des nœuds rejoignent ou
+    quittent le cluster, et périodiquement pour prendre en charge les nouveaux agents.
+    """
+    global _last_reconcile
+    changed = await run_io(COORDINATOR.heartbeat)
+    if changed or time.monotonic() - _last_reconcile >= CLUSTER_RECONCILE_SECONDS:
+        _last_reconcile = time.monotonic()
+        await run_io(rehydrate_agent_jobs)
 
 # --------------------------------------------------------------------
 # Endpoints FastAPI (async)
 # --------------------------------------------------------------------
-@app.post("/create-agent")
-async def create_agent(req: CreateAgentRequest):
+class OnboardingError(Exception):
     """
-    Crée un agent pour automatiser Twitter :
-    - Un job quotidien pour poster un tweet (planifié dans 2 min).
-    - Un job récurrent pour répondre aux mentions (toutes les 10 min par ex).
-    - Met à jour la bio Twitter et poste un tweet initial.
+    Échec d'onboarding d'un agent, avec le code HTTP à renvoyer.
+    """
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def unschedule_agent_jobs(agent_id: str) -> None:
+    for job_id in (daily_tweet_job_id(agent_id), mentions_job_id(agent_id)):
+        try:
+            scheduler.remove_job(job_id)
+        except JobLookupError:
+            pass
+
+def schedule_agent_jobs(agent_id: str) -> None:
+    """
+    Planifie tweet quotidien et mentions de l'agent, tout ou rien : en cas d'échec,
+    les jobs déjà créés sont retirés avant de relancer l'erreur.
+    (Synchrone : le jobstore Mongo est appelé depuis l'exécuteur I/O.)
+    """
+    try:
+        schedule_daily_tweet_job(agent_id)
+        job_id = schedule_mentions_job(agent_id)
+        logger.info("[Agent %s] Job mentions planifié (ID: %s).", agent_id, job_id)
+    except Exception:
+        unschedule_agent_jobs(agent_id)
+        raise
+
+async def onboard_agent(req: CreateAgentRequest) -> str:
+    """
+    Crée un agent : vérification des doublons (index twitter_keys_unique), un seul
+    get_me (authentification + nom du compte), puis insertion et planification
+    comme une seule unité (l'agent est supprimé si la planification échoue).
+    Lève OnboardingError ; retourne l'agent_id.
     """
     agent_id = str(uuid.uuid4())
     logger.info(
-        f"[Agent {agent_id}] Création d'un nouvel agent avec prompt: '{req.personality_prompt}'"
-        f" et nom: '{req.name}'"
+        "[Agent %s] Création d'un nouvel agent avec prompt: '%s' et nom: '%s'",
+        agent_id, req.personality_prompt, req.name,
     )
 
-    # Préparation des credentials
-    credentials = {
-        "personality_prompt": req.personality_prompt,
-        "TWITTER_API_KEY": req.TWITTER_API_KEY,
-        "TWITTER_API_SECRET_KEY": req.TWITTER_API_SECRET_KEY,
-        "TWITTER_ACCESS_TOKEN": req.TWITTER_ACCESS_TOKEN,
-        "TWITTER_ACCESS_TOKEN_SECRET": req.TWITTER_ACCESS_TOKEN_SECRET,
-        "TWITTER_BEARER_TOKEN": req.TWITTER_BEARER_TOKEN
-    }
-
-    # Vérifier si un agent existe déjà avec ces mêmes clés API
-    existing_agent = AGENTS_DB.find_by_api_keys(
+    # Vérifier si un agent existe déjà avec ces mêmes clés API (requête indexée)
+    existing_agent = await ASYNC_AGENTS_DB.find_by_api_keys(
         api_key=req.TWITTER_API_KEY,
         api_secret_key=req.TWITTER_API_SECRET_KEY,
         access_token=req.TWITTER_ACCESS_TOKEN,
         access_token_secret=req.TWITTER_ACCESS_TOKEN_SECRET
     )
     if existing_agent:
-        logger.warning(f"Agent existant avec ces clés API: {existing_agent.get('id')}")
-        raise HTTPException(status_code=400, detail="Agent with provided API keys already exists.")
-
-    # Test d'authentification initiale Tweepy + post initial (synchron)
+        logger.warning("Agent existant avec ces clés API: %s", existing_agent.get('id'))
+        raise OnboardingError(400, "Agent with provided API keys already exists.")
+
+    # Authentification Tweepy : un seul get_me fournit le nom et l'URL du profil
+    twitter_api = AsyncTwitterClient(tweepy.Client(
+        bearer_token=req.TWITTER_BEARER_TOKEN,
+        consumer_key=req.TWITTER_API_KEY,
+        consumer_secret=req.TWITTER_API_SECRET_KEY,
+        access_token=req.TWITTER_ACCESS_TOKEN,
+        access_token_secret=req.TWITTER_ACCESS_TOKEN_SECRET,
+    ))
     try:
-        client = tweepy.Client(
-            bearer_token=req.TWITTER_BEARER_TOKEN,
-            consumer_key=req.TWITTER_API_KEY,
-            consumer_secret=req.TWITTER_API_SECRET_KEY,
-            access_token=req.TWITTER_ACCESS_TOKEN,
-            access_token_secret=req.TWITTER_ACCESS_TOKEN_SECRET,
-        )
-        # Exemple de tweet initial (décommenter si besoin)
-        # client.create_tweet(text=f"Hello from new agent {req.name}!")
+        me = await twitter_api.get_me()
     except tweepy.TweepyException as e:
-        logger.error(f"[Agent {agent_id}] Erreur Tweepy: {e}")
-        raise HTTPException(status_code=500, detail="Duplicate agent or invalid credentials.")
-
-    def get_my_twitter_profile_url() -> Optional[str]:
-        # Mise à jour du profil via l'API v1.1 (synchron)
-        auth = tweepy.OAuthHandler(req.TWITTER_API_KEY, req.TWITTER_API_SECRET_KEY)
-        auth.set_access_token(req.TWITTER_ACCESS_TOKEN, req.TWITTER_ACCESS_TOKEN_SECRET)
-        api_v1 = tweepy.API(auth)
-
-        try:
-            user = client.get_me()
-            if user and user.data:
-                username = user.data.username
-                profile_url = f"https://twitter.com/{username}"
-                logger.debug(f"Profil Twitter: {profile_url}")
-                return profile_url
-            return None
-        except tweepy.TweepyException as e:
-            logger.error(f"Erreur récupération user data : {e}")
-            return None
-
-    # Récupération de la clé OpenAI
-    global_openai_api_key = os.getenv("OPENAI_API_KEY")
+        logger.error("[Agent %s] Erreur Tweepy: %s", agent_id, e)
+        raise OnboardingError(400, "Invalid Twitter credentials.")
+    if not me or not me.data:
+        raise OnboardingError(400, "Invalid Twitter credentials.")
+    username = me.data.username
 
     # Insérer l'agent dans la collection "agentx"
     agent_record = {
         "agent_id": agent_id,
-        "name": f'@{client.get_me().data.username}',
+        "name": f"@{username}",
         "agent_name": req.name,
-        "twitter_link": get_my_twitter_profile_url(),
+        "twitter_link": f"https://twitter.com/{username}",
         "personality_prompt": req.personality_prompt,
         "TWITTER_API_KEY": req.TWITTER_API_KEY,
         "TWITTER_API_SECRET_KEY": req.TWITTER_API_SECRET_KEY,
@@ -479,42 +1102,101 @@ async def create_agent(req: CreateAgentRequest):
         "TWITTER_BEARER_TOKEN": req.TWITTER_BEARER_TOKEN,
         "created_at": datetime.utcnow().isoformat()
     }
-    AGENTS_DB.insert(agent_record)
+    if await ASYNC_AGENTS_DB.insert_unique(agent_record) is None:
+        # Création concurrente avec les mêmes clés (signalée par l'index unique)
+        raise OnboardingError(400, "Agent with provided API keys already exists.")
 
-    logger.info(f"[Agent {agent_id}] Agent inséré dans MongoDB (collection agentx).")
+    logger.info("[Agent %s] Agent inséré dans MongoDB (collection agentx).", agent_id)
 
-    # Planifier le tweet quotidien (async)
-    try:
-        schedule_daily_tweet_job(agent_id, req.personality_prompt, credentials)
-    except Exception as e:
-        logger.error(f"[Agent {agent_id}] Erreur scheduling daily tweet: {e}")
-        raise HTTPException(status_code=500, detail="Error scheduling daily tweet.")
+    # En mode cluster, seul le nœud propriétaire planifie ; les autres nœuds
+    # prendront l'agent en charge à leur prochaine réconciliation.
+    if COORDINATOR is not None and not COORDINATOR.owns(agent_id):
+        logger.info("[Agent %s] Confié au nœud %s.", agent_id, COORDINATOR.owner_of(agent_id))
+    else:
+        try:
+            await run_io(schedule_agent_jobs, agent_id)
+        except Exception as e:
+            logger.error("[Agent %s] Erreur de planification, annulation de la création: %s", agent_id, e)
+            await ASYNC_AGENTS_DB.delete_by_agent_id(agent_id)
+            raise OnboardingError(500, "Error scheduling agent jobs.")
 
-    # Planifier le job de réponse aux mentions (async) toutes les 10 minutes
-    try:
-        mentions_job_id = f"mentions_agent_id:{agent_id}"
-        scheduler.add_job(
-            execute_mentions_reply,          # fonction async
-            trigger=IntervalTrigger(minutes=15),
-            args=[agent_id, credentials, global_openai_api_key],
-            id=mentions_job_id,
-            replace_existing=False,
-            max_instances=1
-        )
-        logger.info(f"[Agent {agent_id}] Job mentions planifié (ID: {mentions_job_id}).")
-    except Exception as e:
-        logger.error(f"[Agent {agent_id}] Erreur scheduling mentions reply job: {e}")
-        raise HTTPException(status_code=500, detail="Error scheduling mentions reply job.")
+    CREDENTIALS_STORE.invalidate(agent_id)
+    AGENTS_LIST_CACHE.clear()
+    logger.info("[Agent %s] Agent créé avec succès.", agent_id)
+    return agent_id
 
-    logger.info(f"[Agent {agent_id}] Agent créé avec succès.")
+@app.post("/create-agent")
+async def create_agent(req: CreateAgentRequest):
+    """
+    Crée un agent pour automatiser Twitter :
+    - Un job quotidien pour poster un tweet.
+    - Un job récurrent pour répondre aux mentions.
+    """
+    try:
+        agent_id = await onboard_agent(req)
+    except OnboardingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     return {
         "agent_id": agent_id,
-        "message": (
-            "Agent created successfully. "
-            "Profile bio updated, initial tweet posted."
-        )
+        "message": "Agent created successfully."
     }
 
+# --------------------------------------------------------------------
+# Onboarding groupé : traitement en arrière-plan, progression consultable
+# --------------------------------------------------------------------
+ONBOARDING_CONCURRENCY = int(os.getenv("ONBOARDING_CONCURRENCY", "10"))
+ONBOARDING_JOBS_TTL = float(os.getenv("ONBOARDING_JOBS_TTL", "86400"))
+_ONBOARDING_TASKS = set()
+
+class CreateAgentsBatchRequest(BaseModel):
+    agents: List[CreateAgentRequest] = Field(..., description="Agents à créer")
+
+async def run_onboarding_batch(job_id: str, requests: List[CreateAgentRequest]):
+    semaphore = asyncio.Semaphore(ONBOARDING_CONCURRENCY)
+
+    async def onboard(index: int, req: CreateAgentRequest) -> bool:
+        async with semaphore:
+            try:
+                agent_id = await onboard_agent(req)
+                result = {"status": "created", "agent_id": agent_id}
+            except OnboardingError as e:
+                result = {"status": "failed", "error": e.detail}
+            except Exception as e:
+                logger.error("Onboarding %s[%s] en échec: %s", job_id, index, e)
+                result = {"status": "failed", "error": "Internal error."}
+            try:
+                await ASYNC_ONBOARDING_DB.set_result(job_id, index, result)
+            except Exception as e:
+                logger.error("Onboarding %s[%s]: progression non enregistrée: %s", job_id, index, e)
+            return result["status"] == "created"
+
+    outcomes = await asyncio.gather(*(onboard(i, req) for i, req in enumerate(requests)))
+    await ASYNC_ONBOARDING_DB.finish(job_id)
+    logger.info("Onboarding %s terminé: %s créé(s), %s échec(s).", job_id, sum(outcomes), len(outcomes) - sum(outcomes))
+
+@app.post("/agents/batch", status_code=202)
+async def create_agents_batch(req: CreateAgentsBatchRequest):
+    """
+    Lance la création de plusieurs agents en parallèle (ONBOARDING_CONCURRENCY à la fois)
+    et retourne immédiatement un identifiant de suivi (GET /agents/batch/{job_id}).
+    """
+    job_id = f"onboarding_{uuid.uuid4().hex}"
+    await ASYNC_ONBOARDING_DB.create(job_id, len(req.agents), ONBOARDING_JOBS_TTL)
+    task = asyncio.create_task(run_onboarding_batch(job_id, req.agents))
+    _ONBOARDING_TASKS.add(task)
+    task.add_done_callback(_ONBOARDING_TASKS.discard)
+    return {"job_id": job_id, "total": len(req.agents)}
+
+@app.get("/agents/batch/{job_id}")
+async def agents_batch_status(job_id: str):
+    """
+    Progression d'un onboarding groupé (quel que soit le processus qui l'exécute).
+    """
+    job = await ASYNC_ONBOARDING_DB.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown onboarding job.")
+    return job
+
 @app.get("/")
 async def read_root():
     return {"message": "Bienvenue sur l'API d'Automatisation Twitter !"}
@@ -524,7 +1206,7 @@ async def list_jobs():
     """
     Retourne la liste des jobs APScheduler actifs.
     """
-    jobs = scheduler.get_jobs()
+    jobs = await run_io(scheduler.get_jobs)
     job_list = []
     for j in jobs:
         job_list.append({
@@ -536,24 +1218,130 @@ async def list_jobs():
     logger.debug("Liste des jobs récupérée.")
     return {"jobs": job_list}
 
+# Pages de /agents en cache court (invalidé par /create-agent)
+AGENTS_LIST_CACHE = TTLCache(
+    maxsize=int(os.getenv("AGENTS_LIST_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("AGENTS_LIST_CACHE_TTL", "5")),
+)
+AGENTS_PAGE_MAX = 500
+
+def encode_agents_cursor(fields: Dict) -> str:
+    raw = json.dumps([fields.get("created_at"), fields.get("agent_id")])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_agents_cursor(cursor: str) -> tuple:
+    try:
+        created_at, agent_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide.")
+    return created_at, agent_id
+
 @app.get("/agents")
-async def list_agents():
-    """
-    Retourne la liste de tous les agents stockés dans la DB.
-    """
-    agents = AGENTS_DB.get_all()
-    sanitized_agents = []
-    for agent in agents:
-        fields = agent.get("fields", {})
-        sanitized_agent = {
-            "id": fields.get("agent_id"),
-            "agent_name": fields.get("agent_name"),
-            "twitter_link": fields.get("twitter_link"),
-            "personality": fields.get("personality_prompt"),
-            "name": fields.get("name"),
-            "personality_prompt": fields.get("personality_prompt"),
-        }
-        sanitized_agents.append(sanitized_agent)
+async def list_agents(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order: str = "asc",
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+):
+    """
+    Retourne une page d'agents (champs publics uniquement), triée par date de création.
+    Passer next_cursor de la réponse comme cursor pour obtenir la page suivante.
+    """
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order doit valoir 'asc' ou 'desc'.")
+    limit = max(1, min(limit, AGENTS_PAGE_MAX))
+    cache_key = (limit, cursor, order, created_after, created_before)
+
+    async def load_page() -> Dict:
+        records = await ASYNC_AGENTS_DB.list_public(
+            limit=limit,
+            after=decode_agents_cursor(cursor) if cursor else None,
+            descending=order == "desc",
+            created_after=created_after,
+            created_before=created_before,
+        )
+        agents = [
+            {
+                "id": fields.get("agent_id"),
+                "agent_name": fields.get("agent_name"),
+                "twitter_link": fields.get("twitter_link"),
+                "personality": fields.get("personality_prompt"),
+                "name": fields.get("name"),
+                "personality_prompt": fields.get("personality_prompt"),
+                "created_at": fields.get("created_at"),
+            }
+            for fields in records
+        ]
+        next_cursor = encode_agents_cursor(records[-1]) if len(records) == limit else None
+        return {"agents": agents, "next_cursor": next_cursor}
+
+    page = AGENTS_LIST_CACHE.get(cache_key)
+    if page is None:
+        page = await load_page()
+        AGENTS_LIST_CACHE.set(cache_key, page)
     logger.debug("Liste des agents récupérée.")
-    return {"agents": sanitized_agents}
+    return page
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Métriques du processus au format texte Prometheus.
+    """
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats/mongo")
+async def mongo_stats():
+    """
+    Métriques du pool MongoDB partagé (connexions ouvertes, empruntées...).
+    """
+    return mongo_pool_stats()
+
+@app.get("/tweet-jobs")
+async def tweet_jobs():
+    """
+    Nombre de jobs de tweets quotidiens par statut (mode worker).
+    """
+    return {"mode": DAILY_TWEET_EXECUTION, "counts": await ASYNC_TWEET_JOBS_DB.counts()}
+
+@app.get("/stats/crews")
+async def crews_stats():
+    """
+    Temps de préparation et d'exécution des crews de ce processus,
+    et efficacité du cache de recherche partagé.
+    """
+    return {"crews": crew_timings(), "research_cache": research_cache_stats()}
+
+@app.get("/stats/replies")
+async def replies_stats():
+    """
+    Cache de réponses aux mentions (exact et quasi-doublons) et file d'écriture différée.
+    """
+    return {"reply_cache": REPLY_CACHE.stats(), "reply_writer": REPLY_WRITER.stats()}
 
+@app.get("/stats/llm")
+async def llm_stats(agent_id: Optional[str] = None):
+    """
+    Appels et tokens LLM : totaux du processus, ou détail d'un agent.
+    """
+    if agent_id:
+        return {"agent_id": agent_id, "usage": LLM_GATEWAY.usage(agent_id)}
+    return LLM_GATEWAY.stats()
+
+@app.get("/rate-limits")
+async def rate_limits():
+    """
+    Budgets Twitter courants, par empreinte de credentials puis par endpoint.
+    """
+    return {"budgets": RATE_LIMITER.snapshot()}
+
+@app.get("/cluster")
+async def cluster_status():
+    """
+    Nœuds vivants et nombre d'agents planifiés localement.
+    """
+    if COORDINATOR is None:
+        return {"mode": "off"}
+    jobs = await run_io(scheduler.get_jobs)
+    local_agents = {job.id.split(":", 1)[1] for job in jobs if job.id.startswith("mentions_agent_id:")}
+    return {"mode": "on", "node_id": COORDINATOR.node_id, "nodes": COORDINATOR.nodes, "local_agents": len(local_agents)}
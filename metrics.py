@@ -0,0 +1,212 @@
+# metrics.py
+
+import os
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+from pymongo import monitoring
+
+# --------------------------------------------------------------------
+# Registre minimal au format texte Prometheus (sans dépendance externe)
+# --------------------------------------------------------------------
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Histogrammes par agent : désactivables si la cardinalité (nombre d'agents) devient gênante
+METRICS_PER_AGENT = os.getenv("METRICS_PER_AGENT", "1") == "1"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {value:g}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # clé -> [compteurs par bucket (non cumulés), somme, total]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        for key, (counts, total, count) in values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%g"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {total:g}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# --------------------------------------------------------------------
+# Métriques de l'application
+# --------------------------------------------------------------------
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "autotweet_stage_seconds", "Durée des étapes (crew_kickoff, generate_response, mentions_pass...).", ["stage"],
+))
+AGENT_STAGE_SECONDS = REGISTRY.register(Histogram(
+    "autotweet_agent_stage_seconds", "Durée des étapes par agent.", ["agent_id", "stage"],
+))
+TWITTER_CALL_SECONDS = REGISTRY.register(Histogram(
+    "autotweet_twitter_call_seconds", "Durée des appels Tweepy (attente du rate limiter incluse).", ["endpoint", "outcome"],
+))
+MONGO_COMMAND_SECONDS = REGISTRY.register(Histogram(
+    "autotweet_mongo_command_seconds", "Durée des commandes MongoDB.", ["command", "outcome"],
+))
+SCHEDULER_LAG_SECONDS = REGISTRY.register(Histogram(
+    "autotweet_scheduler_lag_seconds", "Retard entre l'heure planifiée et le lancement effectif d'un job.", ["job"],
+))
+SCHEDULER_JOBS = REGISTRY.register(Counter(
+    "autotweet_scheduler_jobs_total", "Jobs APScheduler par issue (executed, error, missed).", ["job", "outcome"],
+))
+MENTIONS_FOUND = REGISTRY.register(Counter(
+    "autotweet_mentions_found_total", "Mentions trouvées par les passes de réponse.",
+))
+MENTIONS_REPLIED = REGISTRY.register(Counter(
+    "autotweet_mentions_replied_total", "Réponses aux mentions publiées.",
+))
+MENTIONS_REPLY_ERRORS = REGISTRY.register(Counter(
+    "autotweet_mentions_reply_errors_total", "Échecs de réponse aux mentions.",
+))
+
+
+def observe_stage(stage: str, seconds: float, agent_id: Optional[str] = None) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if agent_id and METRICS_PER_AGENT:
+        AGENT_STAGE_SECONDS.observe(seconds, agent_id=agent_id, stage=stage)
+
+
+@contextmanager
+def span(stage: str, agent_id: Optional[str] = None):
+    """
+    Chronomètre un bloc (synchrone ou contenant des await) dans autotweet_stage_seconds.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started, agent_id)
+
+
+@contextmanager
+def twitter_span(endpoint: str):
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        TWITTER_CALL_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, outcome=outcome)
+
+
+def job_kind(job_id: str) -> str:
+    """
+    Regroupe les jobs par type (un libellé par agent exploserait la cardinalité).
+    """
+    if job_id.startswith("daily_tweet_job_"):
+        return "daily_tweet"
+    if job_id.startswith("mentions_agent_id:"):
+        return "mentions"
+    return job_id
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Durée de chaque commande MongoDB (find, insert, update...), mesurée par le driver.
+    """
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
+
+
+MONGO_COMMAND_METRICS = MongoCommandMetrics()
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,139 @@
+# polling.py
+
+import os
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+def agent_slot_offset(agent_id: str, interval_seconds: int) -> int:
+    """
+    Décalage stable (en secondes) de l'agent dans l'intervalle, dérivé d'un hash :
+    les agents sont répartis uniformément au lieu de tous partir au même instant.
+    """
+    digest = hashlib.sha1(agent_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % max(1, interval_seconds)
+
+
+def next_slot_time(agent_id: str, interval_minutes: float, now: datetime) -> datetime:
+    """
+    Prochain instant >= now aligné sur le créneau de l'agent pour cet intervalle.
+    """
+    interval_seconds = max(1, int(interval_minutes * 60))
+    offset = agent_slot_offset(agent_id, interval_seconds)
+    epoch = int(now.timestamp())
+    delta = (offset - epoch) % interval_seconds
+    return (now + timedelta(seconds=delta)).replace(microsecond=0)
+
+
+class AdaptivePollingPolicy:
+    """
+    Ajuste la fréquence de polling des mentions de chaque agent à son volume récent
+    (moyenne mobile exponentielle du nombre de mentions par minute) :
+    les comptes calmes sont interrogés moins souvent, les comptes actifs plus souvent.
+    """
+    def __init__(
+        self,
+        base_minutes: float = None,
+        min_minutes: float = None,
+        max_minutes: float = None,
+        target_mentions_per_poll: float = None,
+        smoothing: float = 0.3,
+    ):
+        self.base_minutes = base_minutes or float(os.getenv("MENTIONS_INTERVAL_MINUTES", "15"))
+        self.min_minutes = min_minutes or float(os.getenv("MENTIONS_MIN_INTERVAL_MINUTES", "5"))
+        self.max_minutes = max_minutes or float(os.getenv("MENTIONS_MAX_INTERVAL_MINUTES", "60"))
+        self.target = target_mentions_per_poll or float(os.getenv("MENTIONS_TARGET_PER_POLL", "10"))
+        self.smoothing = smoothing
+        self._rates: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, agent_id: str, mentions_found: int, interval_minutes: float) -> float:
+        """
+        Enregistre le volume d'un passage et retourne l'intervalle conseillé (minutes).
+        """
+        rate = mentions_found / max(interval_minutes, 1e-6)
+        with self._lock:
+            previous = self._rates.get(agent_id)
+            smoothed = rate if previous is None else self.smoothing * rate + (1 - self.smoothing) * previous
+            self._rates[agent_id] = smoothed
+        if smoothed <= 0:
+            proposed = self.max_minutes
+        else:
+            proposed = self.target / smoothed
+        # Arrondi à la minute pour éviter de replanifier à chaque passage
+        return float(round(min(self.max_minutes, max(self.min_minutes, proposed))))
+
+    def forget(self, agent_id: str) -> None:
+        with self._lock:
+            self._rates.pop(agent_id, None)
+
+
+async def fetch_mention_pages(
+    fetch_page: Callable[..., Awaitable],
+    params: Dict,
+    max_pages: int,
+    on_page: Optional[Callable] = None,
+) -> Tuple[List, bool]:
+    """
+    Lit les pages de mentions en suivant next_token, jusqu'à la dernière page ou
+    max_pages pages. on_page(response) est appelé pour chaque réponse (includes).
+    Retourne (mentions, complete) : complete est faux s'il reste des pages non lues.
+    """
+    mentions: List = []
+    pagination_token = None
+    for _ in range(max_pages):
+        page_params = dict(params, pagination_token=pagination_token) if pagination_token else params
+        response = await fetch_page(**page_params)
+        if on_page is not None:
+            on_page(response)
+        if response and response.data:
+            mentions.extend(response.data)
+        pagination_token = (getattr(response, "meta", None) or {}).get("next_token")
+        if not pagination_token:
+            break
+    return mentions, not pagination_token
+
+
+def advance_mention_cursor(state: Dict, fetched_ids, complete: bool, failed_ids=()) -> Dict:
+    """
+    Calcule le nouvel état du curseur de mentions d'un agent après une passe.
+
+    L'API renvoie les mentions de la plus récente à la plus ancienne dans la fenêtre
+    (newest_id, until_id). État persistant :
+    - newest_id : toutes les mentions <= newest_id sont traitées (since_id) ;
+    - until_id : rattrapage en cours, la prochaine passe relit la fenêtre sous until_id ;
+    - pending_newest_id : valeur de newest_id une fois le rattrapage terminé.
+
+    complete indique que la pagination a atteint newest_id ; failed_ids sont les mentions
+    lues mais non traitées (lookup du parent en échec) : elles restent dans la fenêtre
+    de la prochaine passe. Le curseur ne dépasse jamais une mention non lue ou non traitée.
+    """
+    newest = state.get("newest_id")
+    until = state.get("until_id")
+    fetched = [int(i) for i in fetched_ids]
+    failed = [int(i) for i in failed_ids]
+    # Borne haute déjà couverte : la plus récente mention vue depuis le début du rattrapage
+    candidates = [
+        x for x in (state.get("pending_newest_id") if until else None, max(fetched, default=None))
+        if x is not None
+    ]
+    target = max(candidates) if candidates else None
+
+    if complete and not failed:
+        # Fenêtre entièrement traitée jusqu'à newest_id
+        if target is None:
+            return {"newest_id": newest, "until_id": None, "pending_newest_id": None}
+        return {"newest_id": max(target, newest or 0), "until_id": None, "pending_newest_id": None}
+
+    if complete:
+        # Tout est traité sous la plus ancienne mention en échec
+        newest = max(min(failed) - 1, newest or 0)
+    return {
+        "newest_id": newest,
+        # Relire depuis juste au-dessus de la mention en échec la plus récente,
+        # sinon sous la plus ancienne mention lue (pages restantes)
+        "until_id": max(failed) + 1 if failed else min(fetched, default=until),
+        "pending_newest_id": target,
+    }
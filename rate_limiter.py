@@ -0,0 +1,207 @@
+# rate_limiter.py
+
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+# Priorités (plus petit = plus prioritaire) : les réponses passent avant les tweets
+# quotidiens, qui passent avant les lectures de fond
+PRIORITY_REPLY = 0
+PRIORITY_DAILY_TWEET = 5
+PRIORITY_READ = 10
+
+
+def credential_fingerprint(*secrets: Optional[str]) -> str:
+    """
+    Identifiant court et non réversible d'un jeu de credentials (clé des budgets).
+    """
+    digest = hashlib.sha256("|".join(s or "" for s in secrets).encode("utf-8")).hexdigest()
+    return digest[:12]
+
+
+class RateBudget:
+    """
+    Budget d'un couple (endpoint, credentials), alimenté par les en-têtes
+    x-rate-limit-limit / x-rate-limit-remaining / x-rate-limit-reset de l'API.
+    Tant qu'aucun en-tête n'a été vu, le budget est considéré comme illimité.
+    """
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: float = 0.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled_total = 0
+
+    def available(self, now: float) -> bool:
+        if self.remaining is None or now >= self.reset_at:
+            return True
+        return self.remaining - self.in_flight > 0
+
+    def snapshot(self, now: float) -> Dict:
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_in_seconds": max(0.0, round(self.reset_at - now, 1)) if self.reset_at else None,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "throttled_total": self.throttled_total,
+        }
+
+
+class RateLimiter:
+    """
+    Ordonnanceur global des appels Twitter : un budget par (endpoint, credentials).
+    Les appels au-delà du budget attendent la fenêtre suivante au lieu d'échouer.
+    Les priorités s'appliquent par credentials, tous endpoints confondus : tant qu'une
+    réponse attend son tour, les lectures du même compte attendent aussi (inutile de
+    lire de nouvelles mentions quand les réponses ne peuvent pas partir).
+    Thread-safe : les en-têtes sont relus depuis les threads d'exécution I/O.
+    Les budgets inactifs (rien en vol ni en attente, fenêtre terminée) sont retirés
+    au plus toutes les prune_interval secondes : credentials supprimés ou d'onboardings
+    échoués ne s'accumulent pas.
+    """
+    def __init__(self, poll_interval: float = 0.5, prune_interval: float = 300.0):
+        self._budgets: Dict[Tuple[str, str], RateBudget] = {}
+        # credentials -> {(priorité, endpoint): nombre d'appels en attente}
+        self._waiting: Dict[str, Dict[Tuple[int, str], int]] = {}
+        self._lock = threading.Lock()
+        self.poll_interval = poll_interval
+        self.prune_interval = prune_interval
+        self._last_prune = time.time()
+
+    def _budget(self, endpoint: str, credential_key: str, now: float) -> RateBudget:
+        """
+        Budget du couple (créé si besoin). À appeler sous self._lock.
+        """
+        key = (endpoint, credential_key)
+        budget = self._budgets.get(key)
+        if budget is None:
+            if now - self._last_prune >= self.prune_interval:
+                self._prune(now)
+            budget = self._budgets[key] = RateBudget()
+        return budget
+
+    def _prune(self, now: float) -> None:
+        """
+        Retire les budgets sans appel en vol ni en attente dont la fenêtre est terminée
+        (un budget recréé repart « illimité », comme après une réinitialisation). Sous self._lock.
+        """
+        self._last_prune = now
+        for key, budget in list(self._budgets.items()):
+            if budget.in_flight == 0 and budget.waiting == 0 and now >= budget.reset_at:
+                del self._budgets[key]
+
+    def _blocked_by_priority(self, credential_key: str, priority: int) -> bool:
+        """
+        Vrai si un appel plus prioritaire du même compte attend, quel que soit son endpoint.
+        """
+        return any(
+            count > 0 and waiting_priority < priority
+            for (waiting_priority, _), count in self._waiting.get(credential_key, {}).items()
+        )
+
+    def _try_acquire(self, endpoint: str, credential_key: str, priority: int) -> Optional[float]:
+        """
+        Réserve une requête si possible ; sinon retourne le délai d'attente suggéré.
+        """
+        now = time.time()
+        with self._lock:
+            budget = self._budget(endpoint, credential_key, now)
+            if budget.available(now) and not self._blocked_by_priority(credential_key, priority):
+                if budget.remaining is not None and now >= budget.reset_at:
+                    # Nouvelle fenêtre : le prochain en-tête donnera le vrai solde
+                    budget.remaining = None
+                budget.in_flight += 1
+                return None
+            if budget.available(now):
+                return self.poll_interval
+            return max(self.poll_interval, budget.reset_at - now)
+
+    def _enqueue(self, endpoint: str, credential_key: str, priority: int, delta: int) -> None:
+        with self._lock:
+            budget = self._budget(endpoint, credential_key, time.time())
+            waiting = self._waiting.setdefault(credential_key, {})
+            key = (priority, endpoint)
+            waiting[key] = waiting.get(key, 0) + delta
+            if waiting[key] <= 0:
+                del waiting[key]
+                if not waiting:
+                    del self._waiting[credential_key]
+            budget.waiting += delta
+            if delta > 0:
+                budget.throttled_total += 1
+
+    async def acquire(self, endpoint: str, credential_key: str, priority: int = PRIORITY_READ) -> None:
+        delay = self._try_acquire(endpoint, credential_key, priority)
+        if delay is None:
+            return
+        self._enqueue(endpoint, credential_key, priority, 1)
+        try:
+            while delay is not None:
+                await asyncio.sleep(min(delay, 5.0))
+                delay = self._try_acquire(endpoint, credential_key, priority)
+        finally:
+            self._enqueue(endpoint, credential_key, priority, -1)
+
+    def acquire_blocking(self, endpoint: str, credential_key: str, priority: int = PRIORITY_READ) -> None:
+        """
+        Variante synchrone, pour les appels faits depuis un thread (outils CrewAI).
+        """
+        delay = self._try_acquire(endpoint, credential_key, priority)
+        if delay is None:
+            return
+        self._enqueue(endpoint, credential_key, priority, 1)
+        try:
+            while delay is not None:
+                time.sleep(min(delay, 5.0))
+                delay = self._try_acquire(endpoint, credential_key, priority)
+        finally:
+            self._enqueue(endpoint, credential_key, priority, -1)
+
+    def release(self, endpoint: str, credential_key: str) -> None:
+        with self._lock:
+            budget = self._budget(endpoint, credential_key, time.time())
+            budget.in_flight = max(0, budget.in_flight - 1)
+
+    def update_from_headers(self, endpoint: str, credential_key: str, headers) -> None:
+        """
+        Met à jour le budget à partir des en-têtes x-rate-limit-* d'une réponse.
+        """
+        if not headers or "x-rate-limit-remaining" not in headers:
+            return
+        with self._lock:
+            budget = self._budget(endpoint, credential_key, time.time())
+            try:
+                budget.remaining = int(headers["x-rate-limit-remaining"])
+                budget.reset_at = float(headers.get("x-rate-limit-reset", budget.reset_at))
+                if "x-rate-limit-limit" in headers:
+                    budget.limit = int(headers["x-rate-limit-limit"])
+            except (TypeError, ValueError):
+                pass
+
+    def mark_exhausted(self, endpoint: str, credential_key: str, reset_at: Optional[float] = None) -> None:
+        """
+        Après un 429 : plus aucune requête jusqu'à la réinitialisation de la fenêtre.
+        """
+        with self._lock:
+            budget = self._budget(endpoint, credential_key, time.time())
+            budget.remaining = 0
+            budget.reset_at = max(budget.reset_at, reset_at or time.time() + 60)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Budgets courants, par credentials puis par endpoint.
+        """
+        now = time.time()
+        result: Dict[str, Dict[str, Dict]] = {}
+        with self._lock:
+            for (endpoint, credential_key), budget in self._budgets.items():
+                result.setdefault(credential_key, {})[endpoint] = budget.snapshot(now)
+        return result
+
+
+# Instance partagée par le processus
+RATE_LIMITER = RateLimiter()
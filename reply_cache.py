@@ -0,0 +1,167 @@
+# reply_cache.py
+
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4  # 4 bandes de 16 bits : deux textes à <= 3 bits d'écart partagent au moins une bande
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+
+_URL = re.compile(r"https?://\S+")
+_MENTION = re.compile(r"@\w+")
+_NON_WORD = re.compile(r"[^\w#]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalise un tweet pour la comparaison : casse, liens, @mentions, ponctuation, espaces.
+    """
+    text = _URL.sub(" ", text.lower())
+    text = _MENTION.sub(" ", text)
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def simhash(normalized: str) -> int:
+    """
+    Empreinte simhash 64 bits sur les mots et bigrammes du texte normalisé.
+    """
+    words = normalized.split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _agent_ttl_overrides() -> Dict[str, float]:
+    """
+    REPLY_CACHE_AGENT_TTLS="agent-news=600,agent-evergreen=86400" (secondes)
+    """
+    overrides = {}
+    for item in os.getenv("REPLY_CACHE_AGENT_TTLS", "").split(","):
+        if "=" in item:
+            agent_id, ttl = item.split("=", 1)
+            overrides[agent_id.strip()] = float(ttl)
+    return overrides
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    mask = (1 << _BAND_BITS) - 1
+    return [(i, (fingerprint >> (i * _BAND_BITS)) & mask) for i in range(SIMHASH_BANDS)]
+
+
+def persona_key(system_prompt: str, agent_id: str) -> str:
+    """
+    Persona d'un agent pour le cache : prompt système + agent_id. Le prompt de réponse
+    est commun à tous les agents ; sans l'agent_id, des comptes différents publieraient
+    le même texte sur un fil viral.
+    """
+    digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+    return f"{digest}:{agent_id}"
+
+
+class ReplyCache:
+    """
+    Cache des réponses générées, clé = (persona, texte parent normalisé), avec
+    rapprochement optionnel des quasi-doublons par simhash (distance de Hamming).
+    Mémoire bornée (LRU), TTL par entrée (surcharge par agent via REPLY_CACHE_AGENT_TTLS), thread-safe.
+    """
+    def __init__(self, maxsize: int = None, ttl: float = None, max_distance: int = None, near_duplicates: bool = None):
+        self.maxsize = maxsize or int(os.getenv("REPLY_CACHE_SIZE", "5000"))
+        self.ttl = ttl or float(os.getenv("REPLY_CACHE_TTL", "3600"))
+        self.max_distance = max_distance if max_distance is not None else int(os.getenv("REPLY_CACHE_MAX_DISTANCE", "3"))
+        if near_duplicates is None:
+            near_duplicates = os.getenv("REPLY_CACHE_NEAR_DUPLICATES", "1") == "1"
+        self.near_duplicates = near_duplicates
+        self.agent_ttls: Dict[str, float] = _agent_ttl_overrides()
+        # clé exacte -> (expiration, persona, empreinte, réponse)
+        self._entries: "OrderedDict[str, Tuple[float, str, int, str]]" = OrderedDict()
+        self._bands: Dict[Tuple[str, int, int], set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(persona: str, normalized: str) -> str:
+        return hashlib.sha256(f"{persona}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def set_agent_ttl(self, agent_id: str, ttl: float) -> None:
+        self.agent_ttls[agent_id] = ttl
+
+    def get(self, persona: str, text: str) -> Optional[str]:
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+        key = self._key(persona, normalized)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[3]
+            if entry:
+                self._remove(key)
+            if self.near_duplicates:
+                fingerprint = simhash(normalized)
+                for band in _bands(fingerprint):
+                    for candidate in list(self._bands.get((persona,) + band, ())):
+                        expires_at, _, other, reply = self._entries[candidate]
+                        if expires_at <= now:
+                            self._remove(candidate)
+                        elif bin(fingerprint ^ other).count("1") <= self.max_distance:
+                            self._entries.move_to_end(candidate)
+                            self.near_hits += 1
+                            return reply
+            self.misses += 1
+            return None
+
+    def set(self, persona: str, text: str, reply: str, agent_id: Optional[str] = None) -> None:
+        normalized = normalize_text(text)
+        if not normalized:
+            return
+        key = self._key(persona, normalized)
+        ttl = self.agent_ttls.get(agent_id, self.ttl)
+        fingerprint = simhash(normalized) if self.near_duplicates else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, persona, fingerprint, reply)
+            if self.near_duplicates:
+                for band in _bands(fingerprint):
+                    self._bands.setdefault((persona,) + band, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, persona, fingerprint, _ = self._entries.pop(key)
+        if self.near_duplicates:
+            for band in _bands(fingerprint):
+                bucket = self._bands.get((persona,) + band)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._bands[(persona,) + band]
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+        }
+
+
+# Instance partagée par le processus
+REPLY_CACHE = ReplyCache()
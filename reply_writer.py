@@ -0,0 +1,143 @@
+# reply_writer.py
+
+import os
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+
+from aio import run_io
+from db import DataDatabase, new_record_id
+
+logger = logging.getLogger(__name__)
+
+REPLY_WRITER_BATCH_SIZE = int(os.getenv("REPLY_WRITER_BATCH_SIZE", "100"))
+REPLY_WRITER_FLUSH_SECONDS = float(os.getenv("REPLY_WRITER_FLUSH_SECONDS", "1.0"))
+
+
+class ReplyRecordWriter:
+    """
+    Écriture différée (write-behind) des réponses aux mentions et des curseurs de mentions.
+    Les enregistrements sont regroupés puis écrits en un bulk_write idempotent
+    (DataDatabase.upsert_replies) dès REPLY_WRITER_BATCH_SIZE éléments ou toutes les
+    REPLY_WRITER_FLUSH_SECONDS secondes, et au shutdown. Les curseurs ne sont écrits
+    qu'après les réponses qu'ils couvrent.
+
+    Le marqueur durable de chaque réponse est posé avant publication
+    (DataDatabase.claim_reply) : le flush ne fait que le compléter, et un crash avant
+    le flush ne provoque pas de seconde réponse. Tant qu'une réponse n'est pas écrite,
+    sa conversation reste aussi visible via pending_conversation_ids().
+    """
+    def __init__(self, db: Optional[DataDatabase] = None,
+                 batch_size: int = REPLY_WRITER_BATCH_SIZE,
+                 flush_seconds: float = REPLY_WRITER_FLUSH_SECONDS):
+        self._db = db
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._records: Dict[str, Dict] = {}      # agent_id:conversation_id -> enregistrement
+        self._pending: Dict[str, Set[str]] = {}  # agent_id -> conversation_ids non écrits
+        self._cursors: Dict[str, Dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.written = 0
+        self.errors = 0
+
+    @property
+    def db(self) -> DataDatabase:
+        if self._db is None:
+            self._db = DataDatabase()
+        return self._db
+
+    async def add(self, fields: Dict) -> Dict:
+        """
+        Met en file un enregistrement de réponse (fields contient agent_id et
+        mentioned_conversation_tweet_id). Déclenche un flush si le lot est plein.
+        """
+        agent_id = fields["agent_id"]
+        conversation_id = str(fields["mentioned_conversation_tweet_id"])
+        record = {"id": new_record_id(), "fields": fields}
+        self._records.setdefault(DataDatabase.reply_key(agent_id, conversation_id), record)
+        self._pending.setdefault(agent_id, set()).add(conversation_id)
+        if len(self._records) >= self.batch_size:
+            await self.flush()
+        return record
+
+    def set_cursor(self, agent_id: str, state: Dict) -> None:
+        """
+        Écrit l'état du curseur de mentions de l'agent au prochain flush (après ses réponses).
+        """
+        self._cursors[agent_id] = dict(state)
+
+    def pending_cursor(self, agent_id: str) -> Optional[Dict]:
+        """
+        État du curseur pas encore écrit (plus récent que celui de la base).
+        """
+        state = self._cursors.get(agent_id)
+        return dict(state) if state is not None else None
+
+    def pending_conversation_ids(self, agent_id: str) -> Set[str]:
+        return set(self._pending.get(agent_id, ()))
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            records = dict(self._records)
+            cursors = dict(self._cursors)
+            if not records and not cursors:
+                return
+            try:
+                if records:
+                    self.written += await run_io(self.db.upsert_replies, list(records.values()))
+                if cursors:
+                    await run_io(self.db.set_mention_cursors, cursors)
+            except Exception as e:
+                # Les éléments restent en file : le lot est rejoué au prochain flush (idempotent)
+                self.errors += 1
+                logger.error("Écriture différée des réponses en échec (%s en attente): %s", len(records), e)
+                return
+            self.flushes += 1
+            for key, record in records.items():
+                self._records.pop(key, None)
+                fields = record["fields"]
+                pending = self._pending.get(fields["agent_id"])
+                if pending is not None:
+                    pending.discard(str(fields["mentioned_conversation_tweet_id"]))
+                    if not pending:
+                        del self._pending[fields["agent_id"]]
+            for agent_id, state in cursors.items():
+                if self._cursors.get(agent_id) == state:
+                    del self._cursors[agent_id]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Arrête le flush périodique et écrit ce qui reste en file.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "queued_records": len(self._records),
+            "queued_cursors": len(self._cursors),
+            "flushes": self.flushes,
+            "written": self.written,
+            "errors": self.errors,
+        }
+
+
+# Instance partagée par le processus
+REPLY_WRITER = ReplyRecordWriter()
@@ -35,22 +35,9 @@ class GenerateCreativeTweetsTask(Task):
                 A well-written tweet reflecting the personality, 
                 referencing relevant new facts or trends, 
                 and containing exactly 2 hashtags.
+                Return only the tweet text, without quotes or commentary.
             """),
             agent=agent,
             personality_prompt=personality_prompt,
             tweets_text=tweets_text
         )
-
-class PublishTweetsTask(Task):
-    tweet_text: str = Field(..., description="Tweet content to publish")
-
-    def __init__(self, agent, tweet_text: str):
-        super().__init__(
-            description=dedent("""
-                Publish the tweet using the agent's credentials
-                and return the result of the operation.
-            """),
-            expected_output="Summary of the tweet status (success or error).",
-            agent=agent,
-            tweet_text=tweet_text,
-        )
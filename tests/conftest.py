@@ -0,0 +1,21 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import mongomock
+import pytest
+
+# Les modules de l'application sont à la racine du dépôt (pas de package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    """
+    Client MongoDB en mémoire (mongomock) servi par db.get_mongo_client.
+    """
+    import db
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(db, "get_mongo_client", lambda mongo_uri=None: client)
+    return client
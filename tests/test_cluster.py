@@ -0,0 +1,79 @@
+# tests/test_cluster.py
+
+import asyncio
+import time
+
+from cluster import ClusterCoordinator, LocalLeaseStore
+
+
+def test_lease_is_exclusive_until_released():
+    store = LocalLeaseStore()
+    assert store.acquire("daily_tweet:a", "node-1", 60)
+    assert not store.acquire("daily_tweet:a", "node-2", 60)
+    # Le détenteur peut renouveler son bail
+    assert store.acquire("daily_tweet:a", "node-1", 60)
+
+    store.release("daily_tweet:a", "node-2")  # sans effet : node-2 n'est pas détenteur
+    assert not store.acquire("daily_tweet:a", "node-2", 60)
+
+    store.release("daily_tweet:a", "node-1")
+    assert store.acquire("daily_tweet:a", "node-2", 60)
+
+
+def test_lease_expires():
+    store = LocalLeaseStore()
+    assert store.acquire("mentions:a", "node-1", 0.05)
+    assert not store.acquire("mentions:a", "node-2", 0.05)
+    time.sleep(0.1)
+    assert store.acquire("mentions:a", "node-2", 60)
+
+
+def test_remove_node_drops_its_leases():
+    store = LocalLeaseStore()
+    store.heartbeat("node-1", 60)
+    store.acquire("daily_tweet:a", "node-1", 60)
+    store.remove_node("node-1")
+    assert store.live_nodes() == []
+    assert store.acquire("daily_tweet:a", "node-2", 60)
+
+
+def test_nodes_agree_on_ownership():
+    store = LocalLeaseStore()
+    first = ClusterCoordinator(store, node_id="node-1", node_ttl=60)
+    second = ClusterCoordinator(store, node_id="node-2", node_ttl=60)
+    first.heartbeat()
+    second.heartbeat()
+    assert first.heartbeat() is True  # node-2 est apparu depuis le premier heartbeat
+    assert first.nodes == second.nodes == ["node-1", "node-2"]
+
+    agents = [f"agent-{i}" for i in range(50)]
+    for agent_id in agents:
+        assert first.owns(agent_id) != second.owns(agent_id)
+    assert {first.owner_of(agent_id) for agent_id in agents} == {"node-1", "node-2"}
+
+    # Départ d'un nœud : l'autre reprend tous les agents
+    second.leave()
+    first.heartbeat()
+    assert all(first.owns(agent_id) for agent_id in agents)
+
+
+def test_exclusive_context():
+    store = LocalLeaseStore()
+    first = ClusterCoordinator(store, node_id="node-1", node_ttl=60)
+    second = ClusterCoordinator(store, node_id="node-2", node_ttl=60)
+
+    async def scenario():
+        async with first.exclusive("mentions:a", 60) as acquired:
+            assert acquired
+            async with second.exclusive("mentions:a", 60) as other:
+                assert not other
+        # Libéré à la sortie du contexte
+        async with second.exclusive("mentions:a", 60) as acquired:
+            assert acquired
+        # release=False : le bail reste posé
+        async with first.exclusive("daily_tweet:a", 60, release=False) as acquired:
+            assert acquired
+        async with second.exclusive("daily_tweet:a", 60) as acquired:
+            assert not acquired
+
+    asyncio.run(scenario())
@@ -0,0 +1,23 @@
+# tests/test_crew_llm.py
+
+from crewai import Agent
+
+from crew_llm import crew_llm
+from llm_gateway import LLMGateway, agent_scope
+
+
+def test_crewai_agents_call_the_gateway_model():
+    gateway = LLMGateway(backend="fake")
+    model = gateway.chat_model("gpt-4o-2024-08-06", 0.8)
+    model.latency_ms = 0
+    llm = crew_llm(model)
+    # CrewAI accepte l'adaptateur tel quel (pas de client litellm reconstruit)
+    agent = Agent(role="Writer", goal="Write tweets", backstory="Writes tweets.", llm=llm)
+    assert agent.llm is llm
+
+    llm.stop = ["history"]
+    with agent_scope("agent-a"):
+        text = llm.call([{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Tweet?"}])
+    assert text == "Interesting take,"
+    assert gateway.usage("agent-a")["calls"] == 1
+    assert llm.get_token_usage_summary().successful_requests == 1
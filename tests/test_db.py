@@ -0,0 +1,122 @@
+# tests/test_db.py
+
+from db import AgentsDatabase, DataDatabase, OnboardingJobsDatabase, TweetJobsDatabase
+
+
+def make_agents(mongo_client):
+    agents = AgentsDatabase()
+    agents.collection.insert_many([
+        {"id": f"rec_{i}", "fields": {
+            "agent_id": f"agent-{i:02d}",
+            "name": f"Agent {i}",
+            "created_at": None if i < 3 else f"2024-01-{i // 2 + 1:02d}T00:00:00",
+            "TWITTER_API_KEY": "secret",
+        }}
+        for i in range(12)
+    ])
+    return agents
+
+
+def paginate(agents, limit, **filters):
+    pages, after = [], None
+    while True:
+        page = agents.list_public(limit=limit, after=after, **filters)
+        if not page:
+            return pages
+        pages.append([agent["agent_id"] for agent in page])
+        after = (page[-1].get("created_at"), page[-1]["agent_id"])
+
+
+def test_list_public_keyset_pagination(mongo_client):
+    agents = make_agents(mongo_client)
+    ascending = [agent_id for page in paginate(agents, 5) for agent_id in page]
+    # Agents sans created_at d'abord, puis par (created_at, agent_id), sans trou ni doublon
+    assert ascending == [f"agent-{i:02d}" for i in range(12)]
+
+    descending = [agent_id for page in paginate(agents, 4, descending=True) for agent_id in page]
+    assert descending == list(reversed(ascending))
+
+
+def test_list_public_projects_public_fields(mongo_client):
+    agents = make_agents(mongo_client)
+    page = agents.list_public(limit=1)
+    assert "TWITTER_API_KEY" not in page[0]
+    assert page[0]["name"] == "Agent 0"
+
+
+def test_list_public_date_filter(mongo_client):
+    agents = make_agents(mongo_client)
+    page = agents.list_public(limit=100, created_after="2024-01-03", created_before="2024-01-05")
+    assert [agent["agent_id"] for agent in page] == ["agent-04", "agent-05", "agent-06", "agent-07"]
+
+
+def test_upsert_replies_is_idempotent(mongo_client):
+    data = DataDatabase()
+    record = {"id": "rec_1", "fields": {"agent_id": "a", "mentioned_conversation_tweet_id": "42"}}
+    assert data.upsert_replies([record]) == 1
+    assert data.upsert_replies([dict(record, id="rec_2")]) == 0
+    assert data.collection.count_documents({}) == 1
+    assert data.find_responded_conversation_ids("a", ["42", "43"]) == {"42"}
+
+
+def test_reply_claim_survives_a_crash_before_flush(mongo_client):
+    data = DataDatabase()
+    assert data.claim_reply("a", "42")
+    # Crash avant l'écriture différée : la passe suivante voit la conversation comme traitée
+    assert data.find_responded_conversation_ids("a", ["42"]) == {"42"}
+    assert not DataDatabase().claim_reply("a", "42")
+    # L'écriture différée complète le marqueur
+    record = {"id": "rec_1", "fields": {"agent_id": "a", "mentioned_conversation_tweet_id": "42",
+                                        "tweet_response_id": "r1", "status": "posted"}}
+    assert data.upsert_replies([record]) == 1
+    assert data.upsert_replies([record]) == 0
+    assert data.collection.find_one({"_id": "a:42"})["fields"]["tweet_response_id"] == "r1"
+    data.release_reply("a", "42")  # sans effet sur une réponse publiée
+    assert data.collection.count_documents({}) == 1
+
+
+def test_released_claim_can_be_retried(mongo_client):
+    data = DataDatabase()
+    assert data.claim_reply("a", "42")
+    data.release_reply("a", "42")
+    assert data.find_responded_conversation_ids("a", ["42"]) == set()
+    assert data.claim_reply("a", "42")
+
+
+def test_mention_cursor_state(mongo_client):
+    data = DataDatabase()
+    assert data.get_mention_state("a") == {"newest_id": None, "until_id": None, "pending_newest_id": None}
+    data.set_mention_cursors({"a": {"newest_id": 100, "until_id": 200, "pending_newest_id": 300}})
+    assert data.get_mention_state("a") == {"newest_id": 100, "until_id": 200, "pending_newest_id": 300}
+    # newest_id ne recule jamais
+    data.set_mention_cursors({"a": {"newest_id": 50, "until_id": None, "pending_newest_id": None}})
+    assert data.get_mention_state("a") == {"newest_id": 100, "until_id": None, "pending_newest_id": None}
+
+
+def test_onboarding_job_progress(mongo_client):
+    jobs = OnboardingJobsDatabase()
+    jobs.ensure_indexes()
+    jobs.create("onboarding_1", 2, ttl_seconds=60)
+    jobs.set_result("onboarding_1", 1, {"status": "failed", "error": "Invalid credentials."})
+    jobs.set_result("onboarding_1", 0, {"status": "created", "agent_id": "a"})
+    jobs.finish("onboarding_1")
+    # Relu depuis une autre instance (autre processus de l'API)
+    job = OnboardingJobsDatabase().get("onboarding_1")
+    assert job["job_id"] == "onboarding_1" and job["status"] == "done"
+    assert (job["created"], job["failed"]) == (1, 1)
+    assert job["results"] == [
+        {"status": "created", "agent_id": "a"},
+        {"status": "failed", "error": "Invalid credentials."},
+    ]
+    assert "expires_at" not in job
+    assert jobs.get("missing") is None
+
+
+def test_job_of_a_dead_worker_is_never_rerun(mongo_client):
+    jobs = TweetJobsDatabase()
+    job_id = jobs.enqueue("a", "prompt", max_attempts=3)
+    assert jobs.claim_next("worker-1", lease_seconds=-1)["_id"] == job_id
+    # Bail expiré : le crew a pu publier, le job n'est pas repris malgré les tentatives restantes
+    assert jobs.claim_next("worker-2", lease_seconds=60) is None
+    job = jobs.collection.find_one({"_id": job_id})
+    assert job["status"] == "failed" and job["attempts"] == 1
@@ -0,0 +1,81 @@
+# tests/test_polling.py
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from polling import AdaptivePollingPolicy, advance_mention_cursor, fetch_mention_pages, next_slot_time
+
+
+def test_catch_up_never_skips_unread_mentions():
+    state = {"newest_id": 100}
+    # Pages restantes : la fenêtre suivante se termine sous la plus ancienne mention lue
+    state = advance_mention_cursor(state, [300, 250, 200], complete=False)
+    assert state == {"newest_id": 100, "until_id": 200, "pending_newest_id": 300}
+    state = advance_mention_cursor(state, [190, 150], complete=False)
+    assert state == {"newest_id": 100, "until_id": 150, "pending_newest_id": 300}
+    # Fenêtre vidée : le curseur saute à la plus récente mention vue
+    state = advance_mention_cursor(state, [120, 110], complete=True)
+    assert state == {"newest_id": 300, "until_id": None, "pending_newest_id": None}
+
+
+def test_failed_lookups_stay_in_next_window():
+    state = advance_mention_cursor({"newest_id": 100}, [300, 250, 200], complete=True, failed_ids=[250])
+    assert state == {"newest_id": 249, "until_id": 251, "pending_newest_id": 300}
+    state = advance_mention_cursor(state, [250], complete=True)
+    assert state == {"newest_id": 300, "until_id": None, "pending_newest_id": None}
+
+
+def test_empty_catch_up_window_completes():
+    state = {"newest_id": 100, "until_id": 201, "pending_newest_id": 300}
+    assert advance_mention_cursor(state, [], complete=True) == {
+        "newest_id": 300, "until_id": None, "pending_newest_id": None,
+    }
+
+
+def fake_mentions_api(total, page_size=100):
+    """
+    get_users_mentions simulé : `total` mentions (ids décroissants) servies par pages pleines.
+    """
+    ids = list(range(10_000 + total, 10_000, -1))
+    calls = []
+
+    async def get_users_mentions(**params):
+        calls.append(params)
+        start = int(params.get("pagination_token") or 0)
+        page = ids[start:start + page_size]
+        meta = {"next_token": str(start + page_size)} if start + page_size < len(ids) else {}
+        return SimpleNamespace(data=[SimpleNamespace(id=i) for i in page], meta=meta)
+
+    return get_users_mentions, calls
+
+
+def test_fetch_follows_full_pages_until_caught_up():
+    fetch, calls = fake_mentions_api(350)
+    pages = []
+    mentions, complete = asyncio.run(fetch_mention_pages(fetch, {"max_results": 100}, 10, on_page=pages.append))
+    assert complete and len(mentions) == 350 and len(pages) == len(calls) == 4
+    assert [call.get("pagination_token") for call in calls] == [None, "100", "200", "300"]
+
+
+def test_fetch_stops_at_max_pages_and_resumes_below_oldest():
+    fetch, _ = fake_mentions_api(1000)
+    mentions, complete = asyncio.run(fetch_mention_pages(fetch, {"max_results": 100}, 3))
+    assert not complete and len(mentions) == 300
+    state = advance_mention_cursor({"newest_id": 10_000}, [m.id for m in mentions], complete)
+    assert state["until_id"] == min(m.id for m in mentions)
+
+
+def test_next_slot_time_is_stable_per_agent():
+    now = datetime(2024, 1, 1, 12, 0, 7, tzinfo=timezone.utc)
+    slot = next_slot_time("agent-a", 15, now)
+    assert now <= slot < now.replace(minute=15, second=8)
+    assert next_slot_time("agent-a", 15, slot) == slot
+
+
+def test_adaptive_policy_bounds_and_forget():
+    policy = AdaptivePollingPolicy(base_minutes=15, min_minutes=5, max_minutes=60, target_mentions_per_poll=10)
+    assert policy.record("quiet", 0, 15) == 60
+    assert policy.record("busy", 600, 15) == 5
+    policy.forget("busy")
+    assert "busy" not in policy._rates
@@ -0,0 +1,133 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import threading
+import time
+
+from rate_limiter import PRIORITY_DAILY_TWEET, PRIORITY_READ, PRIORITY_REPLY, RateLimiter
+
+
+def exhaust(limiter, endpoint, credential_key, reset_in):
+    limiter.update_from_headers(endpoint, credential_key, {
+        "x-rate-limit-limit": "10",
+        "x-rate-limit-remaining": "0",
+        "x-rate-limit-reset": str(time.time() + reset_in),
+    })
+
+
+def test_budget_follows_headers():
+    limiter = RateLimiter()
+    limiter.update_from_headers("get_tweets", "cred", {
+        "x-rate-limit-limit": "900",
+        "x-rate-limit-remaining": "2",
+        "x-rate-limit-reset": str(time.time() + 60),
+    })
+
+    async def scenario():
+        await limiter.acquire("get_tweets", "cred")
+        await limiter.acquire("get_tweets", "cred")
+
+    asyncio.run(scenario())
+    budget = limiter.snapshot()["cred"]["get_tweets"]
+    assert budget["limit"] == 900 and budget["in_flight"] == 2
+    # Plus de requête disponible tant que les deux appels sont en vol
+    assert limiter._try_acquire("get_tweets", "cred", PRIORITY_READ) is not None
+    limiter.release("get_tweets", "cred")
+    limiter.release("get_tweets", "cred")
+    assert limiter.snapshot()["cred"]["get_tweets"]["in_flight"] == 0
+
+
+def test_exhausted_budget_waits_for_the_next_window():
+    limiter = RateLimiter(poll_interval=0.01)
+    exhaust(limiter, "get_users_mentions", "cred", 0.2)
+    started = time.monotonic()
+    asyncio.run(limiter.acquire("get_users_mentions", "cred"))
+    assert time.monotonic() - started >= 0.15
+    assert limiter.snapshot()["cred"]["get_users_mentions"]["throttled_total"] == 1
+
+
+def test_budgets_are_per_endpoint_and_credential():
+    limiter = RateLimiter()
+    limiter.mark_exhausted("create_tweet", "cred", time.time() + 60)
+    assert limiter._try_acquire("create_tweet", "cred", PRIORITY_REPLY) is not None
+    assert limiter._try_acquire("create_tweet", "other", PRIORITY_REPLY) is None
+    assert limiter._try_acquire("get_tweets", "cred", PRIORITY_READ) is None
+
+
+def test_waiting_reply_holds_back_reads_of_the_same_account():
+    limiter = RateLimiter(poll_interval=0.01)
+    exhaust(limiter, "create_tweet", "cred", 0.2)
+    order = []
+
+    async def call(endpoint, credential_key, priority, delay=0.0):
+        await asyncio.sleep(delay)
+        await limiter.acquire(endpoint, credential_key, priority)
+        order.append((endpoint, credential_key))
+
+    async def scenario():
+        await asyncio.gather(
+            call("create_tweet", "cred", PRIORITY_REPLY),
+            call("get_users_mentions", "cred", PRIORITY_READ, 0.02),
+            call("get_users_mentions", "other", PRIORITY_READ, 0.02),
+        )
+
+    asyncio.run(scenario())
+    assert order == [
+        ("get_users_mentions", "other"),
+        ("create_tweet", "cred"),
+        ("get_users_mentions", "cred"),
+    ]
+
+
+def test_replies_go_before_daily_tweets():
+    limiter = RateLimiter(poll_interval=0.01)
+    exhaust(limiter, "create_tweet", "cred", 0.2)
+    limiter.update_from_headers("create_tweet", "cred", {
+        "x-rate-limit-remaining": "0", "x-rate-limit-reset": str(time.time() + 0.2),
+    })
+    order = []
+
+    async def call(priority, label, delay=0.0):
+        await asyncio.sleep(delay)
+        await limiter.acquire("create_tweet", "cred", priority)
+        order.append(label)
+        limiter.release("create_tweet", "cred")
+
+    async def scenario():
+        await asyncio.gather(
+            call(PRIORITY_DAILY_TWEET, "daily"),
+            call(PRIORITY_REPLY, "reply", 0.05),
+        )
+
+    asyncio.run(scenario())
+    assert order == ["reply", "daily"]
+
+
+def test_concurrent_first_use_keeps_one_budget():
+    limiter = RateLimiter()
+    start = threading.Barrier(16)
+
+    def hammer():
+        start.wait()
+        for _ in range(200):
+            limiter.acquire_blocking("create_tweet", "new-cred", PRIORITY_REPLY)
+            limiter.release("create_tweet", "new-cred")
+
+    threads = [threading.Thread(target=hammer) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(limiter._budgets) == 1
+    assert limiter.snapshot()["new-cred"]["create_tweet"]["in_flight"] == 0
+
+
+def test_idle_budgets_are_pruned():
+    limiter = RateLimiter(prune_interval=0)
+    asyncio.run(limiter.acquire("get_me", "failed-onboarding"))
+    limiter.release("get_me", "failed-onboarding")
+    exhaust(limiter, "create_tweet", "busy", reset_in=60)
+    asyncio.run(limiter.acquire("get_tweets", "in-flight"))
+    # La création d'un nouveau budget déclenche le nettoyage
+    asyncio.run(limiter.acquire("get_me", "other"))
+    assert set(limiter.snapshot()) == {"busy", "in-flight", "other"}
@@ -0,0 +1,75 @@
+# tests/test_reply_cache.py
+
+import time
+
+from reply_cache import ReplyCache, normalize_text, persona_key, simhash
+
+
+def test_normalization_ignores_links_mentions_and_punctuation():
+    assert normalize_text("@Bob What do you THINK?! https://t.co/x") == "what do you think"
+
+
+def test_exact_hit_and_persona_isolation():
+    cache = ReplyCache(maxsize=10, ttl=60)
+    cache.set("persona-a", "What do you think about the market today?", "Bullish.")
+    assert cache.get("persona-a", "@someone what do you think about the market today") == "Bullish."
+    assert cache.get("persona-b", "What do you think about the market today?") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_agents_do_not_share_entries():
+    cache = ReplyCache(maxsize=10, ttl=60)
+    agent_a, agent_b = persona_key("system prompt", "agent-a"), persona_key("system prompt", "agent-b")
+    assert agent_a != agent_b
+    cache.set(agent_a, "Is this the top? #markets", "Nobody rings a bell at the top.", agent_id="agent-a")
+    assert cache.get(agent_a, "Is this the top? #markets") == "Nobody rings a bell at the top."
+    assert cache.get(agent_b, "Is this the top? #markets") is None
+
+
+def test_near_duplicate_hit():
+    cache = ReplyCache(maxsize=10, ttl=60, max_distance=3, near_duplicates=True)
+    text = ("What do you think about the market today? Stocks are moving fast "
+            "and everyone is watching closely this week #markets #1")
+    near = text.replace("#1", "#4")
+    assert bin(simhash(normalize_text(text)) ^ simhash(normalize_text(near))).count("1") <= 3
+    cache.set("persona", text, "Bullish.")
+    assert cache.get("persona", near) == "Bullish."
+    assert cache.stats()["near_hits"] == 1
+    assert cache.get("persona", "Completely unrelated question about football tonight") is None
+
+
+def test_near_duplicates_disabled():
+    cache = ReplyCache(maxsize=10, ttl=60, near_duplicates=False)
+    text = "What do you think about the market today? Stocks are moving fast and everyone is watching #1"
+    cache.set("persona", text, "Bullish.")
+    assert cache.get("persona", text.replace("#1", "#2")) is None
+
+
+def test_ttl_and_agent_ttl():
+    cache = ReplyCache(maxsize=10, ttl=60)
+    cache.set_agent_ttl("short", 0.05)
+    cache.set("persona", "first question", "one", agent_id="short")
+    cache.set("persona", "second question", "two", agent_id="other")
+    time.sleep(0.1)
+    assert cache.get("persona", "first question") is None
+    assert cache.get("persona", "second question") == "two"
+
+
+def test_agent_ttls_from_environment(monkeypatch):
+    monkeypatch.setenv("REPLY_CACHE_AGENT_TTLS", "short=0.05, long=7200")
+    cache = ReplyCache(maxsize=10, ttl=60)
+    assert cache.agent_ttls == {"short": 0.05, "long": 7200.0}
+    cache.set("persona", "first question", "one", agent_id="short")
+    time.sleep(0.1)
+    assert cache.get("persona", "first question") is None
+
+
+def test_lru_bound():
+    cache = ReplyCache(maxsize=2, ttl=60, near_duplicates=False)
+    cache.set("persona", "question one", "1")
+    cache.set("persona", "question two", "2")
+    cache.get("persona", "question one")
+    cache.set("persona", "question three", "3")
+    assert cache.get("persona", "question two") is None
+    assert cache.get("persona", "question one") == "1"
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,75 @@
+# tests/test_reply_writer.py
+
+import asyncio
+
+from db import DataDatabase
+from reply_writer import ReplyRecordWriter
+
+
+def reply(agent_id, conversation_id, response_id):
+    return {
+        "agent_id": agent_id,
+        "mentioned_conversation_tweet_id": conversation_id,
+        "tweet_response_id": response_id,
+    }
+
+
+class FlakyDatabase:
+    """
+    DataDatabase dont les n premiers upsert_replies échouent.
+    """
+    def __init__(self, db, failures):
+        self._db = db
+        self.failures = failures
+
+    def upsert_replies(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("primary stepped down")
+        return self._db.upsert_replies(records)
+
+    def set_mention_cursors(self, states):
+        return self._db.set_mention_cursors(states)
+
+
+def test_flush_writes_each_reply_once(mongo_client):
+    data = DataDatabase()
+    writer = ReplyRecordWriter(db=data, batch_size=100)
+
+    async def scenario():
+        await writer.add(reply("a", "1", "r1"))
+        await writer.add(reply("a", "1", "r1-bis"))  # même conversation : le premier enregistrement gagne
+        await writer.add(reply("a", "2", "r2"))
+        assert writer.pending_conversation_ids("a") == {"1", "2"}
+        writer.set_cursor("a", {"newest_id": 10, "until_id": None, "pending_newest_id": None})
+        await writer.flush()
+        await writer.flush()  # rien à rejouer
+        await writer.add(reply("a", "1", "r1-ter"))
+        await writer.flush()
+
+    asyncio.run(scenario())
+    assert data.collection.count_documents({}) == 2
+    assert data.collection.find_one({"_id": "a:1"})["fields"]["tweet_response_id"] == "r1"
+    assert writer.pending_conversation_ids("a") == set()
+    assert data.get_mention_state("a")["newest_id"] == 10
+    assert writer.stats()["written"] == 2
+
+
+def test_failed_flush_is_replayed(mongo_client):
+    data = DataDatabase()
+    writer = ReplyRecordWriter(db=FlakyDatabase(data, failures=1), batch_size=100)
+
+    async def scenario():
+        await writer.add(reply("a", "1", "r1"))
+        writer.set_cursor("a", {"newest_id": 10, "until_id": None, "pending_newest_id": None})
+        await writer.flush()
+        # Échec : la réponse reste visible pour la détection des doublons, le curseur n'avance pas
+        assert writer.pending_conversation_ids("a") == {"1"}
+        assert data.get_mention_state("a")["newest_id"] is None
+        await writer.flush()
+
+    asyncio.run(scenario())
+    assert writer.stats()["errors"] == 1
+    assert data.collection.count_documents({}) == 1
+    assert data.get_mention_state("a")["newest_id"] == 10
+    assert writer.pending_conversation_ids("a") == set()
@@ -0,0 +1,36 @@
+# tests/test_tweet_drafts.py
+
+import asyncio
+from types import SimpleNamespace
+
+from aio import AsyncProxy
+from db import AgentsDatabase, TweetDraftsDatabase
+from llm_gateway import FakeChatModel
+from tweet_drafts import DRAFTS_MIN_QUEUE, DraftGenerator, refill_drafts
+
+
+def test_refill_with_single_arg_daily_jobs(mongo_client):
+    agents = AgentsDatabase()
+    agents.collection.insert_many([
+        {"id": "rec_a", "fields": {"agent_id": "a", "personality_prompt": "A crypto skeptic"}},
+        {"id": "rec_b", "fields": {"agent_id": "b", "personality_prompt": "A gardening fan"}},
+        {"id": "rec_c", "fields": {"agent_id": "c", "personality_prompt": ""}},
+    ])
+    drafts = TweetDraftsDatabase()
+    drafts.push_drafts("b", ["queued one #a #b", "queued two #a #b"] * DRAFTS_MIN_QUEUE)
+    # Les jobs quotidiens ne portent que l'agent_id (le prompt est relu dans agentx)
+    jobs = [
+        SimpleNamespace(id="daily_tweet_job_a", args=("a",)),
+        SimpleNamespace(id="daily_tweet_job_b", args=("b",)),
+        SimpleNamespace(id="daily_tweet_job_c", args=("c",)),
+        SimpleNamespace(id="mentions_agent_id:a", args=("a",)),
+    ]
+    generator = DraftGenerator(llm=FakeChatModel(latency_ms=0))
+
+    generated = asyncio.run(refill_drafts(jobs, AsyncProxy(agents), AsyncProxy(drafts), generator))
+
+    counts = drafts.queued_counts(["a", "b", "c"])
+    assert generated == counts["a"] > 0
+    assert counts["b"] == 2 * DRAFTS_MIN_QUEUE
+    assert counts.get("c", 0) == 0
+    assert drafts.pop_draft("a")["text"].endswith("#AI #Tech")
@@ -1,67 +1,42 @@
 # tools/post_tools.py
 
-import tweepy
 import re
-from crewai.tools import tool
-from db import AgentsDatabase  # Importation de la classe configurée pour MongoDB
+from credentials_store import CREDENTIALS_STORE  # Credentials + client Tweepy en cache (index fields.agent_id)
+from rate_limiter import PRIORITY_DAILY_TWEET
+from twitter_client import call_with_rate_limit
 
-def make_post_tweet_tool(agent_id: str):
-    """
-    Fabrique et retourne une fonction 'post_tweet' décorée par @tool,
-    qui s'appuie sur le client Tweepy configuré pour l'agent_id spécifié.
-    """
-    db = AgentsDatabase()  # Utilisation de MongoDB (pas de fichier local)
-    record = None
-    for rec in db.get_all():
-        fields = rec.get("fields", {})
-        if fields.get("agent_id") == agent_id:
-            record = fields
-            break
-
-    if not record:
-        raise ValueError(f"Erreur: Aucun agent trouvé pour agent_id={agent_id}")
-
-    bearer_token = record.get("TWITTER_BEARER_TOKEN")
-    api_key = record.get("TWITTER_API_KEY")
-    api_secret_key = record.get("TWITTER_API_SECRET_KEY")
-    access_token = record.get("TWITTER_ACCESS_TOKEN")
-    access_token_secret = record.get("TWITTER_ACCESS_TOKEN_SECRET")
-
-    if not all([bearer_token, api_key, api_secret_key, access_token, access_token_secret]):
-        raise ValueError(f"Erreur: Certains credentials Twitter manquants pour l'agent_id={agent_id}")
-
-    try:
-        client = tweepy.Client(
-            bearer_token=bearer_token,
-            consumer_key=api_key,
-            consumer_secret=api_secret_key,
-            access_token=access_token,
-            access_token_secret=access_token_secret,
-        )
-    except Exception as e:
-        raise ValueError(f"Impossible de configurer Tweepy pour l'agent {agent_id}. Erreur: {str(e)}")
+TWEET_MAX_LENGTH = 280
+TWEET_HASHTAGS = 2
+HASHTAG_PATTERN = re.compile(r'#\w+')
 
-    @tool("Post Tweet")
-    def post_tweet(tweet_text: str) -> str:
-        """
-        Publie un tweet sur Twitter via le client Tweepy configuré.
-        
-        Paramètre:
-            tweet_text (str): Le texte du tweet à publier
-        
-        Retour:
-            str: Résultat ou message d'erreur.
-        """
-        if not tweet_text:
-            return "Erreur: aucun texte de tweet fourni."
+def clean_tweet_text(tweet_text: str) -> str:
+    # Suppression des séquences Unicode (par exemple, \ud83d\udcc8) pour nettoyer le texte
+    return re.sub(r'\\u[a-fA-F0-9]{4}', '', tweet_text)
 
-        # Suppression des séquences Unicode (par exemple, \ud83d\udcc8) pour nettoyer le texte
-        tweet_text_clean = re.sub(r'\\u[a-fA-F0-9]{4}', '', tweet_text)
-
-        try:
-            response = client.create_tweet(text=tweet_text_clean)
-            return f"Tweet publié avec succès: {tweet_text_clean}"
-        except Exception as e:
-            return f"Échec de la publication. Erreur: {str(e)}"
-
-    return post_tweet
+def validate_tweet_text(tweet_text: str) -> str:
+    """
+    Nettoie et valide un tweet généré : texte non vide, 280 caractères max,
+    exactement 2 hashtags. Retourne le texte nettoyé, lève ValueError sinon.
+    """
+    text = clean_tweet_text(tweet_text or "").strip()
+    # Les LLM entourent souvent le tweet de guillemets
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ('"', "'"):
+        text = text[1:-1].strip()
+    if not text:
+        raise ValueError("Tweet vide.")
+    if len(text) > TWEET_MAX_LENGTH:
+        raise ValueError(f"Tweet trop long ({len(text)} > {TWEET_MAX_LENGTH} caractères).")
+    hashtags = HASHTAG_PATTERN.findall(text)
+    if len(hashtags) != TWEET_HASHTAGS:
+        raise ValueError(f"Le tweet doit contenir exactement {TWEET_HASHTAGS} hashtags ({len(hashtags)} trouvé(s)).")
+    return text
+
+def publish_tweet(agent_id: str, tweet_text: str):
+    """
+    Valide puis publie directement un texte pour l'agent (client Tweepy en cache,
+    budget partagé, après les réponses aux mentions). Lève une exception en cas de
+    texte invalide ou d'échec.
+    """
+    text = validate_tweet_text(tweet_text)
+    client = CREDENTIALS_STORE.get_client(agent_id)
+    return call_with_rate_limit(client, "create_tweet", text=text, priority=PRIORITY_DAILY_TWEET)
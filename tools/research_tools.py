@@ -0,0 +1,66 @@
+# tools/research_tools.py
+
+import os
+import re
+import json
+import hashlib
+import logging
+
+from crewai_tools import SerperDevTool, WebsiteSearchTool
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Cache partagé par tous les agents du processus : des personnalités aux thèmes
+# proches (crypto, IA, sport...) réutilisent les mêmes recherches dans la fenêtre TTL.
+RESEARCH_CACHE = TTLCache(
+    maxsize=int(os.getenv("RESEARCH_CACHE_SIZE", "2000")),
+    ttl=float(os.getenv("RESEARCH_CACHE_TTL", "3600")),
+)
+
+
+def normalize_query(value):
+    """
+    Normalise une valeur de requête : casse, espaces et ponctuation de bord.
+    """
+    if not isinstance(value, str):
+        return value
+    value = re.sub(r"\s+", " ", value.strip().lower())
+    return value.strip(" .,;:!?\"'")
+
+
+def research_cache_key(tool_name: str, kwargs: dict) -> str:
+    """
+    Clé adressée par contenu : hash de l'outil et des arguments normalisés.
+    """
+    payload = json.dumps(
+        {"tool": tool_name, "args": {k: normalize_query(v) for k, v in sorted(kwargs.items())}},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """
+    SerperDevTool avec cache des résultats (requête normalisée, TTL, LRU).
+    """
+    def _run(self, **kwargs):
+        key = research_cache_key("serper", kwargs)
+        return RESEARCH_CACHE.get_or_set(key, lambda: super(CachedSerperDevTool, self)._run(**kwargs))
+
+
+class CachedWebsiteSearchTool(WebsiteSearchTool):
+    """
+    WebsiteSearchTool avec cache des résultats (requête + site normalisés, TTL, LRU).
+    """
+    def _run(self, *args, **kwargs):
+        if args:
+            kwargs = {**dict(zip(("search_query", "website"), args)), **kwargs}
+        key = research_cache_key("website_search", kwargs)
+        return RESEARCH_CACHE.get_or_set(key, lambda: super(CachedWebsiteSearchTool, self)._run(**kwargs))
+
+
+def research_cache_stats() -> dict:
+    return RESEARCH_CACHE.stats()
@@ -0,0 +1,130 @@
+# tweet_drafts.py
+
+import os
+import re
+import logging
+from textwrap import dedent
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+
+from chat_openai_manager import ChatOpenAIManager
+from tools.post_tools import validate_tweet_text
+
+logger = logging.getLogger(__name__)
+
+DRAFTS_PER_AGENT = int(os.getenv("DRAFTS_PER_AGENT", "7"))
+DRAFTS_BATCH_AGENTS = int(os.getenv("DRAFTS_BATCH_AGENTS", "20"))
+DRAFTS_MIN_QUEUE = int(os.getenv("DRAFTS_MIN_QUEUE", "2"))
+
+
+class AgentDrafts(BaseModel):
+    agent_id: str = Field(..., description="Identifiant de l'agent, recopié tel quel")
+    tweets: List[str] = Field(..., description="Tweets distincts pour cet agent")
+
+
+class DraftBatch(BaseModel):
+    drafts: List[AgentDrafts]
+
+    @classmethod
+    def fake_response(cls, prompt: str) -> "DraftBatch":
+        """
+        Réponse du backend LLM "fake" : brouillons valides pour chaque agent_id du prompt.
+        """
+        match = re.search(r"Write (\d+) tweets", prompt)
+        per_agent = int(match.group(1)) if match else DRAFTS_PER_AGENT
+        return cls(drafts=[
+            AgentDrafts(agent_id=agent_id, tweets=[
+                f"Draft {i + 1}: history will be the judge of that. #AI #Tech" for i in range(per_agent)
+            ])
+            for agent_id in re.findall(r"agent_id: (\S+)", prompt)
+        ])
+
+
+DRAFTS_SYSTEM_PROMPT = dedent("""\
+    You write tweets for several independent Twitter personalities at once.
+    For EACH personality listed by the user, write the requested number of distinct tweets that:
+    - Reflect and stay consistent with that personality (tone, style, perspective).
+    - Are under 280 characters in total.
+    - Include exactly 2 relevant hashtags (not more, not less).
+    - Remain human-like (engaging, relatable, free of spelling/grammar errors).
+    - Avoid repetition between tweets and overly formal language.
+    Copy each agent_id exactly as given.
+""")
+
+
+class DraftGenerator:
+    """
+    Génère en un seul appel LLM (sortie structurée) les brouillons de plusieurs agents.
+    """
+    def __init__(self, llm=None):
+        self.llm = llm or ChatOpenAIManager().create_llm()
+        self.structured_llm = self.llm.with_structured_output(DraftBatch)
+
+    @staticmethod
+    def build_messages(agents: List[Dict], per_agent: int) -> List:
+        personas = "\n".join(
+            f'- agent_id: {agent["agent_id"]}\n  personality: "{agent["personality_prompt"]}"'
+            for agent in agents
+        )
+        return [
+            ("system", DRAFTS_SYSTEM_PROMPT),
+            ("human", f"Write {per_agent} tweets for each of these personalities:\n{personas}"),
+        ]
+
+    async def generate(self, agents: List[Dict], per_agent: int = DRAFTS_PER_AGENT) -> Dict[str, List[str]]:
+        """
+        Retourne {agent_id: [tweets]} ; les textes invalides (longueur, hashtags) sont écartés.
+        """
+        if not agents:
+            return {}
+        batch = await self.structured_llm.ainvoke(self.build_messages(agents, per_agent))
+        expected = {agent["agent_id"] for agent in agents}
+        result: Dict[str, List[str]] = {}
+        for item in batch.drafts:
+            if item.agent_id not in expected:
+                logger.warning("Brouillons ignorés pour un agent_id inattendu: %s", item.agent_id)
+                continue
+            texts = []
+            for text in item.tweets:
+                try:
+                    texts.append(validate_tweet_text(text))
+                except ValueError as e:
+                    logger.debug("Brouillon écarté pour %s: %s", item.agent_id, e)
+            result.setdefault(item.agent_id, []).extend(texts)
+        return result
+
+
+def chunked(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def refill_drafts(jobs, agents_db, drafts_db, generator: DraftGenerator) -> int:
+    """
+    Complète les files de brouillons des agents dont le tweet quotidien est planifié
+    (jobs "daily_tweet_job_*", args = [agent_id]) et dont la file est sous DRAFTS_MIN_QUEUE.
+    agents_db / drafts_db sont les proxys async d'AgentsDatabase / TweetDraftsDatabase.
+    Retourne le nombre de brouillons ajoutés.
+    """
+    agent_ids = [job.args[0] for job in jobs if job.id.startswith("daily_tweet_job_")]
+    if not agent_ids:
+        return 0
+    counts = await drafts_db.queued_counts(agent_ids)
+    low = [agent_id for agent_id in agent_ids if counts.get(agent_id, 0) < DRAFTS_MIN_QUEUE]
+    if not low:
+        return 0
+    prompts = await agents_db.find_personality_prompts(low)
+    due = [{"agent_id": agent_id, "personality_prompt": prompts[agent_id]} for agent_id in low if agent_id in prompts]
+
+    generated = 0
+    batches = chunked(due, DRAFTS_BATCH_AGENTS)
+    for batch in batches:
+        try:
+            drafts = await generator.generate(batch)
+        except Exception as e:
+            logger.error("Génération groupée de brouillons impossible (%s agent(s)): %s", len(batch), e)
+            continue
+        for agent_id, texts in drafts.items():
+            generated += await drafts_db.push_drafts(agent_id, texts)
+    logger.info("Brouillons: %s généré(s) pour %s agent(s) en %s appel(s) LLM.", generated, len(due), len(batches))
+    return generated
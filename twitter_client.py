@@ -0,0 +1,120 @@
+# twitter_client.py
+
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import tweepy
+
+from aio import run_io
+from metrics import twitter_span
+from rate_limiter import RATE_LIMITER, PRIORITY_READ, PRIORITY_REPLY, credential_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Endpoints prioritaires (réponses aux mentions) ; tout le reste est une lecture de fond.
+# Les tweets quotidiens passent priority=PRIORITY_DAILY_TWEET à call_with_rate_limit.
+ENDPOINT_PRIORITIES: Dict[str, int] = {
+    "create_tweet": PRIORITY_REPLY,
+}
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Endpoint en cours d'appel dans le thread courant (lu par le hook de réponse requests)
+_current = threading.local()
+
+
+def instrument_client(client: tweepy.Client) -> str:
+    """
+    Branche le hook de lecture des en-têtes x-rate-limit-* sur la session HTTP
+    du client et retourne l'empreinte de ses credentials. Idempotent.
+    """
+    credential_key = getattr(client, "_rate_limit_key", None)
+    if credential_key is not None:
+        return credential_key
+
+    credential_key = credential_fingerprint(
+        client.bearer_token, client.consumer_key, client.access_token
+    )
+
+    def on_response(response, *args, **kwargs):
+        endpoint = getattr(_current, "endpoint", None)
+        if endpoint:
+            RATE_LIMITER.update_from_headers(endpoint, credential_key, response.headers)
+
+    client.session.hooks["response"].append(on_response)
+    client._rate_limit_key = credential_key
+    return credential_key
+
+
+def _reset_at(error: tweepy.TooManyRequests):
+    try:
+        return float(error.response.headers.get("x-rate-limit-reset"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def call_with_rate_limit(client: tweepy.Client, endpoint: str, *args, priority: Optional[int] = None, **kwargs) -> Any:
+    """
+    Appel synchrone soumis au budget partagé (utilisé depuis un thread, ex. outil CrewAI).
+    priority remplace la priorité par défaut de l'endpoint (ex. tweet quotidien).
+    """
+    credential_key = instrument_client(client)
+    if priority is None:
+        priority = ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_READ)
+    with twitter_span(endpoint):
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            RATE_LIMITER.acquire_blocking(endpoint, credential_key, priority)
+            try:
+                return _invoke(client, endpoint, args, kwargs)
+            except tweepy.TooManyRequests as e:
+                RATE_LIMITER.mark_exhausted(endpoint, credential_key, _reset_at(e))
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                logger.warning("429 sur %s (%s), nouvelle tentative après la fenêtre.", endpoint, credential_key)
+            finally:
+                RATE_LIMITER.release(endpoint, credential_key)
+
+
+def _invoke(client: tweepy.Client, endpoint: str, args, kwargs) -> Any:
+    _current.endpoint = endpoint
+    try:
+        return getattr(client, endpoint)(*args, **kwargs)
+    finally:
+        _current.endpoint = None
+
+
+class AsyncTwitterClient:
+    """
+    Façade asynchrone d'un tweepy.Client : chaque appel attend son tour dans le
+    RateLimiter global (par endpoint et credentials), s'exécute dans l'exécuteur I/O,
+    et un 429 est remis en file jusqu'à la fenêtre suivante au lieu d'être perdu.
+    """
+    def __init__(self, client: tweepy.Client):
+        self.sync = client
+        self.credential_key = instrument_client(client)
+
+    def __getattr__(self, endpoint: str):
+        method = getattr(self.sync, endpoint)
+        if not callable(method):
+            return method
+        priority = ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_READ)
+
+        async def call(*args, **kwargs):
+            with twitter_span(endpoint):
+                for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                    await RATE_LIMITER.acquire(endpoint, self.credential_key, priority)
+                    try:
+                        return await run_io(_invoke, self.sync, endpoint, args, kwargs)
+                    except tweepy.TooManyRequests as e:
+                        RATE_LIMITER.mark_exhausted(endpoint, self.credential_key, _reset_at(e))
+                        if attempt == MAX_RATE_LIMIT_RETRIES:
+                            raise
+                        logger.warning(
+                            "429 sur %s (%s), mise en attente jusqu'à %s.",
+                            endpoint, self.credential_key, time.strftime('%H:%M:%S', time.localtime(_reset_at(e) or time.time())),
+                        )
+                    finally:
+                        RATE_LIMITER.release(endpoint, self.credential_key)
+
+        return call
@@ -0,0 +1,203 @@
+# worker.py
+"""
+Worker des tweets quotidiens : consomme la file auto.tweet_jobs et exécute les crews
+CrewAI dans un pool de processus, indépendamment de l'API.
+
+    DAILY_TWEET_EXECUTION=worker uvicorn main:app ...   # l'API ne fait qu'enfiler
+    python -m worker                                    # un ou plusieurs workers
+"""
+
+import os
+import math
+import time
+import signal
+import socket
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from aio import run_io
+from db import TweetJobsDatabase
+from logging_config import configure_logging
+
+load_dotenv()
+
+configure_logging()
+logger = logging.getLogger("worker")
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "4"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "2"))
+WORKER_JOB_TIMEOUT_SECONDS = float(os.getenv("WORKER_JOB_TIMEOUT_SECONDS", "600"))
+WORKER_RETRY_DELAY_SECONDS = float(os.getenv("WORKER_RETRY_DELAY_SECONDS", "60"))
+
+# Threads qui attendent les résultats des processus du pool (un par processus)
+WAIT_EXECUTOR = ThreadPoolExecutor(max_workers=WORKER_PROCESSES, thread_name_prefix="crew-wait")
+
+
+class CrewTimeout(Exception):
+    """
+    Le processus du crew a dépassé WORKER_JOB_TIMEOUT_SECONDS ou s'est arrêté en cours de job :
+    le tweet a pu être publié, le job n'est pas rejoué.
+    """
+
+
+def _warm_up_process() -> None:
+    """
+    Préchauffage des processus du pool : outils et vector store prêts avant le premier job.
+    """
+    from crews import warm_up
+    try:
+        warm_up()
+    except Exception as e:
+        logging.getLogger("worker").error(f"Préchauffage des agents impossible: {e}")
+
+
+def _run_crew_in_process(agent_id: str, personality_prompt: str) -> str:
+    """
+    Exécute le crew dans le processus courant (import tardif : chaque processus
+    initialise ses propres agents CrewAI et son propre client MongoDB).
+    """
+    from crews import run_daily_tweet_crew
+    return str(run_daily_tweet_crew(agent_id, personality_prompt))
+
+
+def _crew_process_main(conn, timeout_seconds: float) -> None:
+    """
+    Boucle d'un processus du pool : reçoit (agent_id, personality_prompt), renvoie
+    ("ok", résultat) ou ("error", erreur). Le délai est imposé dans le processus lui-même
+    (SIGALRM, action par défaut : fin du processus) : un crew hors délai ne peut plus
+    publier, même si le worker parent a disparu.
+    """
+    _warm_up_process()
+    while True:
+        try:
+            agent_id, personality_prompt = conn.recv()
+        except EOFError:
+            return
+        signal.alarm(math.ceil(timeout_seconds))
+        try:
+            outcome = ("ok", _run_crew_in_process(agent_id, personality_prompt))
+        except Exception as e:
+            outcome = ("error", repr(e))
+        finally:
+            signal.alarm(0)
+        conn.send(outcome)
+
+
+class CrewProcess:
+    """
+    Processus du pool (contexte "spawn") dédié aux crews, un job à la fois.
+    Hors délai, il est tué puis remplacé par un processus neuf : le slot n'est rendu
+    qu'une fois l'ancien processus arrêté.
+    """
+    def __init__(self, context):
+        self._context = context
+        self._start()
+
+    def _start(self) -> None:
+        self.conn, child_conn = self._context.Pipe()
+        self.process = self._context.Process(
+            target=_crew_process_main,
+            args=(child_conn, WORKER_JOB_TIMEOUT_SECONDS),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def run(self, agent_id: str, personality_prompt: str, timeout_seconds: float) -> str:
+        """
+        Appel bloquant : envoie le job et attend le résultat au plus timeout_seconds.
+        """
+        self.conn.send((agent_id, personality_prompt))
+        if not self.conn.poll(timeout_seconds):
+            self.recycle()
+            raise CrewTimeout(f"pas de résultat en {timeout_seconds:.0f}s, processus {self.process.pid} tué")
+        try:
+            status, value = self.conn.recv()
+        except EOFError:
+            self.recycle()
+            raise CrewTimeout("processus du crew arrêté en cours de job")
+        if status == "error":
+            raise RuntimeError(value)
+        return value
+
+    def _stop(self) -> None:
+        self.conn.close()
+        self.process.terminate()
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+    def recycle(self) -> None:
+        self._stop()
+        self._start()
+
+    def close(self) -> None:
+        self._stop()
+
+
+async def process_job(jobs_db: TweetJobsDatabase, crew_process: CrewProcess, job: dict) -> None:
+    agent_id = job["agent_id"]
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+    try:
+        # Le processus enfant s'arrête de lui-même à WORKER_JOB_TIMEOUT_SECONDS ; le parent
+        # attend un peu plus longtemps avant de le tuer.
+        result = await loop.run_in_executor(
+            WAIT_EXECUTOR, crew_process.run, agent_id, job["personality_prompt"], WORKER_JOB_TIMEOUT_SECONDS + 5,
+        )
+        await run_io(jobs_db.complete, job["_id"], result)
+        logger.info("[Agent %s] Job %s terminé en %.1fs.", agent_id, job['_id'], time.monotonic() - started)
+    except CrewTimeout as e:
+        status = await run_io(jobs_db.fail, job, repr(e), WORKER_RETRY_DELAY_SECONDS, False)
+        logger.error("[Agent %s] Job %s hors délai (%s, non rejoué): %s", agent_id, job['_id'], status, e)
+    except Exception as e:
+        status = await run_io(jobs_db.fail, job, repr(e), WORKER_RETRY_DELAY_SECONDS)
+        logger.error(
+            "[Agent %s] Job %s en erreur (%s, tentative %s): %s",
+            agent_id, job['_id'], status, job.get('attempts'), e,
+        )
+
+
+async def run_worker() -> None:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    jobs_db = TweetJobsDatabase()
+    await run_io(jobs_db.ensure_indexes)
+
+    # "spawn" : pymongo n'est pas fork-safe, chaque processus repart d'un état propre
+    context = multiprocessing.get_context("spawn")
+    idle = asyncio.Queue()
+    processes = [CrewProcess(context) for _ in range(WORKER_PROCESSES)]
+    for crew_process in processes:
+        idle.put_nowait(crew_process)
+    running = set()
+    logger.info("Worker %s démarré (%s processus).", worker_id, WORKER_PROCESSES)
+
+    def release(task, crew_process):
+        running.discard(task)
+        idle.put_nowait(crew_process)
+
+    try:
+        while True:
+            crew_process = await idle.get()
+            job = await run_io(jobs_db.claim_next, worker_id, WORKER_JOB_TIMEOUT_SECONDS + 60)
+            if job is None:
+                idle.put_nowait(crew_process)
+                await asyncio.sleep(WORKER_POLL_SECONDS)
+                continue
+            task = asyncio.create_task(process_job(jobs_db, crew_process, job))
+            running.add(task)
+            task.add_done_callback(lambda t, p=crew_process: release(t, p))
+    finally:
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        for crew_process in processes:
+            crew_process.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())